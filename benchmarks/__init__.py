@@ -0,0 +1,8 @@
+"""
+Бенчмарки верификатора на синтетических документах ГОСТ 2.105.
+Запуск: python -m benchmarks --help
+"""
+from .generator import DocumentSpec, generate_document
+from .runner import compare, run_benchmark
+
+__all__ = [DocumentSpec, generate_document, compare, run_benchmark]
@@ -0,0 +1,66 @@
+import argparse
+import sys
+
+from benchmarks.generator import DocumentSpec
+from benchmarks.runner import (DEFAULT_THRESHOLD, FORMATS, compare, load_results, run_benchmark,
+                               save_results)
+
+
+def main():
+    """Запуск бенчмарка и сравнение с базовой линией"""
+    parser = argparse.ArgumentParser(
+        description='Бенчмарк этапов верификатора на синтетических документах',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+            Примеры использования:
+            python -m benchmarks --sections 50 --tables 100 --output benchmarks/results/latest.json
+            python -m benchmarks --baseline benchmarks/results/baseline.json --threshold 0.1
+        """
+    )
+    spec = DocumentSpec()
+    parser.add_argument('--sections', type=int, default=spec.sections)
+    parser.add_argument('--tables', type=int, default=spec.tables)
+    parser.add_argument('--figures', type=int, default=spec.figures)
+    parser.add_argument('--formulas', type=int, default=spec.formulas)
+    parser.add_argument('--appendices', type=int, default=spec.appendices)
+    parser.add_argument('--paragraphs', type=int, default=spec.paragraphs,
+                        help='Абзацев в каждом разделе')
+    parser.add_argument('--lines-per-page', type=int, default=spec.lines_per_page)
+    parser.add_argument('--no-page-markers', action='store_true',
+                        help='Не добавлять колонтитулы "— N —"')
+    parser.add_argument('--formats', nargs='+', choices=FORMATS, default=list(FORMATS))
+    parser.add_argument('--docx-backend', choices=['python-docx', 'xml'], default='python-docx')
+    parser.add_argument('--repeat', type=int, default=3, help='Повторов на формат (берётся лучшее время)')
+    parser.add_argument('--output', '-o', default='benchmarks/results/latest.json',
+                        help='Файл результатов JSON')
+    parser.add_argument('--baseline', default=None, help='Результаты для сравнения')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='Допустимое замедление этапа, доля (по умолчанию: 0.2)')
+
+    args = parser.parse_args()
+
+    spec = DocumentSpec(sections=args.sections, tables=args.tables, figures=args.figures,
+                        formulas=args.formulas, appendices=args.appendices, paragraphs=args.paragraphs,
+                        lines_per_page=args.lines_per_page, page_markers=not args.no_page_markers)
+    results = run_benchmark(spec, formats=args.formats, repeat=args.repeat, docx_backend=args.docx_backend)
+    save_results(results, args.output)
+
+    for fmt, result in results['results'].items():
+        print(f"\n{fmt}: {result['size_bytes']} байт, {result['chars']} символов")
+        for stage, timing in result['stages'].items():
+            print(f"  {stage:<28} {timing['min_sec'] * 1000:10.2f} мс  (медиана {timing['median_sec'] * 1000:.2f})")
+    print(f"\nРезультаты сохранены в: {args.output}")
+
+    if args.baseline:
+        regressions = compare(results, load_results(args.baseline), args.threshold)
+        if regressions:
+            print(f"\nРЕГРЕССИИ (порог {args.threshold:.0%}):")
+            for item in regressions:
+                print(f"  {item['format']}/{item['stage']}: {item['baseline_sec'] * 1000:.2f} → "
+                      f"{item['current_sec'] * 1000:.2f} мс (x{item['ratio']})")
+            sys.exit(1)
+        print(f"\nРегрессий нет (порог {args.threshold:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+"""
+Генератор синтетических документов по ГОСТ 2.105.
+Документ собирается из блоков (абзацы, заголовки, подписи, строки таблиц)
+и раскладывается по страницам; одна и та же раскладка записывается
+в TXT, DOCX и PDF, поэтому форматы сравнимы между собой.
+"""
+import random
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Tuple
+
+# Блок страницы: ('heading' | 'paragraph' | 'caption' | 'table' | 'footer', текст или строки таблицы)
+Block = Tuple[str, object]
+
+WORDS = (
+    "изделие", "конструкция", "параметр", "требование", "значение", "документ", "размер",
+    "материал", "испытание", "условие", "эксплуатация", "допуск", "корпус", "узел", "деталь",
+    "нагрузка", "температура", "давление", "режим", "контроль", "состав", "схема", "сборка"
+)
+REQUIRED_SECTIONS = ("Введение", "Назначение", "Технические характеристики")
+APPENDIX_LETTERS = "АБВГДЕЖИКЛМНПРСТУФХЦШЩЭЮЯ"
+
+# Символов в строке абзаца: строки PDF должны помещаться в ширину страницы
+LINE_WIDTH = 80
+
+
+@dataclass
+class DocumentSpec:
+    """Размер синтетического документа"""
+    sections: int = 10
+    tables: int = 10
+    figures: int = 10
+    formulas: int = 10
+    appendices: int = 2
+    paragraphs: int = 4         # Абзацев в разделе
+    lines_per_page: int = 50
+    page_markers: bool = True   # Колонтитул "— N —" внизу страницы
+    seed: int = 0
+
+
+def generate_blocks(spec: DocumentSpec) -> List[Block]:
+    """Последовательность блоков документа без разбиения на страницы"""
+    rng = random.Random(spec.seed)
+    blocks: List[Block] = [('paragraph', "ТЕХНИЧЕСКОЕ ОПИСАНИЕ СИНТЕТИЧЕСКОГО ИЗДЕЛИЯ")]
+
+    sections = max(spec.sections, len(REQUIRED_SECTIONS))
+    per_section = {
+        'table': _distribute(spec.tables, sections),
+        'figure': _distribute(spec.figures, sections),
+        'formula': _distribute(spec.formulas, sections),
+    }
+
+    for number in range(1, sections + 1):
+        title = REQUIRED_SECTIONS[number - 1] if number <= len(REQUIRED_SECTIONS) else f"Раздел {_sentence(rng, 2)}"
+        blocks.append(('heading', f"{number}. {title}"))
+
+        for _ in range(spec.paragraphs):
+            blocks.append(('paragraph', _sentence(rng, rng.randint(25, 60))))
+
+        for item in range(1, per_section['table'][number - 1] + 1):
+            table_id = f"{number}.{item}"
+            blocks.append(('paragraph', f"Значения приведены, см. таблица {table_id}."))
+            blocks.append(('caption', f"Таблица {table_id} — {_sentence(rng, 3).capitalize()}"))
+            rows = [["Параметр", "Значение", "Допуск"]]
+            rows += [[_sentence(rng, 1), str(rng.randint(1, 999)), f"±{rng.randint(1, 9)}"] for _ in range(3)]
+            blocks.append(('table', rows))
+
+        for item in range(1, per_section['figure'][number - 1] + 1):
+            blocks.append(('paragraph', f"Общий вид показан на рисунке {number}.{item}."))
+            blocks.append(('caption', f"Рисунок {number}.{item} — {_sentence(rng, 3).capitalize()}"))
+
+        for item in range(1, per_section['formula'][number - 1] + 1):
+            formula_id = f"{number}.{item}"
+            blocks.append(('paragraph', f"Расчёт выполняют по формуле ({formula_id})"))
+            blocks.append(('paragraph', f"x = a + b * {rng.randint(2, 9)} ({formula_id})"))
+
+    letters = APPENDIX_LETTERS[:spec.appendices]
+    if letters:
+        blocks.append(('paragraph', "Дополнительные сведения приведены в "
+                       + ", ".join(f"приложении {letter}" for letter in letters) + "."))
+    for letter in letters:
+        blocks.append(('heading', f"ПРИЛОЖЕНИЕ {letter}"))
+        blocks.append(('paragraph', _sentence(rng, 30)))
+
+    return blocks
+
+
+def paginate(blocks: List[Block], spec: DocumentSpec) -> List[List[Block]]:
+    """Раскладывает блоки по страницам; абзацы переносятся по LINE_WIDTH"""
+    pages: List[List[Block]] = []
+    page: List[Block] = []
+    used = 0
+    capacity = spec.lines_per_page - (1 if spec.page_markers else 0)
+
+    def close_page():
+        nonlocal page, used
+        if spec.page_markers:
+            page.append(('footer', f"— {len(pages) + 1} —"))
+        pages.append(page)
+        page, used = [], 0
+
+    for kind, content in blocks:
+        if kind == 'paragraph':
+            lines = [('paragraph', line) for line in _wrap(content)]
+        else:
+            lines = [(kind, content)]
+        for line in lines:
+            height = len(line[1]) if line[0] == 'table' else 1
+            if used and used + height > capacity:
+                close_page()
+            page.append(line)
+            used += height
+
+    if page:
+        close_page()
+    return pages
+
+
+def write_txt(pages: List[List[Block]], path: str):
+    """Текст UTF-8: строки таблиц через табуляцию"""
+    lines = []
+    for page in pages:
+        for kind, content in page:
+            if kind == 'table':
+                lines.extend('\t'.join(row) for row in content)
+            else:
+                lines.append(content)
+    Path(path).write_text('\n'.join(lines) + '\n', encoding='utf-8')
+
+
+def write_docx(pages: List[List[Block]], path: str):
+    """DOCX через python-docx: настоящие таблицы и разрывы страниц"""
+    from docx import Document as DocxDocument
+
+    document = DocxDocument()
+    for page_number, page in enumerate(pages):
+        if page_number:
+            document.add_page_break()
+        for kind, content in page:
+            if kind == 'heading':
+                document.add_heading(content, level=1)
+            elif kind == 'table':
+                table = document.add_table(rows=len(content), cols=len(content[0]))
+                for row, values in zip(table.rows, content):
+                    for cell, value in zip(row.cells, values):
+                        cell.text = value
+            else:
+                document.add_paragraph(content)
+    document.save(path)
+
+
+def write_pdf(pages: List[List[Block]], path: str):
+    """
+    Минимальный PDF без сторонних библиотек: шрифт Helvetica с кириллицей
+    через /Differences (имена глифов afii), текст в cp1251.
+    """
+    font_size, leading, top = 9, 12, 800
+    objects = [b'<< /Type /Catalog /Pages 2 0 R >>', b'', _pdf_font()]
+    kids = []
+
+    for page in pages:
+        content = bytearray(b'BT /F1 %d Tf %d TL 50 %d Td ' % (font_size, leading, top))
+        for kind, value in page:
+            lines = ['  '.join(row) for row in value] if kind == 'table' else [value]
+            for line in lines:
+                content += b'(' + _pdf_escape(line.encode('cp1251', errors='replace')) + b') Tj T* '
+        content += b'ET'
+        objects.append(b'<< /Length %d >>\nstream\n' % len(content) + bytes(content) + b'\nendstream')
+        objects.append(b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] '
+                       b'/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>' % len(objects))
+        kids.append(len(objects))
+
+    objects[1] = (b'<< /Type /Pages /Kids [' + b' '.join(b'%d 0 R' % kid for kid in kids)
+                  + b'] /Count %d >>' % len(kids))
+
+    out = bytearray(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b'%d 0 obj\n' % number + body + b'\nendobj\n'
+    xref = len(out)
+    out += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+    out += b''.join(b'%010d 00000 n \n' % offset for offset in offsets)
+    out += b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, xref)
+    Path(path).write_bytes(bytes(out))
+
+
+WRITERS = {'txt': write_txt, 'docx': write_docx, 'pdf': write_pdf}
+
+
+def generate_document(spec: DocumentSpec, fmt: str, path: str) -> str:
+    """Создаёт синтетический документ в формате fmt и возвращает путь"""
+    WRITERS[fmt](paginate(generate_blocks(spec), spec), path)
+    return path
+
+
+def _distribute(total: int, buckets: int) -> List[int]:
+    """Равномерно раскладывает total объектов по buckets разделам"""
+    return [total // buckets + (1 if i < total % buckets else 0) for i in range(buckets)]
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return ' '.join(rng.choice(WORDS) for _ in range(words))
+
+
+def _wrap(text: str) -> List[str]:
+    lines, current = [], ''
+    for word in text.split():
+        if current and len(current) + 1 + len(word) > LINE_WIDTH:
+            lines.append(current)
+            current = word
+        else:
+            current = f"{current} {word}" if current else word
+    return lines + [current] if current else lines
+
+
+def _pdf_font() -> bytes:
+    # cp1251 0xC0-0xFF -> А-Я, а-я; 0xA8/0xB8 -> Ё/ё (afii10023 вне ряда, поэтому сдвиг i >= 6)
+    upper = [f'/afii{10017 + i + (i >= 6)}' for i in range(32)]
+    lower = [f'/afii{10065 + i + (i >= 6)}' for i in range(32)]
+    differences = '192 ' + ' '.join(upper + lower) + ' 168 /afii10023 184 /afii10071'
+    return ('<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding << /Type /Encoding '
+            f'/BaseEncoding /WinAnsiEncoding /Differences [{differences}] >> >>').encode('ascii')
+
+
+def _pdf_escape(data: bytes) -> bytes:
+    return data.replace(b'\\', b'\\\\').replace(b'(', b'\\(').replace(b')', b'\\)')
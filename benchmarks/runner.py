@@ -0,0 +1,128 @@
+"""
+Замеры этапов на синтетических документах и сравнение с базовой линией.
+Каждый повтор проходит весь конвейер заново (чтение, разбор, проверки,
+отчёт), поэтому ленивые индексы документа строятся в каждом повторе.
+"""
+import json
+import platform
+import statistics
+import tempfile
+import time
+from dataclasses import asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from benchmarks.generator import DocumentSpec, generate_document
+from src.checks import get_all_checks
+from src.core import Parser, Reporter, Validator
+from src.utils import ConfigLoader, FileReader
+
+DEFAULT_CONFIG = str(Path(__file__).parent.parent / 'config' / 'gost_2_105_rules.yaml')
+FORMATS = ('txt', 'docx', 'pdf')
+
+# Порог регрессии по умолчанию: этап стал медленнее базовой линии на 20%
+DEFAULT_THRESHOLD = 0.2
+# Разница меньше этой считается шумом (микроэтапы в доли миллисекунды)
+MIN_DELTA_SEC = 0.002
+
+
+def run_benchmark(spec: DocumentSpec, formats: Iterable[str] = FORMATS, repeat: int = 3,
+                  config_path: str = DEFAULT_CONFIG, docx_backend: str = 'python-docx',
+                  workdir: Optional[str] = None) -> dict:
+    """Генерирует документы, замеряет этапы repeat раз и возвращает результаты для JSON"""
+    config = ConfigLoader.load_rules(config_path)
+    file_reader = FileReader(docx_backend=docx_backend)
+    doc_parser = Parser()
+    validator = Validator(config)
+    for check in get_all_checks():
+        validator.register_check(check)
+
+    results = {}
+    with tempfile.TemporaryDirectory(dir=workdir) as tmp_dir:
+        for fmt in formats:
+            path = generate_document(spec, fmt, str(Path(tmp_dir) / f"synthetic.{fmt}"))
+            samples: Dict[str, List[float]] = {}
+            chars = 0
+
+            for _ in range(repeat):
+                text, _ = _timed(samples, 'file_reader', file_reader.read_file, path)
+                chars = len(text or '')
+                document = _timed(samples, 'parser', doc_parser.parse_text, text)
+                document.file_path = path
+
+                check_results = [_timed(samples, f"check.{check.check_id}", check.run, document)
+                                 for check in validator.checks]
+                _timed(samples, 'reporter', _render_report, document, check_results)
+
+            results[fmt] = {
+                'size_bytes': Path(path).stat().st_size,
+                'chars': chars,
+                'stages': {stage: _summarize(values) for stage, values in samples.items()}
+            }
+
+    return {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'spec': asdict(spec),
+        'repeat': repeat,
+        'docx_backend': docx_backend,
+        'results': results
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float = DEFAULT_THRESHOLD,
+            min_delta_sec: float = MIN_DELTA_SEC) -> List[dict]:
+    """
+    Сравнивает лучшее время этапов с базовой линией.
+    Возвращает регрессии: этапы, ставшие медленнее более чем на threshold.
+    """
+    regressions = []
+    for fmt, result in current['results'].items():
+        base_stages = baseline.get('results', {}).get(fmt, {}).get('stages', {})
+        for stage, timing in result['stages'].items():
+            base = base_stages.get(stage)
+            if base is None:
+                continue
+            before, after = base['min_sec'], timing['min_sec']
+            if after - before > min_delta_sec and after > before * (1 + threshold):
+                regressions.append({
+                    'format': fmt,
+                    'stage': stage,
+                    'baseline_sec': before,
+                    'current_sec': after,
+                    'ratio': round(after / before, 2) if before else None
+                })
+    return regressions
+
+
+def load_results(path: str) -> dict:
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_results(results: dict, path: str):
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+def _timed(samples: Dict[str, List[float]], stage: str, func, *args):
+    started = time.perf_counter()
+    result = func(*args)
+    samples.setdefault(stage, []).append(time.perf_counter() - started)
+    return result
+
+
+def _render_report(document, check_results) -> str:
+    """Отчёт вместе с сериализацией, как при сохранении в файл"""
+    report = Reporter.generate_report(document=document, results=check_results)
+    return json.dumps(report, ensure_ascii=False, indent=2)
+
+
+def _summarize(values: List[float]) -> dict:
+    return {
+        'min_sec': round(min(values), 6),
+        'median_sec': round(statistics.median(values), 6)
+    }
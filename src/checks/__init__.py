@@ -1,31 +1,75 @@
-from .section_checker import SectionCheck
-from .section_numbering_checker import SectionNumberingCheck
-from .page_numbering_checker import PageNumberingCheck
-from .table_checker import TableCheck
-from .figure_checker import FigureCheck
-from .formula_checker import FormulaCheck
-from .appendix_checker import AppendixCheck
-from .format_checker import FormatCheck
-
-# Все 7 основных проверок ГОСТ 2.105 + проверка формата
-ALL_CHECKS = [
-    SectionCheck,
-    SectionNumberingCheck,
-    PageNumberingCheck,
-    TableCheck,
-    FigureCheck,
-    FormulaCheck,
-    AppendixCheck,
-    FormatCheck
-]
+import importlib
+
+from src.utils.logger import get_logger
+
+logger = get_logger('checks')
+
+# Все 7 основных проверок ГОСТ 2.105 + проверка формата: check_id -> (модуль, класс).
+# Модуль проверки импортируется при первом обращении, поэтому выключенные
+# в check_settings.enabled_checks проверки не загружаются вовсе
+CHECKS = {
+    "required_sections": ("section_checker", "SectionCheck"),
+    "section_numbering": ("section_numbering_checker", "SectionNumberingCheck"),
+    "page_numbering": ("page_numbering_checker", "PageNumberingCheck"),
+    "table_format": ("table_checker", "TableCheck"),
+    "figure_format": ("figure_checker", "FigureCheck"),
+    "formulas": ("formula_checker", "FormulaCheck"),
+    "appendices": ("appendix_checker", "AppendixCheck"),
+    "required_format": ("format_checker", "FormatCheck"),
+}
+
+_CLASS_MODULES = {class_name: module for module, class_name in CHECKS.values()}
+
+
+def load_check_class(check_id: str):
+    """Класс проверки по её check_id"""
+    module, class_name = CHECKS[check_id]
+    return getattr(importlib.import_module(f"{__name__}.{module}"), class_name)
+
+
+def enabled_check_ids(config: dict = None) -> list:
+    """
+    check_id из check_settings.enabled_checks в порядке CHECKS.
+    Если список не задан, включены все проверки.
+    """
+    enabled = ((config or {}).get('check_settings') or {}).get('enabled_checks')
+    if enabled is None:
+        return list(CHECKS)
+
+    for check_id in enabled:
+        if check_id not in CHECKS:
+            logger.warning("[Checks] Неизвестная проверка в enabled_checks: %s", check_id)
+    return [check_id for check_id in CHECKS if check_id in enabled]
 
 
 def get_all_checks(config: dict = None):
+    if config:
+        # Правила компилируются один раз для всех проверок
+        from src.utils.rule_set import RuleSet
+        config = RuleSet.from_config(config)
+
     checks = []
-    for CheckClass in ALL_CHECKS:
-        check = CheckClass()
+    for check_id in CHECKS:
+        check = load_check_class(check_id)()
         if config:
             check.set_rules(config)
         checks.append(check)
 
-    return checks
\ No newline at end of file
+    return checks
+
+
+def get_enabled_checks(config: dict = None):
+    """
+    Проверки, включённые в конфиге. Правила не передаются:
+    это делает Validator.register_check с тем же конфигом.
+    """
+    return [load_check_class(check_id)() for check_id in enabled_check_ids(config)]
+
+
+def __getattr__(name):
+    # Совместимость: ALL_CHECKS и классы проверок по имени загружают модули по требованию
+    if name == 'ALL_CHECKS':
+        return [load_check_class(check_id) for check_id in CHECKS]
+    if name in _CLASS_MODULES:
+        return getattr(importlib.import_module(f"{__name__}.{_CLASS_MODULES[name]}"), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,18 +1,28 @@
 import re
 from src.checks.base_checker import BaseCheck
-from src.models import Document, CheckResult, CheckStatus, ValidationError
+from src.models import Document, DocumentChange, CheckResult, CheckStatus, ReferenceIndex, TextChunk
+from src.utils.logger import get_logger
+
+logger = get_logger('checks.appendices')
 
 
 class AppendixCheck(BaseCheck):
     """Проверка 7: Оформление приложений"""
 
+    # Заголовки и явные ссылки: "ПРИЛОЖЕНИЕ А", "в приложении А", "прил. А"
+    TRIGGER = re.compile(r'(?i)прил')
+
+    streaming = True
+    # Раздел правил, от которого зависит результат
+    RULE_SECTIONS = ('appendices',)
+
     def __init__(self):
         super().__init__(
             check_id="appendices",
             check_name="Оформление приложений"
         )
         # Значения по умолчанию
-        self.appendix_pattern = r'^ПРИЛОЖЕНИЕ\s+[А-Я]$'
+        self.appendix_pattern = re.compile(r'^ПРИЛОЖЕНИЕ\s+[А-Я]$')
         self.require_reference = True
         self.allowed_types = None
         self.max_designation_length = None
@@ -21,126 +31,183 @@ class AppendixCheck(BaseCheck):
         self.allow_dot_after = True
         self.allow_parentheses = True
 
+        # Шаблоны ошибок: одни на все приложения
+        self.format_error = self._template(
+            "Проблемы с оформлением приложения: '{0}'",
+            "{1}",
+            "ГОСТ 2.105, раздел 6")
+        self.reference_error = self._template(
+            "Отсутствует ссылка на Приложение {0}",
+            "Добавьте ссылку в текст: '... в Приложении {0} ...'",
+            "ГОСТ 2.105, раздел 6.2")
+
     def set_rules(self, rules: dict):
         """Загружает правила для проверки приложений из конфига"""
         super().set_rules(rules)
 
-        # Безопасное извлечение правил со значениями по умолчанию
-        config = self._safe_get_rule('gost_2_105.appendices', {})
+        if not self.rules:
+            return
+        appendices = self.rules.appendices
 
         # Паттерн для поиска
-        self.appendix_pattern = config.get('pattern', r'^ПРИЛОЖЕНИЕ\s+[А-ЯA-Z\d]')
-
-        # Допустимые типы обозначений
-        self.allowed_types = config.get('allowed_designations', {}).get('types',
-                                                                        ["cyrillic", "latin", "numeric"])
+        self.appendix_pattern = appendices.pattern
 
-        # Максимальная длина обозначения
-        self.max_designation_length = config.get('allowed_designations', {}).get('max_length', 2)
+        # Допустимые типы обозначений и максимальная длина обозначения
+        self.allowed_types = list(appendices.allowed_types)
+        self.max_designation_length = appendices.max_designation_length
 
         # Настройки строгости
-        self.require_uppercase = config.get('validation', {}).get('require_uppercase', True)
-        self.require_space = config.get('validation', {}).get('require_space', True)
-        self.allow_dot_after = config.get('validation', {}).get('allow_dot_after', True)
-        self.allow_parentheses = config.get('validation', {}).get('allow_parentheses', True)
+        self.require_uppercase = appendices.require_uppercase
+        self.require_space = appendices.require_space
+        self.allow_dot_after = appendices.allow_dot_after
+        self.allow_parentheses = appendices.allow_parentheses
 
         # Общие настройки
-        self.require_reference = config.get('require_reference', True)
+        self.require_reference = appendices.require_reference
 
-        print(f"[AppendixCheck] Настройки: типы={self.allowed_types}, "
-              f"макс.длина={self.max_designation_length}")
+        logger.debug("[AppendixCheck] Настройки: типы=%s, макс.длина=%s",
+                     self.allowed_types, self.max_designation_length)
 
     def run(self, document: Document) -> CheckResult:
         """Улучшенная проверка приложений с поддержкой разных форматов"""
         errors = []
-        text = document.raw_text
-        lines = text.split('\n')
+        index = document.get_index()
 
         found_appendix_lines = []
 
-        print(f"\n[AppendixCheck] Поиск приложений в документе...")
+        logger.debug("[AppendixCheck] Поиск приложений в документе...")
+
+        for i, line in enumerate(index.lines):
+            appendix = self._scan_line(line, i)
+            if appendix:
+                appendix['page'] = document.page_at_line(i)
+                found_appendix_lines.append(appendix)
+
+        logger.debug("[AppendixCheck] Найдено приложений: %d", len(found_appendix_lines))
+
+        # 2. Проверяем каждое найденное приложение
+        for appendix in found_appendix_lines:
+            self._check_appendix_format(appendix, errors)
 
-        for i, line in enumerate(lines):
-            line_stripped = line.strip()
+        # 3. Проверяем ссылки (если требуется)
+        if self.require_reference and found_appendix_lines:
+            self._check_appendix_references(document.get_references(), found_appendix_lines, errors)
 
-            # Проверяем, начинается ли строка с "ПРИЛОЖЕНИЕ" (регистронезависимо)
-            if line_stripped.upper().startswith('ПРИЛОЖЕНИЕ'):
+        status = CheckStatus.FAILED if errors else CheckStatus.PASSED
+        return self._create_result(status, errors)
 
-                # Извлекаем обозначение приложения
-                designation = self._extract_appendix_designation(line_stripped)
+    def _scan_line(self, line: str, i: int) -> dict:
+        """Приложение, заголовок которого - строка i; None, если строка не заголовок приложения"""
+        line_stripped = line.strip()
 
-                if designation:
-                    # Определяем тип обозначения
-                    designation_type = self._get_designation_type(designation)
+        # Проверяем, начинается ли строка с "ПРИЛОЖЕНИЕ" (регистронезависимо)
+        if not line_stripped.upper().startswith('ПРИЛОЖЕНИЕ'):
+            return None
 
-                    # Проверяем, разрешён ли такой тип
-                    is_allowed_type = designation_type in self.allowed_types
+        # Извлекаем обозначение приложения
+        designation = self._extract_appendix_designation(line_stripped)
+        if not designation:
+            return None
 
-                    # Проверяем длину
-                    is_valid_length = len(designation) <= self.max_designation_length
+        # Определяем тип обозначения
+        designation_type = self._get_designation_type(designation)
 
-                    # Проверяем другие критерии
-                    validation_result = self._validate_appendix_format(line_stripped, designation)
+        # Проверяем, разрешён ли такой тип
+        is_allowed_type = designation_type in self.allowed_types
 
-                    found_appendix_lines.append({
-                        'line_num': i,
-                        'original': line_stripped,
-                        'designation': designation,
-                        'type': designation_type,
-                        'is_allowed_type': is_allowed_type,
-                        'is_valid_length': is_valid_length,
-                        'validation': validation_result
-                    })
+        # Проверяем длину
+        is_valid_length = len(designation) <= self.max_designation_length
 
-                    print(f"  Строка {i + 1}: '{line_stripped}'")
-                    print(f"    Обозначение: '{designation}' (тип: {designation_type})")
-                    print(f"    Разрешённый тип: {'✓' if is_allowed_type else '✗'}")
-                    print(f"    Валидная длина: {'✓' if is_valid_length else '✗'}")
+        # Проверяем другие критерии
+        validation_result = self._validate_appendix_format(line_stripped, designation)
 
-        print(f"\n[AppendixCheck] Найдено приложений: {len(found_appendix_lines)}")
+        logger.debug("  Строка %d: '%s'\n    Обозначение: '%s' (тип: %s)\n"
+                     "    Разрешённый тип: %s\n    Валидная длина: %s",
+                     i + 1, line_stripped, designation, designation_type,
+                     '✓' if is_allowed_type else '✗', '✓' if is_valid_length else '✗')
 
-        # 2. Проверяем каждое найденное приложение
-        for appendix in found_appendix_lines:
-            appendix_errors = []
-
-            # Проверка типа обозначения
-            if not appendix['is_allowed_type']:
-                allowed_types_str = ', '.join(self.allowed_types)
-                appendix_errors.append(f"Тип обозначения '{appendix['type']}' не разрешён. "
-                                       f"Допустимые типы: {allowed_types_str}")
-
-            # Проверка длины
-            if not appendix['is_valid_length']:
-                appendix_errors.append(f"Обозначение '{appendix['designation']}' слишком длинное. "
-                                       f"Максимум: {self.max_designation_length} символов")
-
-            # Дополнительные проверки формата
-            if appendix['validation'].get('has_space_issue'):
-                appendix_errors.append("Отсутствует или лишний пробел после 'ПРИЛОЖЕНИЕ'")
-
-            if appendix['validation'].get('has_case_issue'):
-                appendix_errors.append("Используйте заглавные буквы для 'ПРИЛОЖЕНИЕ'")
-
-            # Если есть ошибки - добавляем в общий список
-            if appendix_errors:
-                errors.append(ValidationError(
-                    check_name=self.check_name,
-                    description=f"Проблемы с оформлением приложения: '{appendix['original']}'",
-                    recommendation="; ".join(appendix_errors),
-                    gost_reference="ГОСТ 2.105, раздел 6",
-                    element=appendix['original'],
-                    page=self._estimate_page_number(appendix['line_num'])
-                ))
-            else:
-                print(f"  ✓ Приложение '{appendix['original']}' - корректно")
+        return {
+            'line_num': i,
+            'original': line_stripped,
+            'designation': designation,
+            'type': designation_type,
+            'is_allowed_type': is_allowed_type,
+            'is_valid_length': is_valid_length,
+            'validation': validation_result
+        }
 
-        # 3. Проверяем ссылки (если требуется)
-        if self.require_reference and found_appendix_lines:
-            self._check_appendix_references(text, found_appendix_lines, errors)
+    def _check_appendix_format(self, appendix: dict, errors: list):
+        """Ошибка оформления найденного приложения, если она есть"""
+        appendix_errors = []
+
+        # Проверка типа обозначения
+        if not appendix['is_allowed_type']:
+            allowed_types_str = ', '.join(self.allowed_types)
+            appendix_errors.append(f"Тип обозначения '{appendix['type']}' не разрешён. "
+                                   f"Допустимые типы: {allowed_types_str}")
+
+        # Проверка длины
+        if not appendix['is_valid_length']:
+            appendix_errors.append(f"Обозначение '{appendix['designation']}' слишком длинное. "
+                                   f"Максимум: {self.max_designation_length} символов")
+
+        # Дополнительные проверки формата
+        if appendix['validation'].get('has_space_issue'):
+            appendix_errors.append("Отсутствует или лишний пробел после 'ПРИЛОЖЕНИЕ'")
+
+        if appendix['validation'].get('has_case_issue'):
+            appendix_errors.append("Используйте заглавные буквы для 'ПРИЛОЖЕНИЕ'")
+
+        # Если есть ошибки - добавляем в общий список
+        if appendix_errors:
+            errors.append(self.format_error.error(
+                appendix['original'], "; ".join(appendix_errors),
+                element=appendix['original'],
+                page=appendix['page']
+            ))
+        else:
+            logger.debug("  ✓ Приложение '%s' - корректно", appendix['original'])
+
+    def begin(self, document: Document):
+        self._document = document
+        self._appendices = []
+        self._errors = []
+        self._references = _StreamReferences()
+
+    def feed(self, chunk: TextChunk):
+        for i, offset, line in chunk.numbered():
+            appendix = self._scan_line(line, i)
+            if appendix:
+                appendix['page'] = self._document.page_at(offset)
+                self._appendices.append(appendix)
+                self._check_appendix_format(appendix, self._errors)
+            if self.require_reference:
+                self._references.feed(line.lower())
+
+    def finish(self) -> CheckResult:
+        errors, appendices = self._errors, self._appendices
+        logger.debug("[AppendixCheck] Найдено приложений: %d", len(appendices))
+        if self.require_reference and appendices:
+            self._check_appendix_references(self._references, appendices, errors)
+        self._appendices = self._errors = self._references = None
 
         status = CheckStatus.FAILED if errors else CheckStatus.PASSED
         return self._create_result(status, errors)
 
+    def is_affected(self, change: DocumentChange) -> bool:
+        if not change.text_changed:
+            return False
+
+        windows = change.windows(context_lines=0)
+        if any(self.TRIGGER.search(window) for window in windows):
+            return True
+
+        # Ссылкой считается и обозначение приложения отдельным словом
+        designations = {self._extract_appendix_designation(appendix['original_text']).lower().rstrip('-')
+                        for appendix in change.old.appendices}
+        designations.discard('')
+        return any(designations.intersection(re.findall(r'\w+', window.lower())) for window in windows)
+
 
 
     @staticmethod
@@ -234,64 +301,62 @@ class AppendixCheck(BaseCheck):
 
         return result
 
-    @staticmethod
-    def _estimate_page_number(line_num: int) -> int:
-        """Оценивает номер страницы по номеру строки"""
-        # Примерная оценка: 50 строк на страницу
-        return (line_num // 50) + 1
-
-    def _check_appendix_references(self, text: str, appendices: list, errors: list):
-        """Проверяет наличие ссылок на приложения в тексте"""
-        text_lower = text.lower()
+    def _check_appendix_references(self, references: ReferenceIndex, appendices: list, errors: list):
+        """Проверяет наличие ссылок на приложения в тексте по индексу ссылок документа"""
 
         for appendix in appendices:
             designation = appendix['designation']
             designation_lower = designation.lower()
 
-            # ПРОСТОЙ ПОДХОД: ищем упоминания без сложных регулярных выражений
-
-            # 1. Сначала проверяем явные ссылки со словом "приложение"
-            explicit_ref_found = False
-
-            # Варианты явных ссылок
-            explicit_patterns = [
-                f'приложени[еия] {designation_lower}',
-                f'приложени[еия].{designation_lower}',  # без пробела
-                f'приложение {designation_lower}',
-                f'приложении {designation_lower}',
-                f'прилож. {designation_lower}',
-                f'прил. {designation_lower}',
-            ]
-
-            for pattern in explicit_patterns:
-                if pattern in text_lower:
-                    explicit_ref_found = True
-                    break
+            # 1. Сначала проверяем явные ссылки со словом "приложение":
+            # "приложение а", "приложении а", "прилож. а", "прил. а"
+            explicit_ref_found = bool(references.mentions('appendix', designation_lower))
 
             # 2. Если явных ссылок нет, проверяем простое упоминание обозначения
             if not explicit_ref_found:
-                # Ищем обозначение в тексте (не в заголовке приложения)
-                # Разделяем текст на слова и ищем обозначение отдельно
-
-                # Простой способ: ищем обозначение, окружённое пробелами или знаками препинания
-                words = re.findall(r'\b\w+\b', text_lower)
-                if designation_lower in words:
+                # Ищем обозначение как отдельное слово (не в заголовке приложения)
+                if references.has_word(designation_lower):
                     # Нашли как отдельное слово - это может быть ссылка
                     pass
+                elif designation_lower.endswith('-') and references.has_hyphenated(designation_lower[:-1]):
+                    # Обозначение упоминается, но не как "Приложение X"
+                    # Можно добавить предупреждение или игнорировать
+                    logger.debug("  ℹ️  Приложение %s упоминается, но не в стандартной форме", designation)
                 else:
-                    # Проверяем, есть ли обозначение в составе других конструкций
-                    simple_pattern = rf'\b{re.escape(designation_lower)}\b'
-                    if not re.search(simple_pattern, text_lower):
-                        # Создаём ошибку только если обозначение совсем не упоминается
-                        errors.append(ValidationError(
-                            check_name=self.check_name,
-                            description=f"Отсутствует ссылка на Приложение {designation}",
-                            recommendation=f"Добавьте ссылку в текст: '... в Приложении {designation} ...'",
-                            gost_reference="ГОСТ 2.105, раздел 6.2",
-                            element=f"Приложение {designation}",
-                            page=appendix.get('page')
-                        ))
-                    else:
-                        # Обозначение упоминается, но не как "Приложение X"
-                        # Можно добавить предупреждение или игнорировать
-                        print(f"  ℹ️  Приложение {designation} упоминается, но не в стандартной форме")
\ No newline at end of file
+                    # Создаём ошибку только если обозначение совсем не упоминается
+                    errors.append(self.reference_error.error(
+                        designation,
+                        element=f"Приложение {designation}",
+                        page=appendix.get('page')
+                    ))
+
+
+
+class _StreamReferences:
+    """
+    Ссылки на приложения при потоковой проверке - то же, что ReferenceIndex
+    по строкам в нижнем регистре. Запоминаются только слова, которые могут
+    совпасть с обозначением приложения (буквы А-Я, A-Z и цифры).
+    """
+    DESIGNATION_WORD = re.compile(r'[а-яa-z\d]+')
+
+    def __init__(self):
+        self.designations = set()
+        self.words = set()
+        self.hyphenated = set()
+
+    def feed(self, lower_line: str):
+        for match in ReferenceIndex.APPENDIX_REFERENCE.finditer(lower_line):
+            self.designations.update(ReferenceIndex.appendix_reference_keys(match))
+        self.words.update(word for word in re.findall(r'\w+', lower_line) if self.DESIGNATION_WORD.fullmatch(word))
+        self.hyphenated.update(word for word in re.findall(r'\b(\w+)-(?=\w)', lower_line)
+                               if self.DESIGNATION_WORD.fullmatch(word))
+
+    def mentions(self, kind: str, key: str) -> bool:
+        return key in self.designations
+
+    def has_word(self, word: str) -> bool:
+        return word in self.words
+
+    def has_hyphenated(self, word: str) -> bool:
+        return word in self.hyphenated
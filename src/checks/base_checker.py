@@ -1,29 +1,150 @@
 # src/checks/base_check.py
+import dataclasses
+import re
 from abc import ABC, abstractmethod
-from typing import Dict, Any
-from ..models import Document, CheckResult, CheckStatus
+from typing import Any, Dict, List, Optional, Tuple
+from ..models import Document, DocumentChange, CheckResult, CheckStatus, ErrorTemplate, TextChunk
+from ..utils.rule_set import RuleSet
+
+
+class TextWindow:
+    """
+    Скользящее окно текста для потоковых проверок.
+    Блоки строк дописываются в конец, find() выдаёт те же совпадения, что
+    finditer по всему тексту, и не выдаёт их повторно. Пока текст не закончился,
+    совпадение откладывается, если за ним в окне меньше after символов или оно
+    может продолжиться в следующем блоке: через границу блока шаблоны переходят
+    только пробельными символами (\\s), поэтому достаточно не принимать
+    совпадения, начинающиеся в последних tokens словах окна.
+    release() отбрасывает просмотренный текст, оставляя before символов слева.
+    """
+
+    def __init__(self, before: int = 0):
+        self.before = before
+        self.text = ""
+        self.start = 0        # Смещение text[0] в документе
+        self.final = False    # Текст документа закончился
+        self._started = False
+        self._resume: Dict[re.Pattern, int] = {}
+
+    def push(self, chunk: TextChunk):
+        """Дописывает блок строк"""
+        text = '\n'.join(chunk.lines)
+        self.text = f"{self.text}\n{text}" if self._started else text
+        self._started = True
+
+    def find(self, pattern: re.Pattern, after: int = 0, tokens: int = 1) -> List[re.Match]:
+        """
+        Новые совпадения шаблона в окне. Смещение в документе - start + match.start().
+        tokens - сколько слов, разделённых пробельными символами, может занять
+        начало совпадения до места, где оно окончательно определено.
+        """
+        text = self.text
+        position = self._resume.get(pattern, self.start) - self.start
+        limit = len(text) if self.final else self._tokens_start(tokens)
+        hold = limit
+        matches = []
+        for match in pattern.finditer(text, position):
+            if match.start() >= limit:
+                break
+            if not self.final and match.end() + after + 2 > len(text):
+                hold = match.start()
+                break
+            matches.append(match)
+            position = match.end()
+        self._resume[pattern] = self.start + max(position, hold)
+        return matches
+
+    def release(self):
+        """Отбрасывает текст, который больше не понадобится ни одному шаблону"""
+        end = self.start + len(self.text)
+        keep = min(min(self._resume.values(), default=end) - self.before, end)
+        if keep > self.start:
+            self.text = self.text[keep - self.start:]
+            self.start = keep
+
+    def _tokens_start(self, tokens: int) -> int:
+        """Начало tokens-го с конца слова окна"""
+        text, i = self.text, len(self.text)
+        for _ in range(tokens):
+            while i and text[i - 1].isspace():
+                i -= 1
+            while i and not text[i - 1].isspace():
+                i -= 1
+        return i
 
 
 class BaseCheck(ABC):
     """Абстрактный базовый класс для ВСЕХ проверок ГОСТ"""
 
+    # Проверка реализует begin/feed/finish без накопления текста
+    streaming = False
+
+    # Разделы RuleSet, от которых зависит результат; None - весь конфиг
+    RULE_SECTIONS: Optional[Tuple[str, ...]] = None
+
+    # Версия реализации - часть ключа кэша результатов: увеличивается при изменении логики
+    VERSION = 1
+
+    # Результат зависит только от документа и правил, его можно брать из кэша результатов
+    cacheable = True
+
     def __init__(self, check_id: str, check_name: str):
         self.check_id = check_id
         self.check_name = check_name
-        self.rules = None
+        self.rules: Optional[RuleSet] = None
 
-    def set_rules(self, rules: Dict[str, Any]):
+    def set_rules(self, rules):
         """
-        Загружает правила проверки из конфига.
+        Загружает правила проверки: RuleSet или словарь конфига (будет скомпилирован).
         Должен быть переопределён в дочерних классах для извлечения специфичных правил.
         """
-        self.rules = rules
+        self.rules = RuleSet.from_config(rules) if rules else None
+
+    def rules_fingerprint(self) -> str:
+        """
+        Хеш действующих правил проверки. Проверки с одним check_id и
+        одинаковым хешем дают на одном документе одинаковый результат.
+        """
+        if self.rules is None:
+            return 'defaults'
+        if self.RULE_SECTIONS is None:
+            return self.rules.fingerprint
+        return self.rules.section_fingerprint(self.RULE_SECTIONS)
 
     @abstractmethod
     def run(self, document: Document) -> CheckResult:
         """Главный метод, который выполняет проверку"""
         pass
 
+    def begin(self, document: Document):
+        """
+        Начало потоковой проверки. document - без текста: путь и страницы,
+        которые дополняются по мере чтения. По умолчанию текст накапливается
+        и при finish() проверяется через run().
+        """
+        self._document = document
+        self._stream_lines = []
+
+    def feed(self, chunk: TextChunk):
+        """Очередной блок строк документа"""
+        self._stream_lines.extend(chunk.lines)
+
+    def finish(self) -> CheckResult:
+        """Текст закончился: результат проверки"""
+        document = dataclasses.replace(self._document, raw_text='\n'.join(self._stream_lines),
+                                       index=None, references=None, page_map=None)
+        self._stream_lines = None
+        return self.run(document)
+
+    def is_affected(self, change: DocumentChange) -> bool:
+        """
+        Может ли правка документа изменить результат проверки.
+        Используется при инкрементальной проверке: если нет, берётся прежний
+        результат. По умолчанию проверка выполняется заново при любой правке.
+        """
+        return True
+
     def _create_result(self, status: CheckStatus, errors: list = None) -> CheckResult:
         """Вспомогательный метод для создания результата"""
         return CheckResult(
@@ -33,6 +154,10 @@ class BaseCheck(ABC):
             errors=errors or []
         )
 
+    def _template(self, description: str, recommendation: str = "", gost_reference: str = "") -> ErrorTemplate:
+        """Шаблон однотипных ошибок этой проверки; поля {} заполняются аргументами ошибки"""
+        return ErrorTemplate(self.check_name, description, recommendation, gost_reference)
+
     def _safe_get_rule(self, rule_path: str, default: Any = None) -> Any:
         """
         Безопасно извлекает правило из конфига по пути.
@@ -40,14 +165,4 @@ class BaseCheck(ABC):
         """
         if not self.rules:
             return default
-
-        keys = rule_path.split('.')
-        value = self.rules
-
-        for key in keys:
-            if isinstance(value, dict) and key in value:
-                value = value[key]
-            else:
-                return default
-
-        return value
\ No newline at end of file
+        return self.rules.get_rule(rule_path, default)
\ No newline at end of file
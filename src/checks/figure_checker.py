@@ -1,13 +1,28 @@
 import re
-from src.checks.base_checker import BaseCheck
-from src.models import Document, CheckResult, CheckStatus, ValidationError
+from src.checks.base_checker import BaseCheck, TextWindow
+from src.models import Document, DocumentChange, CheckResult, CheckStatus, TextChunk
 
 
 class FigureCheck(BaseCheck):
+    # Результат зависит только от текста вокруг слова "рисунок"
+    TRIGGER = re.compile(r'(?i)рисунок')
+    # Подпись рисунка с номером
+    MENTION = re.compile(r'(?i)рисунок\s+(\d+(\.\d+)*)')
+    # Сколько символов после номера ищется наименование
+    TITLE_CHARS = 20
+
+    streaming = True
+    # Правил из конфига проверка не использует
+    RULE_SECTIONS = ()
+
     def __init__(self):
         super().__init__(
             check_id="figure_format",
             check_name="Проверка оформления рисунков")
+        self.untitled_error = self._template(
+            "Рисунок без наименования: '{0}'",
+            "Добавьте наименование после номера рисунка",
+            "ГОСТ 2.105, раздел 5.4")
 
     def run(self, document: Document) -> CheckResult:
         """Проверяет нумерацию и оформление рисунков"""
@@ -15,21 +30,46 @@ class FigureCheck(BaseCheck):
         text = document.raw_text
 
         # Ищем подписи рисунков
-        figure_pattern = r'(?i)рисунок\s+(\d+(\.\d+)*)'
-        figure_matches = list(re.finditer(figure_pattern, text))
+        figure_matches = list(self.MENTION.finditer(text))
 
         # Проверяем формат "Рисунок X.Y"
         for match in figure_matches:
             full_match = match.group(0)
             # Проверяем, что после номера есть текст (наименование)
             end_pos = match.end()
-            if end_pos < len(text) and text[end_pos:end_pos + 20].strip() == "":
-                errors.append(ValidationError(
-                    check_name=self.check_name,
-                    description=f"Рисунок без наименования: '{full_match}'",
-                    recommendation="Добавьте наименование после номера рисунка",
-                    gost_reference="ГОСТ 2.105, раздел 5.4"
-                ))
+            if end_pos < len(text) and text[end_pos:end_pos + self.TITLE_CHARS].strip() == "":
+                errors.append(self.untitled_error.error(full_match, page=document.page_at(match.start())))
+
+        status = CheckStatus.FAILED if errors else CheckStatus.PASSED
+        return self._create_result(status, errors)
+
+    def begin(self, document: Document):
+        self._document = document
+        self._window = TextWindow()
+        self._errors = []
+
+    def feed(self, chunk: TextChunk):
+        self._window.push(chunk)
+        self._scan()
+        self._window.release()
+
+    def finish(self) -> CheckResult:
+        self._window.final = True
+        self._scan()
+        errors, self._window, self._errors = self._errors, None, None
 
         status = CheckStatus.FAILED if errors else CheckStatus.PASSED
-        return self._create_result(status, errors)
\ No newline at end of file
+        return self._create_result(status, errors)
+
+    def _scan(self):
+        window = self._window
+        text = window.text
+        for match in window.find(self.MENTION, after=self.TITLE_CHARS):
+            end_pos = match.end()
+            if end_pos < len(text) and text[end_pos:end_pos + self.TITLE_CHARS].strip() == "":
+                self._errors.append(self.untitled_error.error(
+                    match.group(0), page=self._document.page_at(window.start + match.start())))
+
+    def is_affected(self, change: DocumentChange) -> bool:
+        # Номер и наименование могут быть через несколько пустых строк от слова "Рисунок"
+        return change.mentions(self.TRIGGER) or change.reaches(self.TRIGGER, after=self.TITLE_CHARS)
@@ -1,12 +1,19 @@
 from pathlib import Path
 
 from src.checks.base_checker import BaseCheck
-from src.models import Document, CheckResult, CheckStatus, ValidationError
+from src.models import Document, CheckResult, CheckStatus, TextChunk, ValidationError
 
 
 class FormatCheck(BaseCheck):
     """Проверка наличия обязательных разделов в документе"""
 
+    # Текст не нужен: проверяются только путь и размер файла
+    streaming = True
+    # Раздел правил, от которого зависит результат
+    RULE_SECTIONS = ('system',)
+    # Результат зависит от файла на диске, а не от текста; проверка дешёвая
+    cacheable = False
+
     def __init__(self):
         super().__init__(
             check_id="required_format",
@@ -17,11 +24,11 @@ class FormatCheck(BaseCheck):
         """Загружает правила для проверки из конфига"""
         super().set_rules(rules)
         # Извлекаем конкретные правила для этой проверки
-        if rules and 'system' in rules:
-            self.required_format = rules.get('system', {
-                'allowed_formats': [".docx", ".pdf", ".rtf"],
-                'max_file_size_mb': 50
-            })
+        if self.rules:
+            self.required_format = {
+                'allowed_formats': list(self.rules.system.allowed_formats),
+                'max_file_size_mb': self.rules.system.max_file_size_mb
+            }
 
 
     def run(self, document: Document) -> CheckResult:
@@ -70,4 +77,13 @@ class FormatCheck(BaseCheck):
                 errors.append(error)
 
         status = CheckStatus.FAILED if errors else CheckStatus.PASSED
-        return self._create_result(status, errors)
\ No newline at end of file
+        return self._create_result(status, errors)
+
+    def begin(self, document: Document):
+        self._document = document
+
+    def feed(self, chunk: TextChunk):
+        pass
+
+    def finish(self) -> CheckResult:
+        return self.run(self._document)
@@ -1,32 +1,59 @@
 import re
-from src.checks.base_checker import BaseCheck
-from src.models import Document, CheckResult, CheckStatus, ValidationError
+from src.checks.base_checker import BaseCheck, TextWindow
+from src.models import Document, DocumentChange, CheckResult, CheckStatus, ReferenceIndex, TextChunk
+from src.utils.logger import get_logger
+
+logger = get_logger('checks.formulas')
 
 
 class FormulaCheck(BaseCheck):
     """Проверка 6: Оформление формул"""
 
+    # Номер формулы в любых скобках и ссылка на неё начинаются так
+    TRIGGER = re.compile(r'[(\[{]\d')
+    # Контекст формулы - до 30 символов с каждой стороны от номера
+    CONTEXT_CHARS = 30
+    # Номер формулы по ГОСТ - только круглые скобки
+    GOST_PATTERN = re.compile(r'\((\d+(\.\d+)*)\)')
+    # Номер в неправильных скобках; контекст - 20 символов с каждой стороны
+    WRONG_BRACKETS = (
+        (re.compile(r'\[(\d+(\.\d+)*)\]'), 'квадратных'),
+        (re.compile(r'\{(\d+(\.\d+)*)\}'), 'фигурных'),
+    )
+
+    streaming = True
+    # Раздел правил, от которого зависит результат
+    RULE_SECTIONS = ('formulas',)
+
     def __init__(self):
         super().__init__(
             check_id="formulas",
             check_name="Оформление формул"
         )
         # Значения по умолчанию
-        self.numbering_pattern = r'^\((\d+(\.\d+)*)\)$'
+        self.numbering_pattern = re.compile(r'^\((\d+(\.\d+)*)\)$')
         self.require_reference = True
 
+        # Шаблоны ошибок: одни на все формулы
+        self.brackets_error = self._template(
+            "Формула {0} в {1} скобках",
+            "Исправьте на круглые скобки: ({2})",
+            "ГОСТ 2.105, раздел 5.6")
+        self.missing_reference_error = self._template(
+            "Не найдена ссылка на формулу {0}",
+            "Добавьте в текст: '... по формуле {0} ...'",
+            "ГОСТ 2.105, раздел 5.6")
+        self.text_reference_error = self._template(
+            "Отсутствует ссылка на формулу ({0}) в тексте",
+            "Добавьте ссылку: '... по формуле ({0}) ...'",
+            "ГОСТ 2.105, раздел 5.6")
+
     def set_rules(self, rules: dict):
         """Загружает правила для проверки формул из конфига"""
         super().set_rules(rules)
-        # Безопасное извлечение правил
-        self.numbering_pattern = self._safe_get_rule(
-            'gost_2_105.formulas.numbering_pattern',
-            self.numbering_pattern
-        )
-        self.require_reference = self._safe_get_rule(
-            'gost_2_105.formulas.require_reference',
-            self.require_reference
-        )
+        if self.rules:
+            self.numbering_pattern = self.rules.formulas.numbering_pattern
+            self.require_reference = self.rules.formulas.require_reference
 
     def run(self, document: Document) -> CheckResult:
         """Улучшенная проверка формул с фильтрацией ложных срабатываний"""
@@ -34,103 +61,133 @@ class FormulaCheck(BaseCheck):
         text = document.raw_text
 
         # 1. Ищем формулы по строгому ГОСТ-паттерну
-        gost_formula_pattern = r'\((\d+(\.\d+)*)\)'  # Только круглые скобки
-        gost_matches = list(re.finditer(gost_formula_pattern, text))
+        gost_matches = list(self.GOST_PATTERN.finditer(text))
 
         # 2. Фильтруем ложные срабатывания
         real_formulas = []
         for match in gost_matches:
-            formula = match.group(0)
             position = match.start()
-
             # Контекст вокруг формулы
-            start_ctx = max(0, position - 30)
-            end_ctx = min(len(text), position + 30)
-            context = text[start_ctx:end_ctx].lower()
-
-            # ПРИЗНАКИ РЕАЛЬНОЙ ФОРМУЛЫ:
-            # - Упоминание "формула" рядом
-            # - Математические символы вокруг: =, +, -, *, /, ^, Σ, ∫
-            # - Наличие переменных: x, y, z, a, b, c
-            # - Отсутствие слов "год", "рисунок", "страница", "пункт"
-
-            is_likely_formula = (
-                    'формул' in context or
-                    any(math_char in context for math_char in ['=', '+', '-', '*', '/', '^'])
-            )
-
-            is_likely_false_positive = any(
-                false_word in context for false_word in ['год', 'рис', 'стр', 'пункт', 'см.']
-            )
-
-            if is_likely_formula and not is_likely_false_positive:
+            context = text[max(0, position - 30):min(len(text), position + 30)].lower()
+            if self._is_real_formula(context):
                 real_formulas.append({
-                    'formula': formula,
+                    'formula': match.group(0),
                     'number': match.group(1),
                     'position': position,
                     'context': context
                 })
 
-        print(f"[FormulaCheck] Найдено формул по ГОСТ: {len(gost_matches)}")
-        print(f"[FormulaCheck] Отфильтровано реальных формул: {len(real_formulas)}")
+        logger.debug("[FormulaCheck] Найдено формул по ГОСТ: %d", len(gost_matches))
+        logger.debug("[FormulaCheck] Отфильтровано реальных формул: %d", len(real_formulas))
 
         # 3. Проверяем формулы в неправильных скобках
-        wrong_brackets_patterns = [
-            (r'\[(\d+(\.\d+)*)\]', 'квадратных'),
-            (r'\{(\d+(\.\d+)*)\}', 'фигурных')
-        ]
-
-        for pattern, bracket_type in wrong_brackets_patterns:
-            for match in re.finditer(pattern, text):
+        for pattern, bracket_type in self.WRONG_BRACKETS:
+            for match in pattern.finditer(text):
                 # Проверяем контекст - это действительно формула?
                 context_start = max(0, match.start() - 20)
                 context_end = min(len(text), match.end() + 20)
                 context = text[context_start:context_end].lower()
 
                 if 'формул' in context or 'уравнен' in context:
-                    errors.append(ValidationError(
-                        check_name=self.check_name,
-                        description=f"Формула {match.group(0)} в {bracket_type} скобках",
-                        recommendation=f"Исправьте на круглые скобки: ({match.group(1)})",
-                        gost_reference="ГОСТ 2.105, раздел 5.6"
-                    ))
-
-        # 4. Проверяем ссылки для реальных формул
-        for formula_info in real_formulas:
-            formula_num = formula_info['number']
-            ref_patterns = [
-                rf'формул[аеуы]\s*\({formula_num}\)',
-                rf'по формуле\s*\({formula_num}\)',
-                rf'ф-ла\s*\({formula_num}\)',
-                rf'ф\.\s*\({formula_num}\)',
-                rf'\(\({formula_num}\)\)',  # Двойные скобки - частый стиль ссылок
-            ]
+                    errors.append(self.brackets_error.error(match.group(0), bracket_type, match.group(1),
+                                                            page=document.page_at(match.start())))
 
-            ref_found = False
-            for pattern in ref_patterns:
-                if re.search(pattern, text, re.IGNORECASE):
-                    ref_found = True
-                    break
+        # 4. Проверяем ссылки для реальных формул:
+        # "формула (X)", "по формуле (X)", "ф-ла (X)", "ф. (X)", "((X))"
+        references = document.get_references()
+        for formula_info in real_formulas:
+            formula_key = references.formula_key(formula_info['number'])
 
-            if not ref_found:
+            if not references.mentions('formula', formula_key):
                 # Проверяем, есть ли хоть какая-то ссылка
-                simple_ref = re.search(rf'\({formula_num}\)', text)
-                if simple_ref and simple_ref.start() != formula_info['position']:
+                simple_refs = references.mentions('number', formula_key)
+                if simple_refs and simple_refs[0] != formula_info['position']:
                     # Есть упоминание, но не в форме "формула (X)"
                     pass  # Не считаем ошибкой - возможно, контекст иной
                 else:
-                    errors.append(ValidationError(
-                        check_name=self.check_name,
-                        description=f"Не найдена ссылка на формулу {formula_info['formula']}",
-                        recommendation=f"Добавьте в текст: '... по формуле {formula_info['formula']} ...'",
-                        gost_reference="ГОСТ 2.105, раздел 5.6"
-                    ))
+                    errors.append(self.missing_reference_error.error(
+                        formula_info['formula'], page=document.page_at(formula_info['position'])))
+
+        logger.debug("[FormulaCheck] Итоговое количество ошибок: %d", len(errors))
+
+        status = CheckStatus.FAILED if errors else CheckStatus.PASSED
+        return self._create_result(status, errors)
 
-        print(f"[FormulaCheck] Итоговое количество ошибок: {len(errors)}")
+    @staticmethod
+    def _is_real_formula(context: str) -> bool:
+        """
+        Признаки реальной формулы в контексте номера (в нижнем регистре):
+        упоминание "формула" или математические символы рядом и
+        отсутствие слов "год", "рисунок", "страница", "пункт"
+        """
+        is_likely_formula = (
+                'формул' in context or
+                any(math_char in context for math_char in ['=', '+', '-', '*', '/', '^'])
+        )
+        is_likely_false_positive = any(
+            false_word in context for false_word in ['год', 'рис', 'стр', 'пункт', 'см.']
+        )
+        return is_likely_formula and not is_likely_false_positive
+
+    def begin(self, document: Document):
+        self._document = document
+        self._window = TextWindow(before=self.CONTEXT_CHARS)
+        self._found = 0                                   # Номеров по ГОСТ
+        self._formulas = []                               # (формула, номер, смещение)
+        self._bracket_errors = [[] for _ in self.WRONG_BRACKETS]
+        self._references = set()                          # Ключи ссылок "формула (X)"
+        self._first_mentions = {}                         # Ключ -> первое "(X)"
+
+    def feed(self, chunk: TextChunk):
+        self._window.push(chunk)
+        self._scan()
+        self._window.release()
+
+    def finish(self) -> CheckResult:
+        self._window.final = True
+        self._scan()
+        logger.debug("[FormulaCheck] Найдено формул по ГОСТ: %d", self._found)
+        logger.debug("[FormulaCheck] Отфильтровано реальных формул: %d", len(self._formulas))
+
+        errors = [error for bracket_errors in self._bracket_errors for error in bracket_errors]
+        for formula, number, position in self._formulas:
+            formula_key = ReferenceIndex.formula_key(number)
+            if formula_key not in self._references and self._first_mentions.get(formula_key) in (None, position):
+                errors.append(self.missing_reference_error.error(formula, page=self._document.page_at(position)))
+        logger.debug("[FormulaCheck] Итоговое количество ошибок: %d", len(errors))
+        self._window = self._formulas = self._bracket_errors = self._references = self._first_mentions = None
 
         status = CheckStatus.FAILED if errors else CheckStatus.PASSED
         return self._create_result(status, errors)
 
+    def _scan(self):
+        window = self._window
+        text, start = window.text, window.start
+
+        for match in window.find(self.GOST_PATTERN, after=self.CONTEXT_CHARS):
+            self._found += 1
+            position = match.start()
+            context = text[max(0, position - 30):position + 30].lower()
+            if self._is_real_formula(context):
+                self._formulas.append((match.group(0), match.group(1), start + position))
+
+        for (pattern, bracket_type), bracket_errors in zip(self.WRONG_BRACKETS, self._bracket_errors):
+            for match in window.find(pattern, after=20):
+                context = text[max(0, match.start() - 20):match.end() + 20].lower()
+                if 'формул' in context or 'уравнен' in context:
+                    bracket_errors.append(self.brackets_error.error(
+                        match.group(0), bracket_type, match.group(1), page=self._document.page_at(start + match.start())))
+
+        for match in window.find(ReferenceIndex.FORMULA_REFERENCE):
+            self._references.add(ReferenceIndex.formula_key(match.group(1) or match.group(2)))
+        for match in window.find(ReferenceIndex.NUMBER_MENTION):
+            self._first_mentions.setdefault(ReferenceIndex.formula_key(match.group(1)), start + match.start())
+
+    def is_affected(self, change: DocumentChange) -> bool:
+        # Правка в контексте номера меняет признаки реальной формулы
+        return change.mentions(self.TRIGGER, context_chars=self.CONTEXT_CHARS)
+
+
     def _check_formula_references(self, text: str, formulas: list, errors: list):
         """Проверяет наличие ссылок на формулы в тексте"""
         for formula in formulas:
@@ -148,9 +205,4 @@ class FormulaCheck(BaseCheck):
                     break
 
             if not ref_found:
-                errors.append(ValidationError(
-                    check_name=self.check_name,
-                    description=f"Отсутствует ссылка на формулу ({formula['number']}) в тексте",
-                    recommendation=f"Добавьте ссылку: '... по формуле ({formula['number']}) ...'",
-                    gost_reference="ГОСТ 2.105, раздел 5.6"
-                ))
\ No newline at end of file
+                errors.append(self.text_reference_error.error(formula['number']))
\ No newline at end of file
@@ -1,65 +1,103 @@
 import re
-from src.checks.base_checker import BaseCheck
-from src.models import Document, CheckResult, CheckStatus, ValidationError
+from src.checks.base_checker import BaseCheck, TextWindow
+from src.models import Document, DocumentChange, CheckResult, CheckStatus, TextChunk
 
 
 class PageNumberingCheck(BaseCheck):
     """Проверка 3: Нумерация страниц"""
 
+    # Каждое упоминание страницы содержит одно из этих слов или тире
+    TRIGGER = re.compile(r'страниц|стр\.|—')
+    # Упоминания страниц и сколько слов может занять начало упоминания
+    PAGE_PATTERNS = (
+        (re.compile(r'страниц[ауе]\s+(\d+)'), 1),  # "странице 5"
+        (re.compile(r'стр\.\s*(\d+)'), 1),  # "стр. 5"
+        (re.compile(r'—\s*(\d+)\s*—'), 2),  # "— 5 —" (типично для колонтитулов)
+    )
+
+    streaming = True
+    # Правил из конфига проверка не использует
+    RULE_SECTIONS = ()
+
     def __init__(self):
         super().__init__(
             check_id="page_numbering",
             check_name="Нумерация страниц"
         )
+        # Шаблоны ошибок: одни на все упоминания страниц
+        self.first_pages_error = self._template(
+            "Упоминание страницы {0} (первые 2 страницы не должны нумероваться)",
+            "Уберите нумерацию с титульного листа и содержания",
+            "ГОСТ 2.105, раздел 6.1")
+        self.sequence_error = self._template(
+            "Нарушена сквозная нумерация: {0} → {1}",
+            "Убедитесь в сквозной последовательной нумерации",
+            "ГОСТ 2.105, раздел 6.1")
 
     def run(self, document: Document) -> CheckResult:
         """
         Проверка сквозной нумерации,
         отсутствия номеров на титульном листе и содержании
         """
-        errors = []
-        text = document.raw_text
-
         # Эвристика: ищем упоминания страниц
-        page_patterns = [
-            r'страниц[ауе]\s+(\d+)',  # "странице 5"
-            r'стр\.\s*(\d+)',  # "стр. 5"
-            r'—\s*(\d+)\s*—',  # "— 5 —" (типично для колонтитулов)
-        ]
-
         page_numbers = []
-        for pattern in page_patterns:
-            for match in re.finditer(pattern, text):
+        for pattern, _ in self.PAGE_PATTERNS:
+            for match in pattern.finditer(document.raw_text):
                 try:
-                    page_num = int(match.group(1))
-                    page_numbers.append({
-                        'number': page_num,
-                        'context': text[max(0, match.start() - 20):match.end() + 20]
-                    })
+                    page_numbers.append({'number': int(match.group(1)), 'position': match.start()})
                 except ValueError:
                     continue
+        return self._result(document, page_numbers)
+
+    def begin(self, document: Document):
+        self._document = document
+        self._window = TextWindow()
+        # Упоминания по шаблонам: в итоге идут в том же порядке, что в run()
+        self._mentions = [[] for _ in self.PAGE_PATTERNS]
+
+    def feed(self, chunk: TextChunk):
+        self._window.push(chunk)
+        self._scan()
+        self._window.release()
+
+    def finish(self) -> CheckResult:
+        self._window.final = True
+        self._scan()
+        page_numbers = [page_info for mentions in self._mentions for page_info in mentions]
+        self._window = self._mentions = None
+        return self._result(self._document, page_numbers)
+
+    def _scan(self):
+        window = self._window
+        for (pattern, tokens), mentions in zip(self.PAGE_PATTERNS, self._mentions):
+            for match in window.find(pattern, tokens=tokens):
+                try:
+                    mentions.append({'number': int(match.group(1)), 'position': window.start + match.start()})
+                except ValueError:
+                    continue
+
+    def _result(self, document: Document, page_numbers: list) -> CheckResult:
+        """Ошибки по упоминаниям страниц [{'number', 'position'}]"""
+        errors = []
 
         # Проверяем, что нет упоминания первых страниц (титульный, содержание)
         for page_info in page_numbers:
             if page_info['number'] <= 2:  # Первые 2 страницы не нумеруются
-                errors.append(ValidationError(
-                    check_name=self.check_name,
-                    description=f"Упоминание страницы {page_info['number']} (первые 2 страницы не должны нумероваться)",
-                    recommendation="Уберите нумерацию с титульного листа и содержания",
-                    gost_reference="ГОСТ 2.105, раздел 6.1"
-                ))
+                errors.append(self.first_pages_error.error(page_info['number'],
+                                                           page=document.page_at(page_info['position'])))
 
         # Проверяем последовательность (если нашли несколько номеров)
         if len(page_numbers) > 1:
-            nums = sorted([p['number'] for p in page_numbers])
-            for i in range(1, len(nums)):
-                if nums[i] != nums[i - 1] + 1:
-                    errors.append(ValidationError(
-                        check_name=self.check_name,
-                        description=f"Нарушена сквозная нумерация: {nums[i - 1]} → {nums[i]}",
-                        recommendation="Убедитесь в сквозной последовательной нумерации",
-                        gost_reference="ГОСТ 2.105, раздел 6.1"
-                    ))
+            # Ошибка относится к странице, где упомянут следующий номер
+            ordered = sorted(page_numbers, key=lambda p: p['number'])
+            for previous, current in zip(ordered, ordered[1:]):
+                if current['number'] != previous['number'] + 1:
+                    errors.append(self.sequence_error.error(previous['number'], current['number'],
+                                                            page=document.page_at(current['position'])))
 
         status = CheckStatus.FAILED if errors else CheckStatus.PASSED
-        return self._create_result(status, errors)
\ No newline at end of file
+        return self._create_result(status, errors)
+
+    def is_affected(self, change: DocumentChange) -> bool:
+        # "— 5 —" может занимать несколько строк, номер - отдельную строку
+        return change.mentions(self.TRIGGER)
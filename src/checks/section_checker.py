@@ -1,10 +1,14 @@
 from src.checks.base_checker import BaseCheck
-from src.models import Document, CheckResult, CheckStatus, ValidationError
+from src.models import Document, DocumentChange, CheckResult, CheckStatus, TextChunk, ValidationError
 
 
 class SectionCheck(BaseCheck):
     """Проверка 1: Наличие и порядок обязательных разделов"""
 
+    streaming = True
+    # Раздел правил, от которого зависит результат
+    RULE_SECTIONS = ('required_sections',)
+
     def __init__(self):
         super().__init__(
             check_id="required_sections",
@@ -16,27 +20,54 @@ class SectionCheck(BaseCheck):
     def set_rules(self, rules: dict):
         """Загружает правила для проверки из конфига"""
         super().set_rules(rules)
-        # Безопасное извлечение правил с fallback на значения по умолчанию
-        self.required_sections = self._safe_get_rule(
-            'gost_2_105.required_sections',
-            self.required_sections
-        )
+        if self.rules:
+            self.required_sections = list(self.rules.required_sections)
 
     def run(self, document: Document) -> CheckResult:
         """Проверяет наличие обязательных разделов в нужной последовательности"""
-        errors = []
-        text = document.raw_text.lower()
-        lines = document.raw_text.split('\n')
+        index = document.get_index()
 
         # Проверяем наличие каждого раздела
         found_sections = {}
         for section in self.required_sections:
-            if section.lower() in text:
+            section_lower = section.lower()
+            if section_lower in index.lower_text:
                 # Находим позицию раздела
-                for i, line in enumerate(lines):
-                    if section.lower() in line.lower():
+                for i, line in enumerate(index.lower_lines):
+                    if section_lower in line:
                         found_sections[section] = i
                         break
+        return self._result(found_sections, document.page_at_line)
+
+    def begin(self, document: Document):
+        self._document = document
+        # Ещё не найденные разделы в порядке конфига: раздел -> название в нижнем регистре
+        self._pending = {section: section.lower() for section in self.required_sections}
+        self._found = {}          # Раздел -> номер первой строки с ним
+        self._line_offsets = {}   # Номер строки -> смещение (только для найденных)
+
+    def feed(self, chunk: TextChunk):
+        if not self._pending:
+            return
+        for i, offset, line in chunk.numbered():
+            line_lower = line.lower()
+            for section, section_lower in list(self._pending.items()):
+                if section_lower in line_lower:
+                    self._found[section] = i
+                    self._line_offsets[i] = offset
+                    del self._pending[section]
+            if not self._pending:
+                break
+
+    def finish(self) -> CheckResult:
+        offsets, document = self._line_offsets, self._document
+        result = self._result(self._found, lambda line: document.page_at(offsets[line]))
+        self._pending = self._found = self._line_offsets = None
+        return result
+
+    def _result(self, found_sections: dict, page_at_line) -> CheckResult:
+        """Ошибки по первым строкам найденных разделов; page_at_line - страница строки"""
+        errors = []
 
         # Проверяем, все ли разделы найдены
         for section in self.required_sections:
@@ -58,10 +89,16 @@ class SectionCheck(BaseCheck):
                     errors.append(ValidationError(
                         check_name=self.check_name,
                         description=f"Нарушен порядок разделов. '{found_name}' найден до '{expected_name}'",
+                        page=page_at_line(pos),
                         recommendation=f"Расположите разделы в порядке: {', '.join(self.required_sections)}",
                         gost_reference="ГОСТ 2.105, раздел 4.1"
                     ))
                     break
 
         status = CheckStatus.FAILED if errors else CheckStatus.PASSED
-        return self._create_result(status, errors)
\ No newline at end of file
+        return self._create_result(status, errors)
+
+    def is_affected(self, change: DocumentChange) -> bool:
+        # Важна только первая строка с каждым разделом; порядок остальных строк не меняется
+        names = [section.lower() for section in self.required_sections]
+        return any(name in window.lower() for window in change.windows(context_lines=0) for name in names)
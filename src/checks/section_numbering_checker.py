@@ -1,73 +1,86 @@
 # src/checks/section_numbering_checker.py
 import re
 from src.checks.base_checker import BaseCheck
-from src.models import Document, CheckResult, CheckStatus, ValidationError
+from src.core.scanner import scan_heading
+from src.models import Document, DocumentChange, CheckResult, CheckStatus, TextChunk
 
 
 class SectionNumberingCheck(BaseCheck):
     """Проверка 2: Нумерация разделов и подразделов"""
 
+    streaming = True
+    # Раздел правил, от которого зависит результат
+    RULE_SECTIONS = ('section_numbering',)
+
     def __init__(self):
         super().__init__(
             check_id="section_numbering",
             check_name="Нумерация разделов и подразделов"
         )
         # ЗНАЧЕНИЕ ПО УМОЛЧАНИЮ - строка, а не None!
-        self.numbering_pattern = r'^\d+(\.\d+)*\s+.+$'
+        self.numbering_pattern = re.compile(r'^\d+(\.\d+)*\s+.+$')
         self.max_level = 3
 
+        # Шаблоны ошибок: одни на все разделы
+        self.format_error = self._template(
+            "Некорректный формат нумерации раздела: '{0}'",
+            "Используйте формат: '1. Название', '1.1. Подраздел' (арабские цифры)",
+            "ГОСТ 2.105, раздел 4.2")
+        self.depth_error = self._template(
+            "Превышена максимальная глубина вложенности ({1} > {2}): '{0}'",
+            "Упростите структуру, максимальный уровень: {2}",
+            "ГОСТ 2.105, раздел 4.2")
+
     def set_rules(self, rules: dict):
         """Загружает правила для проверки из конфига"""
         super().set_rules(rules)
-        # Безопасное извлечение с fallback на значения по умолчанию
-        self.numbering_pattern = self._safe_get_rule(
-            'gost_2_105.section_numbering.pattern',
-            self.numbering_pattern
-        )
-        self.max_level = self._safe_get_rule(
-            'gost_2_105.section_numbering.max_level',
-            self.max_level
-        )
+        if self.rules:
+            # Паттерн уже скомпилирован и проверен при загрузке конфига
+            self.numbering_pattern = self.rules.section_numbering.pattern
+            self.max_level = self.rules.section_numbering.max_level
 
     def run(self, document: Document) -> CheckResult:
         """Проверяет сквозную нумерацию арабскими цифрами (1, 1.1, 1.1.1)"""
         errors = []
 
-        # Проверяем, что pattern является строкой
-        if not isinstance(self.numbering_pattern, str):
-            return self._create_result(CheckStatus.ERROR, [ValidationError(
-                check_name=self.check_name,
-                description="Паттерн для проверки нумерации не является строкой",
-                recommendation="Проверьте конфигурационный файл",
-                gost_reference="ГОСТ 2.105"
-            )])
-
         # Анализируем разделы, найденные парсером
         for section in document.sections:
             title = section.get('title', '')
-
             # Пропускаем разделы без нумерации (например, "Введение")
-            if not re.match(r'^\d', title):
-                continue
+            if re.match(r'^\d', title):
+                self._check_title(title, document.page_at_line(section['line_number']), errors)
 
-            # Проверяем соответствие паттерну ГОСТ
-            if not re.match(self.numbering_pattern, title):
-                errors.append(ValidationError(
-                    check_name=self.check_name,
-                    description=f"Некорректный формат нумерации раздела: '{title}'",
-                    recommendation="Используйте формат: '1. Название', '1.1. Подраздел' (арабские цифры)",
-                    gost_reference="ГОСТ 2.105, раздел 4.2"
-                ))
+        status = CheckStatus.FAILED if errors else CheckStatus.PASSED
+        return self._create_result(status, errors)
+
+    def begin(self, document: Document):
+        self._document = document
+        self._errors = []
 
-            # Проверяем уровень вложенности
-            level = title.count('.') + 1 if '.' in title else 1
-            if level > self.max_level:
-                errors.append(ValidationError(
-                    check_name=self.check_name,
-                    description=f"Превышена максимальная глубина вложенности ({level} > {self.max_level}): '{title}'",
-                    recommendation=f"Упростите структуру, максимальный уровень: {self.max_level}",
-                    gost_reference="ГОСТ 2.105, раздел 4.2"
-                ))
+    def feed(self, chunk: TextChunk):
+        # Заголовки распознаются по строке так же, как сканером парсера
+        for _, offset, line in chunk.numbered():
+            heading = scan_heading(line)
+            if heading and re.match(r'^\d', heading[1]):
+                self._check_title(heading[1], self._document.page_at(offset), self._errors)
 
+    def finish(self) -> CheckResult:
+        errors, self._errors = self._errors, None
         status = CheckStatus.FAILED if errors else CheckStatus.PASSED
-        return self._create_result(status, errors)
\ No newline at end of file
+        return self._create_result(status, errors)
+
+    def _check_title(self, title: str, page, errors: list):
+        """Формат номера и глубина вложенности заголовка"""
+        # Проверяем соответствие паттерну ГОСТ
+        if not self.numbering_pattern.match(title):
+            errors.append(self.format_error.error(title, page=page))
+
+        # Проверяем уровень вложенности
+        level = title.count('.') + 1 if '.' in title else 1
+        if level > self.max_level:
+            errors.append(self.depth_error.error(title, level, self.max_level, page=page))
+
+    def is_affected(self, change: DocumentChange) -> bool:
+        # Проверка читает только названия разделов, найденные парсером
+        return ([section.get('title', '') for section in change.old.sections]
+                != [section.get('title', '') for section in change.new.sections])
@@ -1,31 +1,51 @@
 # src/checks/table_checker.py
 import re
-from src.checks.base_checker import BaseCheck
-from src.models import Document, CheckResult, CheckStatus, ValidationError
+from src.checks.base_checker import BaseCheck, TextWindow
+from src.models import Document, DocumentChange, CheckResult, CheckStatus, ReferenceIndex, TextChunk
 
 
 class TableCheck(BaseCheck):
     """Проверка 4: Оформление таблиц"""
 
+    # Подписи и ссылки на таблицы содержат слово "таблица"
+    TRIGGER = re.compile(r'(?i)таблица')
+    # Упоминание таблицы с номером
+    MENTION = re.compile(r'(?i)таблица\s+\d+(\.\d+)*')
+    # Сколько символов после номера занимает начало наименования
+    TITLE_CHARS = 5
+
+    streaming = True
+    # Раздел правил, от которого зависит результат
+    RULE_SECTIONS = ('tables',)
+
     def __init__(self):
         super().__init__(
             check_id="table_format",
             check_name="Оформление таблиц"
         )
         # Значения по умолчанию
-        self.caption_pattern = r'^Таблица\s+\d+(\.\d+)*'
+        self.caption_pattern = re.compile(r'^Таблица\s+\d+(\.\d+)*', re.IGNORECASE)
         self.require_caption = True
 
+        # Шаблоны ошибок: одни на все найденные таблицы
+        self.caption_error = self._template(
+            "Некорректный формат подписи таблицы: '{0}'",
+            "Используйте формат: 'Таблица 1.1' или 'Таблица 1'",
+            "ГОСТ 2.105, раздел 5.3")
+        self.untitled_error = self._template(
+            "Таблица без наименования: '{0}'",
+            "Добавьте наименование после номера таблицы через тире или двоеточие",
+            "ГОСТ 2.105, раздел 5.3")
+        self.reference_error = self._template(
+            "Отсутствует ссылка на таблицу: '{0}'",
+            "Добавьте в текст ссылку на таблицу: '... в {0} ...'",
+            "ГОСТ 2.105, раздел 5.3")
+
     def set_rules(self, rules: dict):
         super().set_rules(rules)
-        self.caption_pattern = self._safe_get_rule(
-            'gost_2_105.tables.caption_pattern',
-            self.caption_pattern
-        )
-        self.require_caption = self._safe_get_rule(
-            'gost_2_105.tables.require_caption',
-            self.require_caption
-        )
+        if self.rules:
+            self.caption_pattern = self.rules.tables.caption_pattern
+            self.require_caption = self.rules.tables.require_caption
 
     def run(self, document: Document) -> CheckResult:
         """Проверяет формат подписи таблиц, наличие наименования и ссылок"""
@@ -33,8 +53,7 @@ class TableCheck(BaseCheck):
         text = document.raw_text
 
         # Ищем все упоминания таблиц
-        table_pattern = r'(?i)таблица\s+\d+(\.\d+)*'
-        table_matches = list(re.finditer(table_pattern, text))
+        table_matches = list(self.MENTION.finditer(text))
 
         if not table_matches:
             return self._create_result(CheckStatus.PASSED)
@@ -42,39 +61,71 @@ class TableCheck(BaseCheck):
         # Проверяем каждую найденную таблицу
         for match in table_matches:
             table_text = match.group(0)
+            page = document.page_at(match.start())
 
             # Проверяем формат подписи
-            if not re.match(self.caption_pattern, table_text, re.IGNORECASE):
-                errors.append(ValidationError(
-                    check_name=self.check_name,
-                    description=f"Некорректный формат подписи таблицы: '{table_text}'",
-                    recommendation="Используйте формат: 'Таблица 1.1' или 'Таблица 1'",
-                    gost_reference="ГОСТ 2.105, раздел 5.3"
-                ))
+            if not self.caption_pattern.match(table_text):
+                errors.append(self.caption_error.error(table_text, page=page))
 
             # Проверяем наличие наименования после номера
             end_pos = match.end()
-            next_chars = text[end_pos:end_pos + 5].strip()
+            next_chars = text[end_pos:end_pos + self.TITLE_CHARS].strip()
             if self.require_caption and (not next_chars or next_chars.startswith(('.', ','))):
-                errors.append(ValidationError(
-                    check_name=self.check_name,
-                    description=f"Таблица без наименования: '{table_text}'",
-                    recommendation="Добавьте наименование после номера таблицы через тире или двоеточие",
-                    gost_reference="ГОСТ 2.105, раздел 5.3"
-                ))
+                errors.append(self.untitled_error.error(table_text, page=page))
 
         # Проверяем наличие ссылок на таблицы в тексте (упрощённо)
+        references = document.get_references()
         for match in table_matches:
             table_ref = match.group(0)
-            # Ищем ссылки вида "таблице 1.1" или "см. таблицу 1.1"
-            ref_pattern = rf'(?:см\.|в|по|из)\s+{re.escape(table_ref)}'
-            if not re.search(ref_pattern, text, re.IGNORECASE):
-                errors.append(ValidationError(
-                    check_name=self.check_name,
-                    description=f"Отсутствует ссылка на таблицу: '{table_ref}'",
-                    recommendation=f"Добавьте в текст ссылку на таблицу: '... в {table_ref} ...'",
-                    gost_reference="ГОСТ 2.105, раздел 5.3"
-                ))
+            # Ищем ссылки вида "в таблица 1.1" или "см. таблица 1.1"
+            if not references.mentions('table', references.table_key(table_ref)):
+                errors.append(self.reference_error.error(table_ref, page=document.page_at(match.start())))
 
         status = CheckStatus.FAILED if errors else CheckStatus.PASSED
-        return self._create_result(status, errors)
\ No newline at end of file
+        return self._create_result(status, errors)
+
+    def begin(self, document: Document):
+        self._document = document
+        self._window = TextWindow()
+        self._tables = []          # (упоминание, страница)
+        self._references = set()   # Ключи table_key, на которые есть ссылки
+        self._errors = []
+
+    def feed(self, chunk: TextChunk):
+        self._window.push(chunk)
+        self._scan()
+        self._window.release()
+
+    def finish(self) -> CheckResult:
+        self._window.final = True
+        self._scan()
+        errors = self._errors
+        for table_ref, page in self._tables:
+            if ReferenceIndex.table_key(table_ref) not in self._references:
+                errors.append(self.reference_error.error(table_ref, page=page))
+        self._window = self._tables = self._references = self._errors = None
+
+        status = CheckStatus.FAILED if errors else CheckStatus.PASSED
+        return self._create_result(status, errors)
+
+    def _scan(self):
+        """Упоминания и ссылки в окне: ошибки подписи сразу, ссылки - в конце"""
+        window = self._window
+        for match in window.find(self.MENTION, after=self.TITLE_CHARS):
+            table_text = match.group(0)
+            page = self._document.page_at(window.start + match.start())
+            if not self.caption_pattern.match(table_text):
+                self._errors.append(self.caption_error.error(table_text, page=page))
+            next_chars = window.text[match.end():match.end() + self.TITLE_CHARS].strip()
+            if self.require_caption and (not next_chars or next_chars.startswith(('.', ','))):
+                self._errors.append(self.untitled_error.error(table_text, page=page))
+            self._tables.append((table_text, page))
+
+        # "в таблица 1" - предлог и слово могут стоять в разных блоках
+        for match in window.find(ReferenceIndex.TABLE_REFERENCE, tokens=2):
+            self._references.update(ReferenceIndex.table_reference_keys(match))
+
+    def is_affected(self, change: DocumentChange) -> bool:
+        # Предлог ссылки может быть на соседней непустой строке, номер подписи и
+        # начало наименования - через несколько пустых строк от слова "Таблица"
+        return change.mentions(self.TRIGGER) or change.reaches(self.TRIGGER, after=self.TITLE_CHARS)
@@ -1,6 +1,19 @@
-from .parser import Parser
-from .validator import Validator
-from .reporter import Reporter
+# Классы импортируются при первом обращении: Validator и Parser тянут
+# модели, сканер и FileReader, которые не нужны, например, для --help
+_LAZY = {
+    'Parser': 'src.core.parser',
+    'Validator': 'src.core.validator',
+    'Reporter': 'src.core.reporter',
+    'IncrementalValidator': 'src.core.incremental',
+    'ProfileSet': 'src.core.profiles',
+    'JobQueue': 'src.core.job_queue',
+}
 
+__all__ = ['Parser', 'Validator', 'Reporter', 'IncrementalValidator', 'ProfileSet', 'JobQueue']
 
-__all__ = [Parser, Validator, Reporter]
+
+def __getattr__(name):
+    if name in _LAZY:
+        import importlib
+        return getattr(importlib.import_module(_LAZY[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,429 @@
+# src/core/batch.py
+"""
+Пакетная проверка документов.
+Документы распределяются по пулу процессов, каждый процесс один раз
+создаёт Parser, Validator и набор проверок и переиспользует их.
+В формате jsonl записи о документах дописываются в summary.jsonl по мере
+готовности, последней строкой - сводка. С несколькими профилями правил
+документ разбирается один раз, отчёты профиля пишутся в output_dir/<профиль>/.
+С очередью заданий (queue) документы берутся из файла SQLite, см. job_queue:
+прерванный пакет продолжается с того же места, сводка строится по всей очереди.
+"""
+import glob
+import os
+import socket
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from src.utils import SUPPORTED_FORMATS
+from src.utils.logger import get_logger
+
+logger = get_logger('core.batch')
+
+# Состояние процесса-исполнителя: (Parser, Validator, stream, profile_dir, stream_checks,
+# ProfileSet или None), создаётся в _init_worker
+_worker_state = None
+
+
+def collect_documents(sources: Iterable[str], file_list: Optional[str] = None) -> List[str]:
+    """
+    Собирает список документов из путей, каталогов, glob-шаблонов и файла со списком.
+    Каталоги обходятся рекурсивно, берутся только поддерживаемые форматы.
+    Порядок стабильный, дубликаты удаляются.
+    """
+    candidates = list(sources)
+
+    if file_list:
+        with open(file_list, 'r', encoding='utf-8') as f:
+            candidates.extend(line.strip() for line in f if line.strip() and not line.startswith('#'))
+
+    documents = []
+    seen = set()
+
+    def add(path: Path):
+        key = str(path.resolve())
+        if key not in seen and path.suffix.lower() in SUPPORTED_FORMATS:
+            seen.add(key)
+            documents.append(str(path))
+
+    for source in candidates:
+        path = Path(source)
+        if path.is_dir():
+            for child in sorted(path.rglob('*')):
+                if child.is_file():
+                    add(child)
+        elif glob.has_magic(source):
+            for match in sorted(glob.glob(source, recursive=True)):
+                if Path(match).is_file():
+                    add(Path(match))
+        else:
+            # Несуществующий файл оставляем: его ошибка попадёт в сводку
+            key = str(path.resolve())
+            if key not in seen:
+                seen.add(key)
+                documents.append(str(path))
+
+    return documents
+
+
+def _init_worker(config: dict, stream: bool = False, parser_options: Optional[dict] = None,
+                 validator_options: Optional[dict] = None, profile_dir: Optional[str] = None,
+                 stream_checks: bool = False, profiles: Optional[Dict[str, dict]] = None):
+    """
+    Инициализирует процесс-исполнитель: парсер, валидатор и включённые проверки.
+    profiles - {имя: конфиг} для проверки несколькими профилями (config не используется).
+    """
+    global _worker_state
+
+    # Импорт внутри функции, чтобы не тянуть проверки при импорте модуля
+    from src.core.parser import Parser
+    from src.core.validator import Validator
+    from src.checks import get_enabled_checks
+
+    doc_parser = Parser(**(parser_options or {}))
+    if profiles:
+        from src.core.profiles import ProfileSet
+
+        profile_set = ProfileSet(profiles, validator_options)
+        validator = next(iter(profile_set.validators.values()))
+    else:
+        profile_set = None
+        validator = Validator(config, **(validator_options or {}))
+        for check in get_enabled_checks(config):
+            validator.register_check(check)
+
+    _worker_state = (doc_parser, validator, stream, profile_dir, stream_checks, profile_set)
+
+
+def _validate_document(document_path: str, pstats_path: Optional[str] = None):
+    """Разбирает и проверяет документ в текущем процессе: (документ, результаты)"""
+    from src.utils.profiling import profile_to
+
+    doc_parser, validator, stream, _, stream_checks, profile_set = _worker_state
+    # С профилями результаты - словарь {профиль: результаты}
+    validator = profile_set or validator
+    with profile_to(pstats_path):
+        if stream_checks:
+            return validator.validate_file_stream(doc_parser, document_path)
+        if stream:
+            parsed_document = doc_parser.parse_stream(document_path)
+        else:
+            parsed_document = doc_parser.parse(document_path)
+        results = validator.validate(parsed_document)
+    return parsed_document, results
+
+
+def _report_document(document_path: str, pstats_path: Optional[str] = None) -> dict:
+    """Разбирает и проверяет документ в текущем процессе, возвращает отчёт Reporter"""
+    from src.core.reporter import Reporter
+
+    parsed_document, results = _validate_document(document_path, pstats_path)
+    return Reporter.generate_report(document=parsed_document, results=results)
+
+
+def _validate_one(document_path: str, report_path: str, report_format: str = 'json') -> dict:
+    """Проверяет один документ в текущем процессе и сохраняет его отчёт"""
+    from src.core.reporter import Reporter
+
+    doc_parser, _, _, profile_dir, stream_checks, profile_set = _worker_state
+    pstats_path = str(Path(profile_dir) / f"{Path(report_path).stem}.pstats") if profile_dir else None
+    started = time.perf_counter()
+
+    # Потоковая проверка читает файл мимо кэша извлечения
+    cache_hits = doc_parser.cache.hits if doc_parser.cache and not stream_checks else None
+
+    try:
+        if profile_set is not None:
+            profiles = _save_profile_reports(document_path, report_path, report_format, pstats_path)
+        elif report_format == 'jsonl':
+            parsed_document, results = _validate_document(document_path, pstats_path)
+            report = Reporter.stream_report(document=parsed_document, results=results,
+                                            report_path=report_path)
+            statuses = report["checks"]
+        else:
+            report = _report_document(document_path, pstats_path)
+            Reporter.save_report(report_data=report, report_path=report_path)
+            statuses = {check["id"]: check["status"] for check in report["checks"]}
+    except Exception as e:
+        return {
+            "document": document_path,
+            "report": None,
+            "error": f"{type(e).__name__}: {e}",
+            "elapsed_sec": round(time.perf_counter() - started, 3)
+        }
+
+    if profile_set is not None:
+        entry = {"document": document_path, "profiles": profiles}
+    else:
+        entry = {"document": document_path, "report": report_path, "summary": report["summary"], "checks": statuses}
+    return {
+        **entry,
+        "extraction_cache": None if cache_hits is None else (
+            "hit" if doc_parser.cache.hits > cache_hits else "miss"),
+        "elapsed_sec": round(time.perf_counter() - started, 3)
+    }
+
+
+def _save_profile_reports(document_path: str, report_path: str, report_format: str,
+                          pstats_path: Optional[str]) -> dict:
+    """Проверяет документ всеми профилями, сохраняет отчёты: {профиль: report, summary, checks}"""
+    from src.core.reporter import Reporter
+
+    parsed_document, profile_results = _validate_document(document_path, pstats_path)
+    profiles = {}
+    for name, results in profile_results.items():
+        path = Path(report_path).parent / name / Path(report_path).name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if report_format == 'jsonl':
+            report = Reporter.stream_report(document=parsed_document, results=results, report_path=str(path),
+                                            profile=name)
+            statuses = report["checks"]
+        else:
+            report = Reporter.generate_report(document=parsed_document, results=results, profile=name)
+            Reporter.save_report(report_data=report, report_path=str(path))
+            statuses = {check["id"]: check["status"] for check in report["checks"]}
+        profiles[name] = {"report": str(path), "summary": report["summary"], "checks": statuses}
+    return profiles
+
+
+def _abandon_job():
+    """Проверка не уложилась в max_job_sec: зависший процесс-исполнитель завершается, пул - ломается"""
+    os._exit(1)
+
+
+def _drain_queue(queue_path: str, owner_prefix: str, lease_sec: float, max_attempts: int,
+                 max_job_sec: float, report_format: str = 'json', job_ids: Optional[List[int]] = None) -> int:
+    """
+    Берёт задания из очереди (только job_ids, если заданы), пока есть невыполненные,
+    и возвращает число обработанных. Если остались только задания в аренде у других
+    исполнителей, ждёт: их аренда может истечь. Выполняется в процессе пула:
+    проверка дольше max_job_sec завершает процесс.
+    """
+    from src.core.job_queue import JobQueue
+
+    queue = JobQueue(queue_path, lease_sec, max_attempts, max_job_sec)
+    owner = f"{owner_prefix}{os.getpid()}"
+    processed = 0
+    while True:
+        job = queue.lease(owner, job_ids)
+        if job is None:
+            if not queue.unfinished(job_ids):
+                return processed
+            time.sleep(lease_sec / 4)
+            continue
+        with queue.heartbeat(job, owner, on_timeout=_abandon_job):
+            entry = _validate_one(job.document, job.report, report_format)
+        if entry.get("error"):
+            queue.fail(job, owner, entry)
+        else:
+            queue.complete(job, owner, entry)
+        processed += 1
+
+
+class BatchRunner:
+    """Запускает проверку множества документов в пуле процессов"""
+
+    # Форматы отчётов: JSON с отступами или JSON Lines (потоковая запись)
+    REPORT_FORMATS = ('json', 'jsonl')
+
+    def __init__(self, config: dict, output_dir: str = 'reports', workers: Optional[int] = None,
+                 stream: bool = False, parser_options: Optional[dict] = None,
+                 validator_options: Optional[dict] = None, profile_dir: Optional[str] = None,
+                 report_format: str = 'json', stream_checks: bool = False,
+                 profiles: Optional[Dict[str, dict]] = None, queue: Optional[str] = None,
+                 max_attempts: Optional[int] = None, lease_sec: Optional[float] = None,
+                 max_job_sec: Optional[float] = None):
+        """
+        stream_checks - потоковая проверка без сборки текста документа целиком.
+        profiles - {имя: конфиг}: проверка несколькими профилями правил вместо config.
+        queue - файл SQLite очереди заданий; max_attempts, lease_sec и max_job_sec - её
+        попытки, аренда и предел времени одной попытки.
+        """
+        if report_format not in self.REPORT_FORMATS:
+            raise ValueError(f"Неизвестный формат отчёта: {report_format}")
+
+        self.config = config
+        self.stream = stream
+        self.stream_checks = stream_checks
+        self.profiles = profiles
+        # Аргументы Parser в процессах-исполнителях (pdf_workers, cache)
+        self.parser_options = parser_options or {}
+        # Аргументы Validator (executor, check_timeout)
+        self.validator_options = validator_options or {}
+        # Каталог для файлов cProfile (<документ>.pstats); None - без профилирования
+        self.profile_dir = profile_dir
+        self.output_dir = Path(output_dir)
+        self.workers = workers or os.cpu_count() or 1
+        self.report_format = report_format
+        self.queue = None
+        if queue:
+            from src.core.job_queue import DEFAULT_LEASE_SEC, DEFAULT_MAX_ATTEMPTS, DEFAULT_MAX_JOB_SEC, JobQueue
+
+            self.queue = JobQueue(queue, lease_sec or DEFAULT_LEASE_SEC, max_attempts or DEFAULT_MAX_ATTEMPTS,
+                                  max_job_sec or DEFAULT_MAX_JOB_SEC)
+
+    def run(self, documents: List[str]) -> dict:
+        """
+        Проверяет документы и возвращает сводку по всему запуску.
+        В формате jsonl сводка не содержит списка документов: он уже в summary.jsonl.
+        С очередью документы добавляются в неё, а сводка строится по всем её заданиям.
+        """
+        from src.core.reporter import BatchSummary, JsonLinesWriter, Reporter
+
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        if self.queue:
+            used = {Path(report).name for _, report in self.queue.jobs()}
+            self.queue.add(documents, self._assign_report_paths(documents, used))
+            jobs = self.queue.jobs()
+            documents = [document for document, _ in jobs]
+            report_paths = [report for _, report in jobs]
+        else:
+            report_paths = self._assign_report_paths(documents)
+        started = time.perf_counter()
+
+        if self.report_format == 'jsonl':
+            writer = JsonLinesWriter(str(self.output_dir / 'summary.jsonl'))
+            entries = None
+        else:
+            writer = None
+            entries = [None] * len(documents)
+        batch_summary = BatchSummary()
+        profile_summaries = {name: BatchSummary() for name in self.profiles or ()}
+
+        def finish(i: int, entry: dict):
+            if profile_summaries:
+                batch_summary.total_documents += 1
+                batch_summary.validated += not entry.get("error")
+                for name, profile_summary in profile_summaries.items():
+                    profile_summary.add(entry if entry.get("error") else {**entry, **entry["profiles"][name]})
+            else:
+                batch_summary.add(entry)
+            if writer:
+                writer.write({"type": "document", **entry})
+            else:
+                entries[i] = entry
+
+        try:
+            if self.queue:
+                self._drain()
+                for i, entry in enumerate(self.queue.entries()):
+                    if entry is None:
+                        # Задание ещё в работе у исполнителя, которого не дождались
+                        entry = {"document": documents[i], "report": None,
+                                 "error": "Задание не завершено", "elapsed_sec": None}
+                    finish(i, entry)
+            elif self.workers == 1:
+                # Без пула: удобно для отладки и маленьких пакетов
+                _init_worker(self.config, self.stream, self.parser_options, self.validator_options,
+                             self.profile_dir, self.stream_checks, self.profiles)
+                for i, doc in enumerate(documents):
+                    finish(i, _validate_one(doc, report_paths[i], self.report_format))
+            else:
+                with ProcessPoolExecutor(max_workers=self.workers,
+                                         initializer=_init_worker,
+                                         initargs=(self.config, self.stream, self.parser_options,
+                                                   self.validator_options, self.profile_dir,
+                                                   self.stream_checks, self.profiles)) as executor:
+                    futures = {
+                        executor.submit(_validate_one, doc, report_paths[i], self.report_format): i
+                        for i, doc in enumerate(documents)
+                    }
+                    for future in as_completed(futures):
+                        i = futures[future]
+                        try:
+                            entry = future.result()
+                        except Exception as e:
+                            # Например, упавший процесс-исполнитель
+                            entry = {
+                                "document": documents[i],
+                                "report": None,
+                                "error": f"{type(e).__name__}: {e}",
+                                "elapsed_sec": None
+                            }
+                        finish(i, entry)
+
+            elapsed_sec = time.perf_counter() - started
+            if profile_summaries:
+                summary = self._profiles_summary(batch_summary, profile_summaries, elapsed_sec)
+            else:
+                summary = batch_summary.to_dict(elapsed_sec=elapsed_sec, workers=self.workers)
+            if writer:
+                writer.write({"type": "summary", **summary})
+            else:
+                summary["documents"] = entries
+                Reporter.save_report(report_data=summary, report_path=str(self.output_dir / 'summary.json'))
+        finally:
+            if writer:
+                writer.close()
+        return summary
+
+    def _drain(self):
+        """
+        Выполняет задания очереди в пуле процессов, и при workers=1 тоже: зависший
+        исполнитель завершается (см. _drain_queue). Если процесс-исполнитель упал
+        (пул сломан) и исполнителей несколько, неизвестно, на каком задании: задания
+        этого пула возвращаются в очередь без учёта попытки и проверяются по одному
+        в отдельном пуле. С одним исполнителем падение сразу засчитывается заданию,
+        и задание, на котором процесс падает или зависает, исчерпает попытки.
+        """
+        initargs = (self.config, self.stream, self.parser_options, self.validator_options,
+                    self.profile_dir, self.stream_checks, self.profiles)
+        owner_prefix = f"{socket.gethostname()}:{uuid.uuid4().hex[:8]}:"
+        drain_args = (self.queue.path, owner_prefix, self.queue.lease_sec, self.queue.max_attempts,
+                      self.queue.max_job_sec, self.report_format)
+
+        suspects = None
+        while True:
+            workers = 1 if suspects else self.workers
+            try:
+                with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                         initargs=initargs) as executor:
+                    futures = [executor.submit(_drain_queue, *drain_args, suspects) for _ in range(workers)]
+                    for future in futures:
+                        future.result()
+            except BrokenProcessPool as e:
+                isolated = workers == 1
+                expired = self.queue.expire(owner_prefix, refund=not isolated)
+                if not expired:
+                    # Падение не связано с заданием (например, в _init_worker) - повтор не поможет
+                    raise
+                logger.warning("[Batch] Процесс-исполнитель упал (%s), заданий возвращено в очередь: %d",
+                               e, len(expired))
+                if not isolated:
+                    suspects = expired
+                continue
+            if not suspects:
+                return
+            suspects = None
+
+    def _profiles_summary(self, documents: 'BatchSummary', profiles: dict, elapsed_sec: float) -> dict:
+        """Сводка по профилям; документы и ошибки чтения общие для всех профилей"""
+        summary = documents.to_dict(elapsed_sec=elapsed_sec, workers=self.workers)
+        summary["summary"] = {key: summary["summary"][key] for key in ("total_documents", "validated", "errors")}
+        summary["profiles"] = {}
+        for name, profile_summary in profiles.items():
+            profile = profile_summary.to_dict(elapsed_sec=elapsed_sec, workers=self.workers)
+            summary["profiles"][name] = {"summary": profile["summary"], "checks": profile["checks"]}
+            summary["extraction_cache"] = profile["extraction_cache"]
+        del summary["checks"]
+        return summary
+
+    def _assign_report_paths(self, documents: List[str], used: Iterable[str] = ()) -> List[str]:
+        """Назначает каждому документу уникальный путь отчёта в output_dir; used - занятые имена"""
+        used = set(used)
+        paths = []
+        for document in documents:
+            stem = Path(document).stem or 'document'
+            suffix = f".{self.report_format}"
+            name = f"{stem}{suffix}"
+            counter = 1
+            while name in used or name == f"summary{suffix}":
+                name = f"{stem}_{counter}{suffix}"
+                counter += 1
+            used.add(name)
+            paths.append(str(self.output_dir / name))
+        return paths
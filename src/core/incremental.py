@@ -0,0 +1,201 @@
+# src/core/incremental.py
+"""
+Инкрементальная проверка отредактированного документа.
+Сессия хранит предыдущую версию: события структуры и результаты проверок.
+При повторной отправке текст сравнивается с прежним, структура
+пересканируется только в изменённых строках (остальные события сдвигаются),
+а проверка выполняется заново, только если правка может изменить её
+результат (BaseCheck.is_affected). Итог совпадает с полной проверкой.
+"""
+import re
+from typing import List, Optional, Tuple
+
+from src.core.parser import Parser
+from src.core.scanner import EVENT_KINDS, StructureEvent, StructureScanner
+from src.core.validator import Validator
+from src.models import CheckResult, Document, DocumentChange, DocumentIndex
+from src.utils.logger import get_logger
+from src.utils.profiling import Profiler
+
+logger = get_logger('core.incremental')
+
+_scanner = StructureScanner()
+
+# Подпись "Таблица 1.1 Название" продолжается на следующих строках,
+# пока после слова идут только пробелы, номер и двоеточие
+_CAPTION_WORD = re.compile(r'(?i)таблица|рисунок')
+_CAPTION_WORD_LENGTH = 7
+
+
+class IncrementalValidator:
+    """
+    Сессия проверки одного документа, который отправляется повторно после правок.
+    Проверки берутся из validator; результаты - в порядке их регистрации.
+    """
+
+    def __init__(self, validator: Validator, parser: Optional[Parser] = None):
+        self.validator = validator
+        self.parser = parser or Parser()
+        self.document: Optional[Document] = None
+        self.results: List[CheckResult] = []
+        self._events: List[StructureEvent] = []
+        self._checks = []  # Проверки, для которых получены results
+
+    def revalidate_file(self, file_path: str) -> Tuple[Document, List[CheckResult]]:
+        """Читает файл и проверяет его относительно предыдущей версии"""
+        pages = []
+        text = self.parser.read_text(file_path, pages)
+        return self.revalidate(text, file_path, pages)
+
+    def revalidate(self, text: str, file_path: str = "text_input",
+                   pages: Optional[List[dict]] = None) -> Tuple[Document, List[CheckResult]]:
+        """Проверяет новую версию текста; первая версия проверяется полностью"""
+        profiler = Profiler()
+        with profiler.measure('parser.incremental'):
+            document, change = self._update(text, file_path)
+        document.pages = pages or []
+        document.timings = profiler.timings
+
+        checks = list(self.validator.checks)
+        if change is None or checks != self._checks or change.old.pages != document.pages:
+            # Сменилась разбивка на страницы - меняются страницы во всех ошибках
+            rerun = checks
+        else:
+            rerun = [check for check in checks if check.is_affected(change)]
+
+        fresh = iter(self.validator.validate(document, rerun) if rerun else [])
+        previous = dict(zip(map(id, self._checks), self.results))
+        rerun_ids = set(map(id, rerun))
+        results = [next(fresh) if id(check) in rerun_ids else previous[id(check)] for check in checks]
+
+        logger.info("[Incremental] Выполнено проверок: %d из %d", len(rerun), len(checks))
+        self.document, self.results, self._checks = document, results, checks
+        return document, results
+
+    def reset(self):
+        """Забывает предыдущую версию: следующая проверка будет полной"""
+        self.document = None
+        self.results = []
+        self._events = []
+        self._checks = []
+
+    def _update(self, text: str, file_path: str) -> Tuple[Document, Optional[DocumentChange]]:
+        """Новый документ и правка относительно предыдущего (None для первой версии)"""
+        old = self.document
+        index = DocumentIndex.build(text)
+
+        if old is None:
+            self._events = list(_scanner.scan(index))
+            return self._document(file_path, index), None
+
+        if text == old.raw_text:
+            document = self._document(file_path, index)
+            return document, DocumentChange(old, document)
+
+        old_index = old.get_index()
+        prefix = _common_prefix(old.raw_text, text)
+        suffix = _common_suffix(old.raw_text, text, min(len(old.raw_text), len(text)) - prefix)
+
+        # Изменённые строки: от строки первого отличия до строки последнего
+        start = old_index.line_at(prefix)
+        old_end = old_index.line_at(len(old.raw_text) - suffix) + 1
+        new_end = index.line_at(len(text) - suffix) + 1
+
+        self._events = self._rescan(old_index, index, start, old_end, new_end)
+        document = self._document(file_path, index)
+        logger.debug("[Incremental] Изменены строки %d-%d (было %d)", start + 1, new_end, old_end - start)
+        return document, DocumentChange(old, document, start, old_end, start, new_end)
+
+    def _rescan(self, old_index: DocumentIndex, index: DocumentIndex,
+                start: int, old_end: int, new_end: int) -> List[StructureEvent]:
+        """События новой версии: пересканируются только строки [start, new_end) с запасом"""
+        # Окно расширяется, пока его границу пересекает подпись
+        while start > 0:
+            caption_line = _caption_line(index, start)
+            if caption_line is None:
+                break
+            start = caption_line
+
+        while new_end < len(index.lines) and (_caption_line(index, new_end) is not None
+                                              or _caption_line(old_index, old_end) is not None):
+            old_end += 1
+            new_end += 1
+
+        window_start = index.line_starts[start]
+        old_cut = old_index.line_starts[old_end] if old_end < len(old_index.lines) else len(old_index.text) + 1
+        new_cut = index.line_starts[new_end] if new_end < len(index.lines) else len(index.text) + 1
+
+        window = DocumentIndex.build(index.text[window_start:new_cut - 1])
+        middle = _scanner.scan(window, base_offset=window_start, base_line=start)
+
+        offset_delta = new_cut - old_cut
+        line_delta = new_end - old_end
+        head = [event for event in self._events if event.start < window_start]
+        tail = [_shifted(event, offset_delta, line_delta) for event in self._events if event.start >= old_cut]
+        return head + list(middle) + tail
+
+    def _document(self, file_path: str, index: DocumentIndex) -> Document:
+        structure = {kind: [] for kind in EVENT_KINDS}
+        for event in self._events:
+            structure[event.kind].append(event.data)
+
+        return Document(
+            file_path=file_path,
+            raw_text=index.text,
+            sections=structure['heading'],
+            tables=structure['table'],
+            figures=structure['figure'],
+            formulas=structure['formula'],
+            appendices=structure['appendix'],
+            index=index
+        )
+
+
+def _caption_line(index: DocumentIndex, line: int) -> Optional[int]:
+    """Строка, где начинается подпись, которая может продолжаться через начало строки line"""
+    text = index.text
+    pos = index.line_starts[line]
+    while pos > 0 and (text[pos - 1].isspace() or text[pos - 1].isdecimal() or text[pos - 1] in '.:'):
+        pos -= 1
+
+    word_start = pos - _CAPTION_WORD_LENGTH
+    if word_start >= 0 and _CAPTION_WORD.fullmatch(text, word_start, pos):
+        return index.line_at(word_start)
+    return None
+
+
+def _shifted(event: StructureEvent, offset_delta: int, line_delta: int) -> StructureEvent:
+    """Событие после правки: смещения и номера строк сдвигаются"""
+    if not offset_delta and not line_delta:
+        return event
+
+    data = dict(event.data)
+    if 'position' in data:
+        data['position'] += offset_delta
+    if 'line_number' in data:
+        data['line_number'] += line_delta
+    return StructureEvent(event.kind, event.start + offset_delta, event.end + offset_delta, data)
+
+
+def _common_prefix(a: str, b: str) -> int:
+    """Длина общего начала строк (двоичный поиск, сравнение срезов без цикла по символам)"""
+    low, high = 0, min(len(a), len(b))
+    while low < high:
+        middle = (low + high + 1) // 2
+        if a.startswith(b[:middle]):
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+def _common_suffix(a: str, b: str, limit: int) -> int:
+    """Длина общего конца строк, не больше limit"""
+    low, high = 0, limit
+    while low < high:
+        middle = (low + high + 1) // 2
+        if a.endswith(b[len(b) - middle:]):
+            low = middle
+        else:
+            high = middle - 1
+    return low
@@ -0,0 +1,252 @@
+# src/core/job_queue.py
+"""
+Очередь заданий пакетной проверки в файле SQLite.
+Задание - документ и путь его отчёта в состоянии pending, running, done
+или failed. Исполнитель берёт задание в аренду на lease_sec секунд и
+продлевает её, пока документ проверяется; аренда упавшего процесса
+истекает, и задание снова выдаётся. Попытки ограничены max_attempts,
+время одной попытки - max_job_sec: дольше аренда не продлевается, и
+задание зависшего исполнителя (например, на soffice) выдаётся снова.
+Выполненные задания при повторном запуске не трогаются, поэтому
+прерванный пакет продолжается с того же места.
+
+Несколько процессов и машин могут работать с одним файлом: выдача
+задания - одна транзакция BEGIN IMMEDIATE. Журнал - обычный (не WAL),
+который работает и на сетевом каталоге; часы машин должны быть сверены.
+"""
+import json
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from src.utils.logger import get_logger
+
+logger = get_logger('core.job_queue')
+
+PENDING, RUNNING, DONE, FAILED = 'pending', 'running', 'done', 'failed'
+
+DEFAULT_LEASE_SEC = 60.0
+DEFAULT_MAX_ATTEMPTS = 3
+DEFAULT_MAX_JOB_SEC = 1800.0
+
+# Сколько ждать блокировку файла другим процессом, с
+BUSY_TIMEOUT_SEC = 30.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    document TEXT NOT NULL UNIQUE,
+    report TEXT NOT NULL,
+    state TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    owner TEXT,
+    lease_expires REAL,
+    entry TEXT,
+    updated REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state);
+"""
+
+
+def _ids_filter(job_ids: Optional[Sequence[int]]) -> Tuple[str, tuple]:
+    """Условие SQL "только задания job_ids" и его параметры"""
+    if job_ids is None:
+        return '', ()
+    return f" AND id IN ({', '.join('?' * len(job_ids))})", tuple(job_ids)
+
+
+@dataclass
+class Job:
+    """Задание, выданное исполнителю"""
+    id: int
+    document: str
+    report: str
+    attempts: int
+
+
+class JobQueue:
+    """Задания в файле SQLite; каждый метод открывает своё короткое соединение"""
+
+    def __init__(self, path: str, lease_sec: float = DEFAULT_LEASE_SEC,
+                 max_attempts: int = DEFAULT_MAX_ATTEMPTS, max_job_sec: float = DEFAULT_MAX_JOB_SEC):
+        if max_attempts < 1:
+            raise ValueError("max_attempts должно быть не меньше 1")
+        self.path = path
+        self.lease_sec = lease_sec
+        self.max_attempts = max_attempts
+        self.max_job_sec = max_job_sec
+        conn = self._connect()
+        try:
+            # executescript сам завершает транзакцию
+            conn.executescript(SCHEMA)
+        finally:
+            conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=BUSY_TIMEOUT_SEC, isolation_level=None)
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+
+    def add(self, documents: Sequence[str], report_paths: Sequence[str]) -> int:
+        """Добавляет задания; документы, уже стоящие в очереди, не меняются. Возвращает число новых"""
+        now = time.time()
+        with self._transaction() as conn:
+            before = conn.total_changes
+            conn.executemany("INSERT OR IGNORE INTO jobs (document, report, updated) VALUES (?, ?, ?)",
+                             [(document, report, now) for document, report in zip(documents, report_paths)])
+            added = conn.total_changes - before
+        logger.info("[JobQueue] Добавлено заданий: %d из %d", added, len(documents))
+        return added
+
+    def jobs(self) -> List[Tuple[str, str]]:
+        """(документ, путь отчёта) всех заданий в порядке добавления"""
+        with self._transaction() as conn:
+            return conn.execute("SELECT document, report FROM jobs ORDER BY id").fetchall()
+
+    def lease(self, owner: str, job_ids: Optional[Sequence[int]] = None) -> Optional[Job]:
+        """
+        Выдаёт owner задание в ожидании или с истёкшей арендой (только из job_ids,
+        если они заданы); None - выдавать нечего. Задание с истёкшей арендой и
+        исчерпанными попытками (процесс падал на нём каждый раз) помечается failed.
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            for job_id, document, report, attempts in conn.execute(
+                    "SELECT id, document, report, attempts FROM jobs "
+                    "WHERE state = ? AND lease_expires < ? AND attempts >= ?",
+                    (RUNNING, now, self.max_attempts)).fetchall():
+                logger.warning("[JobQueue] %s: аренда истекла, попыток: %d", document, attempts)
+                entry = {"document": document, "report": None,
+                         "error": f"Исполнитель не завершил проверку за {attempts} попыток",
+                         "elapsed_sec": None}
+                conn.execute("UPDATE jobs SET state = ?, owner = NULL, entry = ?, updated = ? WHERE id = ?",
+                             (FAILED, json.dumps(entry, ensure_ascii=False), now, job_id))
+
+            ids_filter, ids = _ids_filter(job_ids)
+            row = conn.execute(
+                "SELECT id, document, report, attempts FROM jobs "
+                f"WHERE (state = ? OR (state = ? AND lease_expires < ?)){ids_filter} ORDER BY id LIMIT 1",
+                (PENDING, RUNNING, now, *ids)).fetchone()
+            if row is None:
+                return None
+            job = Job(row[0], row[1], row[2], row[3] + 1)
+            conn.execute("UPDATE jobs SET state = ?, attempts = ?, owner = ?, lease_expires = ?, updated = ? "
+                         "WHERE id = ?", (RUNNING, job.attempts, owner, now + self.lease_sec, now, job.id))
+        logger.debug("[JobQueue] %s: выдано %s, попытка %d", job.document, owner, job.attempts)
+        return job
+
+    def renew(self, job: Job, owner: str) -> bool:
+        """Продлевает аренду; False - задание уже выдано другому исполнителю"""
+        now = time.time()
+        with self._transaction() as conn:
+            cursor = conn.execute("UPDATE jobs SET lease_expires = ?, updated = ? "
+                                  "WHERE id = ? AND owner = ? AND state = ?",
+                                  (now + self.lease_sec, now, job.id, owner, RUNNING))
+            return cursor.rowcount == 1
+
+    @contextmanager
+    def heartbeat(self, job: Job, owner: str, on_timeout: Optional[Callable[[], None]] = None):
+        """
+        Продлевает аренду job в фоновом потоке, пока выполняется блок with, но не
+        дольше max_job_sec: затем аренда истекает, и задание выдаётся снова.
+        on_timeout вызывается в фоновом потоке, когда время вышло (например,
+        завершает зависший процесс-исполнитель).
+        """
+        stop = threading.Event()
+        deadline = time.monotonic() + self.max_job_sec
+
+        def beat():
+            while not stop.wait(min(self.lease_sec / 3, max(deadline - time.monotonic(), 0))):
+                if time.monotonic() >= deadline:
+                    logger.warning("[JobQueue] %s: проверка дольше %g с, аренда не продлевается",
+                                   job.document, self.max_job_sec)
+                    if on_timeout:
+                        on_timeout()
+                    return
+                if not self.renew(job, owner):
+                    logger.warning("[JobQueue] %s: аренда потеряна", job.document)
+                    return
+
+        thread = threading.Thread(target=beat, name=f"heartbeat-{job.id}", daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            thread.join()
+
+    def complete(self, job: Job, owner: str, entry: dict) -> bool:
+        """Задание выполнено; entry - запись о документе для сводки"""
+        return self._finish(job, owner, DONE, entry)
+
+    def fail(self, job: Job, owner: str, entry: dict) -> bool:
+        """Попытка не удалась: задание вернётся в очередь, пока не исчерпаны попытки"""
+        state = FAILED if job.attempts >= self.max_attempts else PENDING
+        if state == PENDING:
+            logger.info("[JobQueue] %s: попытка %d не удалась: %s", job.document, job.attempts, entry.get("error"))
+        return self._finish(job, owner, state, entry)
+
+    def _finish(self, job: Job, owner: str, state: str, entry: dict) -> bool:
+        with self._transaction() as conn:
+            cursor = conn.execute("UPDATE jobs SET state = ?, owner = NULL, lease_expires = NULL, entry = ?, "
+                                  "updated = ? WHERE id = ? AND owner = ? AND state = ?",
+                                  (state, json.dumps(entry, ensure_ascii=False), time.time(), job.id, owner,
+                                   RUNNING))
+            if cursor.rowcount != 1:
+                logger.warning("[JobQueue] %s: задание выдано другому исполнителю, результат не записан",
+                               job.document)
+            return cursor.rowcount == 1
+
+    def expire(self, owner_prefix: str, refund: bool = False) -> List[int]:
+        """
+        Снимает аренду с заданий исполнителей owner_prefix* (их процессы завершились)
+        и возвращает номера заданий. refund - попытка не засчитывается: упал
+        не обязательно процесс, проверявший это задание.
+        """
+        with self._transaction() as conn:
+            job_ids = [row[0] for row in conn.execute("SELECT id FROM jobs WHERE state = ? AND owner LIKE ? || '%'",
+                                                      (RUNNING, owner_prefix))]
+            conn.executemany(f"UPDATE jobs SET lease_expires = 0, attempts = attempts - {int(refund)} WHERE id = ?",
+                             [(job_id,) for job_id in job_ids])
+        return job_ids
+
+    def retry_failed(self) -> int:
+        """Возвращает задания failed в очередь с обнулёнными попытками"""
+        with self._transaction() as conn:
+            cursor = conn.execute("UPDATE jobs SET state = ?, attempts = 0, entry = NULL, updated = ? "
+                                  "WHERE state = ?", (PENDING, time.time(), FAILED))
+            return cursor.rowcount
+
+    def counts(self, job_ids: Optional[Sequence[int]] = None) -> Dict[str, int]:
+        """Число заданий по состояниям (среди job_ids, если заданы)"""
+        ids_filter, ids = _ids_filter(job_ids)
+        with self._transaction() as conn:
+            rows = conn.execute(f"SELECT state, COUNT(*) FROM jobs WHERE 1{ids_filter} GROUP BY state",
+                                ids).fetchall()
+        return {PENDING: 0, RUNNING: 0, DONE: 0, FAILED: 0, **dict(rows)}
+
+    def unfinished(self, job_ids: Optional[Sequence[int]] = None) -> int:
+        """Заданий в ожидании и в работе"""
+        counts = self.counts(job_ids)
+        return counts[PENDING] + counts[RUNNING]
+
+    def entries(self) -> List[Optional[dict]]:
+        """Записи о документах в порядке добавления; None - задание не завершено"""
+        with self._transaction() as conn:
+            rows = conn.execute("SELECT state, entry FROM jobs ORDER BY id").fetchall()
+        return [json.loads(entry) if state in (DONE, FAILED) and entry else None for state, entry in rows]
@@ -1,156 +1,258 @@
-import re
-from src.models import Document
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+from src.models import Document, DocumentIndex, TextChunk
+from src.core.scanner import EVENT_KINDS, StructureScanner, StreamingStructureScanner
+from src.utils.extraction_cache import ExtractionCache
 from src.utils.file_reader import FileReader
+from src.utils.logger import get_logger
+from src.utils.profiling import Profiler
+
+logger = get_logger('core.parser')
+
+# Сканер не хранит состояния между вызовами, шаблоны скомпилированы на уровне модуля
+_scanner = StructureScanner()
+
+# Примерный размер блока строк при потоковой проверке, символов
+STREAM_CHUNK_CHARS = 64 * 1024
+
+
+class StreamReadError(Exception):
+    """Файл не дочитан при потоковой проверке: часть текста уже передана проверкам"""
 
 
 class Parser:
     """Парсер документов. Извлекает структуру из текста."""
 
-    def __init__(self):
-        self.file_reader = FileReader()
-        print("[Parser] Инициализирован парсер документов")
+    def __init__(self, pdf_workers: int = 1, cache: Optional[ExtractionCache] = None,
+                 docx_backend: str = 'python-docx'):
+        self.file_reader = FileReader(pdf_workers=pdf_workers, docx_backend=docx_backend)
+        self.cache = cache
+        logger.debug("[Parser] Инициализирован парсер документов")
 
     def parse(self, file_path: str) -> Document:
         """Основной метод: читает файл и парсит его структуру"""
-        print(f"[Parser] Начинаю обработку файла: {file_path}")
+        return self._profiled('parser.parse', self._parse, file_path)
 
-        # 1. Чтение файла
-        text, error_message = self.file_reader.read_file(file_path)
+    def _parse(self, file_path: str) -> Document:
+        logger.info("[Parser] Начинаю обработку файла: %s", file_path)
 
-        # 2. Если файл не найден или не прочитан, создаём демо-текст
-        if text is None or text == "":
-            if error_message:
-                print(f"[Parser] Ошибка чтения файла: {error_message}")
-            print("[Parser] Не удалось экспортировать текст из файла, использую демо-текст")
-            text = self.file_reader.create_demo_text()
+        # 1-2. Чтение файла или демо-текст
+        pages = []
+        text = self.read_text(file_path, pages)
 
         # 3. Извлечение структуры
-        print("[Parser] Извлекаю структуру документа...")
-        sections = self._extract_sections(text)
-        tables = self._extract_tables(text)
-        figures = self._extract_figures(text)
+        logger.debug("[Parser] Извлекаю структуру документа...")
+        index = DocumentIndex.build(text)
+        structure = self._extract_structure(index)
 
-        print(f"[Parser] Найдено: {len(sections)} разделов, {len(tables)} таблиц, {len(figures)} рисунков")
+        logger.info("[Parser] Найдено: %d разделов, %d таблиц, %d рисунков",
+                    len(structure['heading']), len(structure['table']), len(structure['figure']))
 
         # 4. Создание объекта документа
         document = Document(
             file_path=file_path,
             raw_text=text,
-            sections=sections,
-            tables=tables,
-            figures=figures
+            pages=pages,
+            sections=structure['heading'],
+            tables=structure['table'],
+            figures=structure['figure'],
+            formulas=structure['formula'],
+            appendices=structure['appendix'],
+            index=index
         )
 
         return document
 
-    @staticmethod
-    def _extract_sections(text: str) -> list:
-        """Извлекает разделы документа по заголовкам"""
-        sections = []
-        lines = text.split('\n')
+    def read_text(self, file_path: str, pages: Optional[List[dict]] = None) -> str:
+        """
+        Текст файла (или из кэша извлечения); демо-текст, если файл не прочитан.
+        В pages дописываются начала страниц, если формат их сохраняет.
+        """
+        found = []
+        text, error_message = self._read_cached(file_path, found)
 
-        for i, line in enumerate(lines):
-            line_stripped = line.strip()
+        if text is None or text == "":
+            if error_message:
+                logger.warning("[Parser] Ошибка чтения файла: %s", error_message)
+            logger.warning("[Parser] Не удалось экспортировать текст из файла, использую демо-текст")
+            text = self.file_reader.create_demo_text()
+            found = []
+
+        if pages is not None:
+            pages.extend(found)
+
+        return text
+
+    def parse_stream(self, file_path: str) -> Document:
+        """
+        Потоковый разбор: страницы читаются и сканируются по мере извлечения,
+        ридер не держит разметку всех страниц PDF. Текст страниц склеивается в
+        Document.raw_text - проверкам он нужен целиком, поэтому память растёт с
+        длиной текста; проверка без сборки текста - stream_document() и
+        Validator.validate_file_stream(). Структура совпадает с parse(),
+        дополнительно заполняется Document.pages.
+        """
+        return self._profiled('parser.parse_stream', self._parse_stream, file_path)
+
+    def _parse_stream(self, file_path: str) -> Document:
+        logger.info("[Parser] Потоковая обработка файла: %s", file_path)
+
+        cache_key = self._cache_key(file_path)
+        if cache_key:
+            entry = self.cache.get(cache_key)
+            if entry is not None:
+                logger.info("[Parser] Текст взят из кэша извлечения")
+                document = self.parse_text(entry['text'])
+                document.file_path = file_path
+                document.pages = entry.get('pages') or []
+                return document
+
+        stream = StreamingStructureScanner()
+        chunks, reader_pages = [], []
+        try:
+            for page in self.file_reader.iter_pages(file_path, reader_pages):
+                stream.feed(page)
+                if page.text:
+                    chunks.append(page.text)
+            structure = stream.finish()
+        except Exception as e:
+            logger.warning("[Parser] Ошибка потокового чтения: %s", e)
+            chunks = []
+
+        if not chunks:
+            logger.warning("[Parser] Не удалось экспортировать текст из файла, использую демо-текст")
+            document = self.parse_text(self.file_reader.create_demo_text())
+            document.file_path = file_path
+            return document
+
+        logger.info("[Parser] Найдено: %d разделов, %d таблиц, %d рисунков, страниц: %d",
+                    len(structure['heading']), len(structure['table']), len(structure['figure']),
+                    len(stream.pages))
+
+        # Не-PDF форматы выдаются одной страницей, их разбивку сообщает ридер
+        pages = reader_pages or stream.pages
+        text = '\n'.join(chunks)
+        if cache_key and text != self.file_reader.create_demo_text():
+            self.cache.put(cache_key, text, pages, backend=self.file_reader.backend_signature(file_path))
+
+        # Текст нужен проверкам целиком; индекс строится ими при первом обращении
+        return Document(
+            file_path=file_path,
+            raw_text=text,
+            pages=pages,
+            sections=structure['heading'],
+            tables=structure['table'],
+            figures=structure['figure'],
+            formulas=structure['formula'],
+            appendices=structure['appendix']
+        )
 
-            # Пропускаем пустые строки
-            if not line_stripped:
+    def stream_document(self, file_path: str,
+                        chunk_chars: int = STREAM_CHUNK_CHARS) -> Tuple[Document, Iterator[TextChunk]]:
+        """
+        Документ без текста и генератор блоков его строк для Validator.validate_stream().
+        Строки блоков, склеенные через '\\n', дают текст read_text(); начала страниц
+        дописываются в document.pages до выдачи блока с их текстом. Кэш извлечения
+        не используется. Ошибка чтения - StreamReadError.
+        """
+        document = Document(file_path=file_path)
+        return document, self._iter_chunks(file_path, document.pages, chunk_chars)
+
+    def _iter_chunks(self, file_path: str, pages: List[dict], chunk_chars: int) -> Iterator[TextChunk]:
+        pieces = self.file_reader.iter_text(file_path, pages)
+        lines, size, tail = [], 0, ''
+        line_number = offset = 0
+        started = False
+
+        while True:
+            try:
+                piece = next(pieces, None)
+            except Exception as e:
+                raise StreamReadError(str(e)) from e
+            if piece is None:
+                break
+            if not piece:
                 continue
-
-            # Паттерны заголовков
-            patterns = [
-                # "1. Введение" или "1.1. Подраздел"
-                (r'^(\d+(\.\d+)*)[\.\s]+([А-Я].*)$', 1),
-                # "Глава 1. Название"
-                (r'^(Глава|Раздел|Часть)\s+(\d+)[\.\s]+(.+)$', 2),
-                # "ВВЕДЕНИЕ" (все заглавные)
-                (r'^[А-ЯЁ]{3,}$', 3)
-            ]
-
-            for pattern, level in patterns:
-                match = re.match(pattern, line_stripped)
-                if match:
-                    # Извлекаем название раздела
-                    if level == 1:
-                        title = match.group(3)
-                    elif level == 2:
-                        title = f"{match.group(1)} {match.group(2)}. {match.group(3)}"
-                    else:
-                        title = line_stripped
-
-                    sections.append({
-                        'title': title,
-                        'level': level,
-                        'line_number': i,
-                        'original_text': line_stripped
-                    })
-                    break
-
-        return sections
+            started = True
+
+            # Последняя строка части может продолжиться в следующей
+            *complete, tail = (tail + piece).split('\n')
+            lines.extend(complete)
+            size += len(piece)
+            if size >= chunk_chars and lines:
+                chunk = TextChunk(lines, line_number, offset)
+                yield chunk
+                line_number += len(lines)
+                offset += sum(len(line) + 1 for line in lines)
+                lines, size = [], len(tail)
+
+        if not started:
+            logger.warning("[Parser] Не удалось экспортировать текст из файла, использую демо-текст")
+            pages.clear()
+            yield TextChunk(self.file_reader.create_demo_text().split('\n'))
+            return
+
+        lines.append(tail)
+        yield TextChunk(lines, line_number, offset)
 
     @staticmethod
-    def _extract_tables(text: str) -> list:
-        """Извлекает информацию о таблицах"""
-        tables = []
+    def _profiled(stage_name: str, parse, file_path: str) -> Document:
+        """Разбор под профайлером документа: замеры этапов попадают в Document.timings"""
+        profiler = Profiler()
+        with profiler.activate(), profiler.measure(stage_name):
+            document = parse(file_path)
+        document.timings = profiler.timings
+        return document
 
-        # Ищем "Таблица X.Y: Название" или "Таблица X.Y Название"
-        pattern = r'(?i)таблица\s+(\d+(\.\d+)*)[\s:]*([^\n]+)'
+    def _read_cached(self, file_path: str, pages: List[dict]) -> Tuple[Optional[str], str]:
+        """Читает файл через FileReader, используя кэш извлечения, если он включён"""
+        cache_key = self._cache_key(file_path)
+        if cache_key:
+            entry = self.cache.get(cache_key)
+            if entry is not None:
+                logger.info("[Parser] Текст взят из кэша извлечения")
+                pages.extend(entry.get('pages') or [])
+                return entry['text'], ""
 
-        for match in re.finditer(pattern, text):
-            # Находим начало и конец строки с таблицей
-            start_pos = match.start()
-            end_of_line = text.find('\n', start_pos)
-            if end_of_line == -1:
-                end_of_line = len(text)
+        text, error_message = self.file_reader.read_file(file_path, pages)
 
-            full_line = text[start_pos:end_of_line].strip()
+        # Демо-текст означает, что извлечь текст не удалось - такое не кэшируем
+        if cache_key and text and text != self.file_reader.create_demo_text():
+            self.cache.put(cache_key, text, pages, backend=self.file_reader.backend_signature(file_path))
 
-            tables.append({
-                'id': match.group(1),  # Номер: "1.1"
-                'caption': match.group(3).strip() if match.group(3) else "без названия",
-                'full_text': full_line,
-                'position': start_pos
-            })
+        return text, error_message
 
-        return tables
+    def _cache_key(self, file_path: str) -> Optional[str]:
+        """Ключ кэша для существующего файла или None, если кэш выключен"""
+        if self.cache is None or not Path(file_path).is_file():
+            return None
+        return self.cache.make_key(self.cache.file_hash(file_path), self.file_reader.backend_signature(file_path))
 
     @staticmethod
-    def _extract_figures(text: str) -> list:
-        """Извлекает информацию о рисунках"""
-        figures = []
-
-        # Ищем "Рисунок X.Y: Название" или "Рисунок X.Y Название"
-        pattern = r'(?i)рисунок\s+(\d+(\.\d+)*)[\s:]*([^\n]+)'
-
-        for match in re.finditer(pattern, text):
-            # Находим начало и конец строки с рисунком
-            start_pos = match.start()
-            end_of_line = text.find('\n', start_pos)
-            if end_of_line == -1:
-                end_of_line = len(text)
-
-            full_line = text[start_pos:end_of_line].strip()
+    def _extract_structure(index: DocumentIndex) -> dict:
+        """Извлекает разделы, таблицы, рисунки, формулы и приложения за один проход"""
+        structure = {kind: [] for kind in EVENT_KINDS}
 
-            figures.append({
-                'id': match.group(1),  # Номер: "2.1"
-                'caption': match.group(3).strip() if match.group(3) else "без названия",
-                'full_text': full_line,
-                'position': start_pos
-            })
+        for event in _scanner.scan(index):
+            structure[event.kind].append(event.data)
 
-        return figures
+        return structure
 
     def parse_text(self, text: str) -> Document:
         """Парсит уже готовый текст (без чтения файла)"""
-        print("[Parser] Парсинг готового текста...")
+        logger.debug("[Parser] Парсинг готового текста...")
 
-        sections = self._extract_sections(text)
-        tables = self._extract_tables(text)
-        figures = self._extract_figures(text)
+        index = DocumentIndex.build(text)
+        structure = self._extract_structure(index)
 
         return Document(
             file_path="text_input",
             raw_text=text,
-            sections=sections,
-            tables=tables,
-            figures=figures
+            sections=structure['heading'],
+            tables=structure['table'],
+            figures=structure['figure'],
+            formulas=structure['formula'],
+            appendices=structure['appendix'],
+            index=index
         )
\ No newline at end of file
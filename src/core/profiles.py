@@ -0,0 +1,109 @@
+# src/core/profiles.py
+"""
+Проверка одного документа несколькими профилями правил.
+Документ читается и разбирается один раз, каждый профиль получает свои
+проверки над общим Document. Проверка выполняется один раз на пару
+(check_id, хеш действующих правил): профили, у которых правила проверки
+совпадают, получают общий результат.
+"""
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from src.checks import get_enabled_checks
+from src.checks.base_checker import BaseCheck
+from src.core.validator import Validator
+from src.models import CheckResult, Document
+from src.utils.logger import get_logger
+
+logger = get_logger('core.profiles')
+
+
+def profile_names(config_paths: Sequence[str]) -> List[str]:
+    """Имена профилей по файлам конфигов: имя файла без расширения, повторы - с номером"""
+    names = []
+    for path in config_paths:
+        stem = Path(path).stem or 'profile'
+        name, counter = stem, 1
+        while name in names:
+            counter += 1
+            name = f"{stem}_{counter}"
+        names.append(name)
+    return names
+
+
+def profile_report_path(report_path: str, profile: str) -> str:
+    """Путь отчёта профиля: reports/report.json -> reports/report.<профиль>.json"""
+    path = Path(report_path)
+    return str(path.with_name(f"{path.stem}.{profile}{path.suffix}"))
+
+
+class ProfileSet:
+    """Валидаторы нескольких профилей правил с общими результатами одинаковых проверок"""
+
+    def __init__(self, configs: Dict[str, dict], validator_options: Optional[dict] = None):
+        """configs - {имя профиля: конфиг или RuleSet}, в порядке вывода отчётов"""
+        self.validators: Dict[str, Validator] = {}
+        for name, config in configs.items():
+            validator = Validator(config, **(validator_options or {}))
+            for check in get_enabled_checks(config):
+                validator.register_check(check)
+            self.validators[name] = validator
+
+        unique = {self.check_key(check) for check in self.checks()}
+        logger.debug("[Profiles] Профилей: %d, проверок: %d, различных: %d",
+                     len(self.validators), sum(1 for _ in self.checks()), len(unique))
+
+    @staticmethod
+    def check_key(check: BaseCheck) -> Tuple[str, str]:
+        """Проверки с одним ключом дают на документе одинаковый результат"""
+        return check.check_id, check.rules_fingerprint()
+
+    def checks(self):
+        """Все проверки всех профилей по порядку"""
+        for validator in self.validators.values():
+            yield from validator.checks
+
+    def validate(self, document: Document) -> Dict[str, List[CheckResult]]:
+        """Результаты по профилям: каждая различная проверка выполняется один раз"""
+        computed: Dict[Tuple[str, str], CheckResult] = {}
+        for validator in self.validators.values():
+            pending, keys = [], set()
+            for check in validator.checks:
+                key = self.check_key(check)
+                if key not in computed and key not in keys:
+                    pending.append(check)
+                    keys.add(key)
+            if pending:
+                for check, result in zip(pending, validator.validate(document, pending)):
+                    computed[self.check_key(check)] = result
+        return self._by_profile(computed)
+
+    def validate_file_stream(self, parser, file_path: str) -> Tuple[Document, Dict[str, List[CheckResult]]]:
+        """
+        Потоковая проверка всеми профилями за один проход по тексту
+        (см. Validator.validate_file_stream). Если файл не удалось дочитать,
+        он разбирается и проверяется целиком.
+        """
+        from src.core.parser import StreamReadError
+
+        unique = {}
+        for check in self.checks():
+            unique.setdefault(self.check_key(check), check)
+
+        validator = next(iter(self.validators.values()))
+        document, chunks = parser.stream_document(file_path)
+        try:
+            results = validator.validate_stream(document, chunks, list(unique.values()))
+        except StreamReadError as e:
+            logger.warning("[Profiles] Ошибка потокового чтения: %s", e)
+            document = parser.parse(file_path)
+            return document, self.validate(document)
+        return document, self._by_profile(dict(zip(unique, results)))
+
+    def close(self):
+        for validator in self.validators.values():
+            validator.close()
+
+    def _by_profile(self, computed: dict) -> Dict[str, List[CheckResult]]:
+        return {name: [computed[self.check_key(check)] for check in validator.checks]
+                for name, validator in self.validators.items()}
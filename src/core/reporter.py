@@ -1,6 +1,6 @@
 import json
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 from src.models import Document, CheckResult
 from typing import Dict, Any
 
@@ -9,8 +9,8 @@ class Reporter:
     """Формирует финальный отчёт в формате JSON"""
 
     @staticmethod
-    def generate_report(*, document: Document, results: List[CheckResult]) -> dict:
-        """Создаёт структуру данных для отчёта"""
+    def generate_report(*, document: Document, results: List[CheckResult], profile: Optional[str] = None) -> dict:
+        """Создаёт структуру данных для отчёта; profile - имя профиля правил, если их несколько"""
 
         # Считаем статистику
         total = len(results)
@@ -19,14 +19,11 @@ class Reporter:
         report = {
             "document": document.file_path,
             "validation_date": datetime.now().isoformat(),
-            "summary": {
-                "total_checks": total,
-                "passed": passed,
-                "failed": total - passed,
-                "success_rate": f"{(passed / total) * 100:.1f}%" if total > 0 else "0%"
-            },
+            "summary": _check_summary(total, passed),
             "checks": []
         }
+        if profile is not None:
+            report["profile"] = profile
 
         # Добавляем детали по каждой проверке
         for result in results:
@@ -39,18 +36,166 @@ class Reporter:
             }
 
             for error in result.errors:
-                check_info["errors"].append({
-                    "description": error.description,
-                    "recommendation": error.recommendation,
-                    "gost_reference": error.gost_reference
-                })
+                check_info["errors"].append(_error_info(error))
 
             report["checks"].append(check_info)
 
+        # Замеры этапов: разбор, бэкенд чтения, каждая проверка
+        if document.timings:
+            report["timings"] = document.timings
+
         return report
 
+    @staticmethod
+    def generate_batch_summary(*, entries: List[dict], elapsed_sec: float, workers: int) -> dict:
+        """Сводный отчёт по пакетной проверке нескольких документов"""
+        summary = BatchSummary()
+        for entry in entries:
+            summary.add(entry)
+        report = summary.to_dict(elapsed_sec=elapsed_sec, workers=workers)
+        report["documents"] = entries
+        return report
+
+    @staticmethod
+    def stream_report(*, document: Document, results: List[CheckResult], report_path: str,
+                      profile: Optional[str] = None) -> dict:
+        """
+        Записывает отчёт в формате JSON Lines, не собирая его целиком:
+        строка "document", для каждой проверки строка "check" и её строки "error",
+        последней - строка "summary". Возвращает summary и статусы проверок.
+        """
+        passed = 0
+        statuses = {}
+        with JsonLinesWriter(report_path) as writer:
+            header = {
+                "type": "document",
+                "document": document.file_path,
+                "validation_date": datetime.now().isoformat()
+            }
+            if profile is not None:
+                header["profile"] = profile
+            writer.write(header)
+            for result in results:
+                writer.write({
+                    "type": "check",
+                    "id": result.check_id,
+                    "name": result.check_name,
+                    "status": result.status.value,
+                    "errors_count": len(result.errors)
+                })
+                for error in result.errors:
+                    writer.write({"type": "error", "check_id": result.check_id, **_error_info(error)})
+                passed += result.status.value == "PASSED"
+                statuses[result.check_id] = result.status.value
+
+            summary = {"type": "summary", "document": document.file_path,
+                       "summary": _check_summary(len(results), passed), "checks": statuses}
+            if document.timings:
+                summary["timings"] = document.timings
+            writer.write(summary)
+        return summary
+
     @staticmethod
     def save_report(*, report_data: Dict[str, Any], report_path: str):
         """Сохраняет отчет в JSON файл"""
         with open(report_path, 'w', encoding='utf-8') as f:
-            json.dump(report_data, f, ensure_ascii=False, indent=2)
\ No newline at end of file
+            json.dump(report_data, f, ensure_ascii=False, indent=2)
+
+
+class BatchSummary:
+    """
+    Сводка пакетной проверки, которая накапливается по мере готовности документов.
+    Хранит только счётчики, поэтому память не зависит от числа документов.
+    """
+
+    def __init__(self):
+        self.total_documents = 0
+        self.validated = 0
+        self.documents_passed = 0
+        self.total_checks = 0
+        self.passed = 0
+        self.checks: Dict[str, Dict[str, int]] = {}
+        self.cache = {"hits": 0, "misses": 0}
+
+    def add(self, entry: dict):
+        """Учитывает запись о документе (как у BatchRunner)"""
+        self.total_documents += 1
+        if entry.get("error"):
+            return
+
+        self.validated += 1
+        self.documents_passed += entry["summary"]["failed"] == 0
+        self.total_checks += entry["summary"]["total_checks"]
+        self.passed += entry["summary"]["passed"]
+
+        # Статистика по каждой проверке среди всех документов
+        for check_id, status in entry["checks"].items():
+            stats = self.checks.setdefault(check_id, {"PASSED": 0, "FAILED": 0, "ERROR": 0})
+            stats[status] = stats.get(status, 0) + 1
+
+        if entry.get("extraction_cache") == "hit":
+            self.cache["hits"] += 1
+        elif entry.get("extraction_cache") == "miss":
+            self.cache["misses"] += 1
+
+    def to_dict(self, *, elapsed_sec: float, workers: int) -> dict:
+        summary = _check_summary(self.total_checks, self.passed)
+        return {
+            "validation_date": datetime.now().isoformat(),
+            "workers": workers,
+            "elapsed_sec": round(elapsed_sec, 3),
+            "summary": {
+                "total_documents": self.total_documents,
+                "validated": self.validated,
+                "errors": self.total_documents - self.validated,
+                "documents_passed": self.documents_passed,
+                "total_checks": summary["total_checks"],
+                "passed": summary["passed"],
+                "failed": summary["failed"],
+                "success_rate": summary["success_rate"]
+            },
+            "checks": self.checks,
+            "extraction_cache": dict(self.cache) if any(self.cache.values()) else None
+        }
+
+
+class JsonLinesWriter:
+    """
+    Файл JSON Lines: одна запись - одна строка. Каждая строка сразу
+    сбрасывается на диск, так что файл можно читать (tail -f) во время записи.
+    """
+
+    def __init__(self, path: str, mode: str = 'w'):
+        self._file = open(path, mode, encoding='utf-8')
+
+    def write(self, record: dict):
+        self._file.write(json.dumps(record, ensure_ascii=False))
+        self._file.write('\n')
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _check_summary(total: int, passed: int) -> dict:
+    return {
+        "total_checks": total,
+        "passed": passed,
+        "failed": total - passed,
+        "success_rate": f"{(passed / total) * 100:.1f}%" if total > 0 else "0%"
+    }
+
+
+def _error_info(error) -> dict:
+    return {
+        "description": error.description,
+        "page": error.page,
+        "recommendation": error.recommendation,
+        "gost_reference": error.gost_reference
+    }
\ No newline at end of file
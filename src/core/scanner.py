@@ -0,0 +1,226 @@
+# src/core/scanner.py
+"""
+Однопроходный сканер структуры документа.
+Все семейства шаблонов (заголовки, таблицы, рисунки, формулы, приложения)
+компилируются один раз; текст обходится одним re.finditer по общей
+альтернативе с именованными группами. Заголовки распознаются прямо в ней,
+подписи и формулы уточняются заранее скомпилированным шаблоном семейства.
+"""
+import re
+from dataclasses import dataclass, field
+from typing import Iterator, Optional, Tuple
+
+from src.models import DocumentIndex, Page
+
+# Пробел внутри строки: \s без перевода строки
+_WS = r'[^\S\n]'
+
+# Заголовки - по строке целиком без учёта пробелов по краям (как line.strip()):
+# "1. Введение" / "1.1. Подраздел", "Глава 1. Название", "ВВЕДЕНИЕ" (все заглавные).
+# Название заканчивается последним непробельным символом строки.
+HEADING_PATTERNS = (
+    rf'(?P<h1>(?P<h1_num>\d+(?:\.\d+)*)(?:\.|{_WS})+(?P<h1_title>[А-Я](?:[^\n]*\S)?))',
+    rf'(?P<h2>(?P<h2_kind>Глава|Раздел|Часть){_WS}+(?P<h2_num>\d+)(?:\.|{_WS})+(?P<h2_title>[^\n]*\S))',
+    r'(?P<h3>[А-ЯЁ]{3,})',
+)
+
+# "Таблица X.Y: Название" / "Рисунок X.Y Название"
+TABLE_PATTERN = re.compile(r'(?i)таблица\s+(\d+(\.\d+)*)[\s:]*([^\n]+)')
+FIGURE_PATTERN = re.compile(r'(?i)рисунок\s+(\d+(\.\d+)*)[\s:]*([^\n]+)')
+# Номер формулы "(1)" или "(2.3)"
+FORMULA_PATTERN = re.compile(r'\((\d+(\.\d+)*)\)')
+
+APPENDIX_WORD = 'ПРИЛОЖЕНИЕ'
+
+EVENT_KINDS = ('heading', 'table', 'figure', 'formula', 'appendix')
+
+# Строка-заголовок или заголовок приложения (проверка нулевой длины от начала строки).
+# Внутри одной альтернативы заголовки проверяются в прежнем порядке приоритета.
+_LINE = rf'(?={_WS}*(?:(?:' + '|'.join(HEADING_PATTERNS) + rf'){_WS}*$|(?i:{APPENDIX_WORD})))'
+LINE_PATTERN = re.compile(_LINE, re.MULTILINE)
+
+# Общая альтернатива: места, с которых может начинаться элемент любого семейства.
+# Строчные элементы привязаны к переводу строки и не захватывают саму строку,
+# поэтому подписи и формулы внутри неё тоже будут найдены. Опережающий
+# набор первых символов позволяет движку re быстро пропускать остальной текст.
+MASTER_PATTERN = re.compile(
+    r'(?=[\nТтРр(])(?:'
+    rf'(?P<line>\n{_LINE})'
+    r'|(?P<table>(?i:таблица))'
+    r'|(?P<figure>(?i:рисунок))'
+    r'|(?P<formula>\((?=\d))'
+    r')',
+    re.MULTILINE
+)
+
+
+def _heading(hit: re.Match, line_stripped: str) -> Optional[Tuple[int, str]]:
+    """Уровень и название заголовка по совпадению LINE_PATTERN"""
+    if hit.group('h1') is not None:
+        return 1, hit.group('h1_title')
+    if hit.group('h2') is not None:
+        return 2, f"{hit.group('h2_kind')} {hit.group('h2_num')}. {hit.group('h2_title')}"
+    if hit.group('h3') is not None:
+        return 3, line_stripped
+    return None
+
+
+def scan_heading(line: str) -> Optional[Tuple[int, str]]:
+    """Уровень и название заголовка в отдельной строке; None - строка не заголовок"""
+    hit = LINE_PATTERN.match(line)
+    return _heading(hit, line.strip()) if hit else None
+
+
+@dataclass(frozen=True, slots=True)
+class StructureEvent:
+    """Найденный элемент структуры: тип, смещения в тексте и данные для Document"""
+    kind: str  # heading | table | figure | formula | appendix
+    start: int
+    end: int
+    data: dict = field(default_factory=dict)
+
+
+class StructureScanner:
+    """Обходит текст один раз и выдаёт события структуры в порядке смещений"""
+
+    def scan(self, index: DocumentIndex, base_offset: int = 0, base_line: int = 0,
+             limit: Optional[int] = None, last_end: Optional[dict] = None) -> Iterator[StructureEvent]:
+        """
+        base_offset/base_line сдвигают смещения и номера строк событий (сканирование
+        части документа). События, начинающиеся с limit и дальше, не выдаются.
+        last_end - конец последней подписи по семействам; передаётся между частями.
+        """
+        text = index.text
+        limit = len(text) if limit is None else limit
+        # Конец последнего совпадения по семейству: совпадения внутри одного
+        # семейства не перекрываются, как при отдельном re.finditer
+        if last_end is None:
+            last_end = {}
+        last_end.setdefault('table', 0)
+        last_end.setdefault('figure', 0)
+
+        # Первая строка не предваряется переводом строки
+        first_line = LINE_PATTERN.match(text)
+        if first_line and limit > 0:
+            yield from self._scan_line(index, 0, first_line, base_offset, base_line)
+
+        for hit in MASTER_PATTERN.finditer(text):
+            kind = hit.lastgroup
+            start = hit.start()
+
+            if kind == 'line':
+                if start + 1 >= limit:
+                    break
+                yield from self._scan_line(index, index.line_at(start) + 1, hit, base_offset, base_line)
+                continue
+
+            if start >= limit:
+                break
+
+            if kind in last_end:
+                if start < last_end[kind]:
+                    continue
+                pattern = TABLE_PATTERN if kind == 'table' else FIGURE_PATTERN
+                match = pattern.match(text, start)
+                if match:
+                    last_end[kind] = match.end()
+                    yield self._caption_event(kind, index, match, base_offset)
+
+            elif kind == 'formula':
+                match = FORMULA_PATTERN.match(text, start)
+                if match:
+                    yield StructureEvent('formula', base_offset + start, base_offset + match.end(), {
+                        'id': match.group(1),
+                        'full_text': match.group(0),
+                        'position': base_offset + start
+                    })
+
+    @staticmethod
+    def _scan_line(index: DocumentIndex, line_number: int, hit: re.Match,
+                   base_offset: int, base_line: int) -> Iterator[StructureEvent]:
+        """События для строки: заголовок и/или заголовок приложения"""
+        line_stripped = index.lines[line_number].strip()
+        start = base_offset + index.line_starts[line_number]
+        end = base_offset + index.line_end(line_number)
+
+        heading = _heading(hit, line_stripped)
+        if heading is not None:
+            level, title = heading
+            yield StructureEvent('heading', start, end, {
+                'title': title,
+                'level': level,
+                'line_number': base_line + line_number,
+                'original_text': line_stripped
+            })
+
+        if line_stripped.upper().startswith(APPENDIX_WORD):
+            yield StructureEvent('appendix', start, end, {
+                'line_number': base_line + line_number,
+                'original_text': line_stripped,
+                'position': start
+            })
+
+    @staticmethod
+    def _caption_event(kind: str, index: DocumentIndex, match: re.Match, base_offset: int) -> StructureEvent:
+        """Событие подписи таблицы или рисунка"""
+        start_pos = match.start()
+        end_of_line = index.line_end(index.line_at(start_pos))
+
+        return StructureEvent(kind, base_offset + start_pos, base_offset + match.end(), {
+            'id': match.group(1),  # Номер: "1.1"
+            'caption': match.group(3).strip() if match.group(3) else "без названия",
+            'full_text': index.text[start_pos:end_of_line].strip(),
+            'position': base_offset + start_pos
+        })
+
+
+class StreamingStructureScanner:
+    """
+    Сканирует документ по страницам. Части склеиваются переводом строки,
+    как при чтении целиком; страница сканируется вместе со следующей, чтобы
+    подпись на стыке страниц разбиралась так же, как в полном тексте.
+    Одновременно в памяти находятся не более двух страниц.
+    """
+
+    def __init__(self):
+        self.structure = {kind: [] for kind in EVENT_KINDS}
+        self.pages = []
+        self._scanner = StructureScanner()
+        self._pending = None
+        self._offset = 0
+        self._line = 0
+        self._last_end = {}
+
+    def feed(self, page: Page):
+        """Добавляет очередную страницу; пустые страницы в текст не попадают"""
+        if not page.text:
+            return
+        if self._pending is not None:
+            self._flush(lookahead=page.text)
+        self._pending = page
+
+    def finish(self) -> dict:
+        """Досканирует последнюю страницу и возвращает структуру документа"""
+        if self._pending is not None:
+            self._flush(lookahead=None)
+            self._pending = None
+        return self.structure
+
+    def _flush(self, lookahead: Optional[str]):
+        page = self._pending
+        chunk = page.text
+        window = chunk if lookahead is None else f"{chunk}\n{lookahead}"
+
+        events = self._scanner.scan(DocumentIndex.build(window), base_offset=self._offset,
+                                    base_line=self._line, limit=len(chunk), last_end=self._last_end)
+        for event in events:
+            self.structure[event.kind].append(event.data)
+
+        self.pages.append({'number': page.number, 'position': self._offset})
+
+        # Переходим к координатам следующей части
+        step = len(chunk) + 1
+        for kind in self._last_end:
+            self._last_end[kind] = max(0, self._last_end[kind] - step)
+        self._offset += step
+        self._line += chunk.count('\n') + 1
@@ -0,0 +1,349 @@
+# src/core/server.py
+"""
+Локальный HTTP-сервис проверки документов.
+Процессы-исполнители создаются при запуске и один раз инициализируют
+Parser, Validator и проверки (как в пакетном режиме), поэтому запрос
+не платит за старт интерпретатора, импорты и загрузку конфига.
+
+    POST /validate?path=<путь>          - проверить файл на диске сервера
+    POST /validate?filename=<имя.docx>  - проверить документ из тела запроса
+    GET  /health                        - сервис жив
+    GET  /metrics                       - счётчики запросов и очередь
+
+Ответ /validate - тот же JSON, что Reporter.generate_report.
+Одновременно выполняется не больше workers документов, ещё max_queue
+ждут в очереди; остальные запросы сразу получают 503 с Retry-After.
+"""
+import asyncio
+import contextlib
+import json
+import shutil
+import signal
+import tempfile
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from src.core import batch
+from src.utils import SUPPORTED_FORMATS
+from src.utils.logger import get_logger
+
+logger = get_logger('core.server')
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8080
+DEFAULT_MAX_QUEUE = 16
+DEFAULT_MAX_BODY_MB = 50
+
+REASONS = {
+    200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+    413: 'Payload Too Large', 500: 'Internal Server Error', 503: 'Service Unavailable',
+    504: 'Gateway Timeout'
+}
+
+
+def _serve_document(document_path: str, document_name: Optional[str] = None) -> dict:
+    """Отчёт по документу в процессе-исполнителе; document_name - имя загруженного файла"""
+    report = batch._report_document(document_path)
+    if document_name:
+        report['document'] = document_name
+    return report
+
+
+def _warm_up() -> bool:
+    """Пустая задача: заставляет пул запустить и инициализировать исполнителя"""
+    return True
+
+
+class HttpError(Exception):
+    """Ответ с кодом ошибки и сообщением"""
+
+    def __init__(self, status: int, message: str, headers: Optional[dict] = None):
+        super().__init__(message)
+        self.status = status
+        self.headers = headers or {}
+
+
+class ValidationServer:
+    """HTTP-сервер на asyncio поверх пула инициализированных исполнителей"""
+
+    def __init__(self, config: dict, workers: int = 1, max_queue: int = DEFAULT_MAX_QUEUE,
+                 stream: bool = False, parser_options: Optional[dict] = None,
+                 validator_options: Optional[dict] = None, request_timeout: Optional[float] = None,
+                 max_body_mb: int = DEFAULT_MAX_BODY_MB, stream_checks: bool = False):
+        """
+        workers - число процессов-исполнителей; 1 - проверка в потоке этого процесса.
+        max_queue - сколько запросов может ждать свободного исполнителя.
+        request_timeout - предел ожидания отчёта в секундах (504 по истечении).
+        stream_checks - потоковая проверка без сборки текста документа целиком.
+        """
+        self.config = config
+        self.workers = max(1, workers)
+        self.max_queue = max(0, max_queue)
+        self.stream = stream
+        self.stream_checks = stream_checks
+        self.parser_options = parser_options or {}
+        self.validator_options = validator_options or {}
+        self.request_timeout = request_timeout
+        self.max_body = max_body_mb * 1024 * 1024
+
+        self._pool = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._upload_dir: Optional[str] = None
+        self._started = None
+        self._in_flight = 0
+        self._queued = 0
+        self._counters = {'total': 0, 'ok': 0, 'rejected': 0, 'failed': 0}
+        self._latency_count = 0
+        self._latency_total = 0.0
+        self._latency_max = 0.0
+
+    async def start(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                    unix_socket: Optional[str] = None) -> asyncio.AbstractServer:
+        """Запускает исполнителей и начинает принимать соединения"""
+        initargs = (self.config, self.stream, self.parser_options, self.validator_options, None,
+                    self.stream_checks)
+        if self.workers == 1:
+            # Без процессов: удобно для отладки, как BatchRunner с одним исполнителем
+            self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='validate',
+                                            initializer=batch._init_worker, initargs=initargs)
+        else:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers,
+                                             initializer=batch._init_worker, initargs=initargs)
+
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self._pool, _warm_up) for _ in range(self.workers)))
+
+        self._slots = asyncio.Semaphore(self.workers)
+        self._upload_dir = tempfile.mkdtemp(prefix='gost-server-')
+        self._started = time.monotonic()
+
+        if unix_socket:
+            self._server = await asyncio.start_unix_server(self._handle, path=unix_socket)
+        else:
+            self._server = await asyncio.start_server(self._handle, host=host, port=port)
+
+        logger.info("[Server] Принимаю запросы: %s, исполнителей: %d", self.address, self.workers)
+        return self._server
+
+    @property
+    def address(self):
+        """Адрес прослушивания: (хост, порт) или путь unix-сокета"""
+        if self._server is None or not self._server.sockets:
+            return None
+        return self._server.sockets[0].getsockname()
+
+    async def serve_forever(self):
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        """Останавливает приём соединений и исполнителей, удаляет загрузки"""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+        if self._upload_dir:
+            shutil.rmtree(self._upload_dir, ignore_errors=True)
+            self._upload_dir = None
+
+    def metrics(self) -> dict:
+        """Счётчики запросов /validate, текущая загрузка и время ответа"""
+        return {
+            'uptime_sec': round(time.monotonic() - self._started, 3) if self._started else 0,
+            'workers': self.workers,
+            'in_flight': self._in_flight,
+            'queued': self._queued,
+            'max_queue': self.max_queue,
+            'requests': dict(self._counters),
+            'latency_ms': {
+                'avg': round(self._latency_total / self._latency_count * 1000, 1) if self._latency_count else None,
+                'max': round(self._latency_max * 1000, 1)
+            }
+        }
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Одно соединение - один запрос"""
+        try:
+            status, payload, headers = await self._respond(reader)
+        except HttpError as e:
+            status, payload, headers = e.status, {'error': str(e)}, e.headers
+        except (asyncio.IncompleteReadError, ConnectionError):
+            writer.close()
+            return
+        except Exception as e:
+            logger.warning("[Server] Ошибка обработки запроса: %s", e)
+            status, payload, headers = 500, {'error': f"{type(e).__name__}: {e}"}, {}
+
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        head = [f"HTTP/1.1 {status} {REASONS.get(status, '')}",
+                "Content-Type: application/json; charset=utf-8",
+                f"Content-Length: {len(body)}",
+                "Connection: close"]
+        head += [f"{name}: {value}" for name, value in headers.items()]
+        try:
+            writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + body)
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, reader: asyncio.StreamReader) -> Tuple[int, dict, dict]:
+        request_line = (await reader.readline()).decode('latin-1').split()
+        if len(request_line) != 3:
+            raise HttpError(400, "Некорректная строка запроса")
+        method, target, _ = request_line
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        url = urlsplit(target)
+        if url.path == '/health':
+            self._require_method(method, 'GET')
+            return 200, {'status': 'ok', 'workers': self.workers}, {}
+        if url.path == '/metrics':
+            self._require_method(method, 'GET')
+            return 200, self.metrics(), {}
+        if url.path == '/validate':
+            self._require_method(method, 'POST')
+            return await self._validate(reader, headers, parse_qs(url.query))
+        raise HttpError(404, f"Неизвестный адрес: {url.path}")
+
+    async def _validate(self, reader: asyncio.StreamReader, headers: dict, query: dict) -> Tuple[int, dict, dict]:
+        self._counters['total'] += 1
+
+        # Очередь заполнена: отказываем до чтения тела, клиент повторит позже
+        if self._in_flight + self._queued >= self.workers + self.max_queue:
+            self._counters['rejected'] += 1
+            raise HttpError(503, "Сервис перегружен, повторите запрос позже", {'Retry-After': '1'})
+
+        try:
+            length = int(headers.get('content-length') or 0)
+        except ValueError:
+            raise HttpError(400, "Некорректный Content-Length")
+        if length > self.max_body:
+            self._counters['rejected'] += 1
+            raise HttpError(413, f"Документ больше {self.max_body // (1024 * 1024)} МБ")
+
+        self._queued += 1
+        queued, upload = True, None
+        try:
+            body = await reader.readexactly(length) if length else b''
+            document_path, document_name = self._document_source(query, body)
+            if body:
+                upload = document_path
+                await asyncio.to_thread(Path(upload).write_bytes, body)
+                del body
+
+            await self._slots.acquire()
+            self._queued -= 1
+            queued = False
+            # Слот и загрузку освобождает _run, когда исполнитель закончит документ
+            owned, upload = upload, None
+            started = time.monotonic()
+            try:
+                report = await self._run(document_path, document_name, owned)
+            finally:
+                self._record_latency(time.monotonic() - started)
+        except BaseException:
+            self._counters['failed'] += 1
+            raise
+        finally:
+            if queued:
+                self._queued -= 1
+            if upload:
+                Path(upload).unlink(missing_ok=True)
+
+        self._counters['ok'] += 1
+        return 200, report, {}
+
+    async def _run(self, document_path: str, document_name: Optional[str], upload: Optional[str]) -> dict:
+        """
+        Проверка в исполнителе; вызывается с занятым слотом. Слот и загруженный
+        файл upload освобождаются, когда исполнитель закончит документ. По
+        истечении request_timeout клиент получает 504, а исполнитель дорабатывает
+        документ (прервать его нельзя): слот остаётся занятым, поэтому зависшие
+        документы не копят работу в пуле - новые запросы ждут или получают 503.
+        """
+        self._in_flight += 1
+
+        def finished(future):
+            self._in_flight -= 1
+            self._slots.release()
+            if upload:
+                Path(upload).unlink(missing_ok=True)
+            if future is not None and not future.cancelled() and future.exception() is not None:
+                logger.debug("[Server] Ошибка проверки %s: %s", document_path, future.exception())
+
+        try:
+            future = asyncio.get_running_loop().run_in_executor(self._pool, _serve_document,
+                                                                document_path, document_name)
+        except BaseException:
+            finished(None)
+            raise
+        future.add_done_callback(finished)
+        try:
+            # shield: отмена ожидания не отменяет задачу исполнителя и не освобождает слот раньше времени
+            return await asyncio.wait_for(asyncio.shield(future), self.request_timeout)
+        except asyncio.TimeoutError:
+            raise HttpError(504, f"Проверка не завершилась за {self.request_timeout:g} с")
+
+    def _document_source(self, query: dict, body: bytes) -> Tuple[str, Optional[str]]:
+        """Путь к проверяемому файлу и имя документа для отчёта"""
+        if body:
+            name = Path((query.get('filename') or [''])[0]).name
+            suffix = Path(name).suffix.lower()
+            if suffix not in SUPPORTED_FORMATS:
+                raise HttpError(400, f"Укажите filename с расширением: {', '.join(SUPPORTED_FORMATS)}")
+            return str(Path(self._upload_dir) / f"{uuid.uuid4().hex}{suffix}"), name
+
+        path = (query.get('path') or [''])[0]
+        if not path:
+            raise HttpError(400, "Укажите path или передайте документ в теле запроса")
+        if not Path(path).is_file():
+            raise HttpError(404, f"Файл не найден: {path}")
+        return path, None
+
+    def _record_latency(self, elapsed: float):
+        self._latency_count += 1
+        self._latency_total += elapsed
+        self._latency_max = max(self._latency_max, elapsed)
+
+    @staticmethod
+    def _require_method(method: str, expected: str):
+        if method != expected:
+            raise HttpError(405, f"Ожидается метод {expected}", {'Allow': expected})
+
+
+def run_server(server: ValidationServer, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+               unix_socket: Optional[str] = None):
+    """Запускает сервер и работает до Ctrl+C или SIGTERM"""
+    async def main():
+        await server.start(host, port, unix_socket)
+        # SIGTERM (остановка службы) завершает сервер так же, как Ctrl+C
+        with contextlib.suppress(NotImplementedError):
+            asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+        try:
+            await server.serve_forever()
+        except asyncio.CancelledError:
+            pass
+        finally:
+            await server.close()
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
@@ -1,15 +1,89 @@
 # src/core/validator.py
-from typing import List
-from src.models import Document, CheckResult
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Iterable, List, Optional, Tuple
+from src.models import Document, CheckResult, CheckStatus, TextChunk, ValidationError
 from src.checks.base_checker import BaseCheck
+from src.utils.logger import get_logger
+from src.utils.rule_set import RuleSet
+from src.utils.profiling import Profiler
+
+logger = get_logger('core.validator')
+
+# Пока ни одна проверка не начала выполняться, пределы времени проверяются с этим шагом, с
+START_POLL_SEC = 0.05
+
+# Проверки процесса-исполнителя в режиме 'process' и общий массив времён начала
+# проверок (time.monotonic - общие для всех процессов часы), задаются в _init_check_worker
+_worker_checks = None
+_worker_started = None
+
+
+def _init_check_worker(checks: List[BaseCheck], started=None):
+    """Инициализирует процесс-исполнитель: проверки передаются один раз"""
+    global _worker_checks, _worker_started
+    _worker_checks = checks
+    _worker_started = started
+
+
+def _run_check_in_worker(check_index: int, document: Document, slot: int = 0) -> Tuple[CheckResult, dict]:
+    """
+    Выполняет проверку с номером check_index в процессе-исполнителе, возвращает её замер.
+    Время начала записывается в ячейку slot общего массива: от него отсчитывается предел времени.
+    """
+    if _worker_started is not None:
+        _worker_started[slot] = time.monotonic()
+    return _run_measured(_worker_checks[check_index], document, Profiler())
+
+
+def _run_started(started: list, slot: int, check: BaseCheck, document: Document,
+                 profiler: Profiler) -> Tuple[CheckResult, dict]:
+    """Выполняет проверку в потоке пула, записав время её начала в started[slot]"""
+    started[slot] = time.monotonic()
+    return _run_measured(check, document, profiler, False)
+
+
+def _run_measured(check: BaseCheck, document: Document, profiler: Profiler,
+                  track_memory: bool = True) -> Tuple[CheckResult, dict]:
+    """Выполняет проверку под профайлером: (результат, замер)"""
+    stage_name = f"check.{check.check_id}"
+    with profiler.measure(stage_name, track_memory=track_memory):
+        result = check.run(document)
+    return result, profiler.timings[stage_name]
 
 
 class Validator:
     """Главный двигатель проверок. Управляет всеми чекерами."""
 
-    def __init__(self, config: dict = None):
+    # Режимы выполнения: по очереди, в пуле потоков, в пуле процессов
+    EXECUTORS = ('serial', 'thread', 'process')
+
+    def __init__(self, config: dict = None, executor: str = 'serial',
+                 max_workers: Optional[int] = None, check_timeout: Optional[float] = None,
+                 result_cache: Optional['ResultCache'] = None):
+        """
+        executor - 'serial', 'thread' или 'process'.
+        check_timeout - предел времени одной проверки в секундах (только для пулов);
+        для отдельных проверок переопределяется в check_settings.check_timeouts.
+        result_cache - кэш результатов: проверки, чьи документ, правила и
+        реализация не изменились, не выполняются (только validate()).
+        """
+        if executor not in self.EXECUTORS:
+            raise ValueError(f"Неизвестный режим выполнения проверок: {executor}")
+
         self.checks: List[BaseCheck] = []  # Список зарегистрированных проверок
-        self.config = config  # Сохраняем конфиг
+        # Правила компилируются один раз и передаются всем проверкам (ConfigError при ошибке)
+        self.config = RuleSet.from_config(config) if config else config
+        self.executor = executor
+        self.max_workers = max_workers
+        self.check_timeout = check_timeout
+        self.check_timeouts = ((config or {}).get('check_settings') or {}).get('check_timeouts') or {}
+        self.result_cache = result_cache
+        self._pool = None
+        self._pool_checks = 0  # Сколько проверок было передано в пул процессов
+        self._started = None   # Общий с процессами пула массив времён начала проверок
 
     def register_check(self, check: BaseCheck):
         """Добавляет проверку в систему и передаёт конфигурацию"""
@@ -18,17 +92,245 @@ class Validator:
             check.set_rules(self.config)
 
         self.checks.append(check)
-        print("[Валидатор] Зарегистрирована проверка: ", end="")
+        logger.debug("[Валидатор] Зарегистрирована проверка: %s", check.check_id)
+
+    def validate(self, document: Document, checks: Optional[List[BaseCheck]] = None) -> List[CheckResult]:
+        """
+        Запускает ВСЕ зарегистрированные проверки для документа.
+        checks - только эти из зарегистрированных (инкрементальная проверка).
+        """
+        logger.info("[Валидатор] Запуск проверок для: %s", document.file_path)
+        checks = self.checks if checks is None else checks
+        results, keys = self._cached_results(document, checks)
+        pending = [i for i, result in enumerate(results) if result is None]
+        pending_checks = [checks[i] for i in pending]
+
+        if self.executor == 'serial' or not pending_checks:
+            profiler = Profiler()
+            measured = [_run_measured(check, document, profiler) for check in pending_checks]
+        else:
+            measured = self._validate_concurrent(document, pending_checks)
+
+        for i, (result, timing) in zip(pending, measured):
+            results[i] = result
+            if timing is not None:
+                document.timings[f"check.{checks[i].check_id}"] = timing
+        if keys:
+            self.result_cache.put_results({keys[i]: results[i] for i in pending if i in keys})
+
+        # Результаты и вывод - в порядке регистрации проверок
+        if logger.isEnabledFor(logging.INFO):
+            for check, result in zip(checks, results):
+                status_icon = "✅" if result.status.value == "PASSED" else "❌"
+                logger.info("  %s %s: %s", status_icon, check.check_name, result.status.value)
+
+        return results
+
+    def _cached_results(self, document: Document,
+                        checks: List[BaseCheck]) -> Tuple[List[Optional[CheckResult]], dict]:
+        """Результаты проверок из кэша (None - нужно выполнить) и ключи кэша {номер: ключ}"""
+        results: List[Optional[CheckResult]] = [None] * len(checks)
+        keys = {}
+        if self.result_cache is None:
+            return results, keys
+
+        document_hash = self.result_cache.document_hash(document)
+        for i, check in enumerate(checks):
+            if check.cacheable:
+                keys[i] = self.result_cache.check_key(check, document_hash)
+                results[i] = self.result_cache.get_result(keys[i])
+        logger.info("[Валидатор] Результатов из кэша: %d из %d",
+                    sum(result is not None for result in results), len(checks))
+        return results, keys
+
+    def validate_stream(self, document: Document, chunks: Iterable[TextChunk],
+                        checks: Optional[List[BaseCheck]] = None) -> List[CheckResult]:
+        """
+        Потоковая проверка: блоки строк за один проход подаются всем проверкам
+        по очереди (begin/feed/finish), текст целиком в памяти не собирается.
+        Результаты совпадают с validate() по тексту из тех же блоков.
+        Выполняется в текущем потоке; в замерах проверок пик памяти не указывается.
+        """
+        logger.info("[Валидатор] Потоковый запуск проверок для: %s", document.file_path)
+        checks = self.checks if checks is None else checks
+        timings = [{'wall_sec': 0.0, 'cpu_sec': 0.0, 'peak_alloc_kb': None} for _ in checks]
+
+        def measured(i: int, method, *args):
+            wall_start, cpu_start = time.perf_counter(), time.thread_time()
+            try:
+                return method(*args)
+            finally:
+                timings[i]['wall_sec'] += time.perf_counter() - wall_start
+                timings[i]['cpu_sec'] += time.thread_time() - cpu_start
+
+        for i, check in enumerate(checks):
+            measured(i, check.begin, document)
+        for chunk in chunks:
+            for i, check in enumerate(checks):
+                measured(i, check.feed, chunk)
+        results = [measured(i, check.finish) for i, check in enumerate(checks)]
+
+        for check, result, timing in zip(checks, results, timings):
+            timing['wall_sec'] = round(timing['wall_sec'], 6)
+            timing['cpu_sec'] = round(timing['cpu_sec'], 6)
+            document.timings[f"check.{check.check_id}"] = timing
+            if logger.isEnabledFor(logging.INFO):
+                status_icon = "✅" if result.status.value == "PASSED" else "❌"
+                logger.info("  %s %s: %s", status_icon, check.check_name, result.status.value)
+
+        return results
+
+    def validate_file_stream(self, parser, file_path: str) -> Tuple[Document, List[CheckResult]]:
+        """
+        Читает файл через parser.stream_document() и проверяет его потоково.
+        Если файл не удалось дочитать, он разбирается и проверяется целиком -
+        с демо-текстом, как при обычной проверке.
+        """
+        from src.core.parser import StreamReadError
+
+        document, chunks = parser.stream_document(file_path)
+        profiler = Profiler()
+        try:
+            # Общий замер: чтение файла и проверки идут вперемешку
+            with profiler.activate(), profiler.measure('validator.validate_file_stream'):
+                results = self.validate_stream(document, chunks)
+        except StreamReadError as e:
+            logger.warning("[Валидатор] Ошибка потокового чтения: %s", e)
+            document = parser.parse(file_path)
+            return document, self.validate(document)
+
+        document.timings.update(profiler.timings)
+        return document, results
+
+    def close(self):
+        """Останавливает пул исполнителей"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+    def _validate_concurrent(self, document: Document,
+                             checks: List[BaseCheck]) -> List[Tuple[CheckResult, Optional[dict]]]:
+        """
+        Запускает проверки в пуле и ждёт их с учётом пределов времени.
+        Время каждой проверки отсчитывается от момента, когда она начала
+        выполняться, а не от постановки в пул: ожидание свободного исполнителя
+        (пул процессов по умолчанию не больше числа ядер) в предел не входит.
+        Проверку, вышедшую за предел, процесс-исполнитель прерывает вместе с
+        процессом. Поток прервать нельзя: результатом станет ERROR, но проверка,
+        удерживающая GIL (например, катастрофический возврат в регулярном
+        выражении), продолжит занимать процессор - для таких проверок нужен 'process'.
+        Исключение проверки пробрасывается, как и при последовательном запуске.
+        В потоках пик памяти не измеряется: tracemalloc общий для процесса.
+        """
+        pool = self._get_pool()
+
+        if self.executor == 'process':
+            # Процесс-исполнитель знает проверки по номеру регистрации
+            numbers = {id(check): i for i, check in enumerate(self.checks)}
+            started = self._started
+            for slot in range(len(checks)):
+                started[slot] = 0.0
+            futures = [pool.submit(_run_check_in_worker, numbers[id(check)], document, slot)
+                       for slot, check in enumerate(checks)]
+        else:
+            profiler = Profiler()
+            started = [0.0] * len(checks)
+            futures = [pool.submit(_run_started, started, slot, check, document, profiler)
+                       for slot, check in enumerate(checks)]
+
+        timeouts = {future: self._timeout_for(check) for future, check in zip(futures, checks)
+                    if self._timeout_for(check) is not None}
+
+        results = [None] * len(futures)
+        positions = {future: i for i, future in enumerate(futures)}
+        pending = set(futures)
+        timed_out = False
+
+        def deadline(future) -> Optional[float]:
+            start = started[positions[future]]
+            return start + timeouts[future] if start else None
+
+        while pending:
+            timed = [f for f in pending if f in timeouts]
+            deadlines = [d for d in map(deadline, timed) if d is not None]
+            timeout = max(0.0, min(deadlines) - time.monotonic()) if deadlines else None
+            if len(deadlines) < len(timed):
+                # Проверка ещё не началась или только что началась - время начала появится позже
+                timeout = START_POLL_SEC if timeout is None else min(timeout, START_POLL_SEC)
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                results[positions[future]] = future.result()
+
+            now = time.monotonic()
+            expired = [f for f in pending if f in timeouts and deadline(f) is not None and deadline(f) <= now]
+            for future in expired:
+                pending.discard(future)
+                future.cancel()
+                check = checks[positions[future]]
+                results[positions[future]] = (self._timeout_result(check, self._timeout_for(check)), None)
+                timed_out = True
+
+        if timed_out:
+            self._discard_pool()
+
+        return results
+
+    def _timeout_for(self, check: BaseCheck) -> Optional[float]:
+        """Предел времени проверки: из check_settings.check_timeouts или общий"""
+        return self.check_timeouts.get(check.check_id, self.check_timeout)
+
+    def _get_pool(self):
+        """Пул создаётся при первом запуске и переиспользуется между документами"""
+        if self.executor == 'process' and self._pool is not None and self._pool_checks != len(self.checks):
+            # После регистрации новых проверок процессы нужно инициализировать заново
+            self.close()
+
+        if self._pool is None:
+            if self.executor == 'process':
+                from concurrent.futures import ProcessPoolExecutor  # multiprocessing - только для процессов
+
+                from multiprocessing import Array
 
-    def validate(self, document: Document) -> List[CheckResult]:
-        """Запускает ВСЕ зарегистрированные проверки для документа"""
-        print(f"[Валидатор] Запуск проверок для: {document.file_path}")
-        results = []
+                workers = self.max_workers or min(len(self.checks), os.cpu_count() or 1)
+                # Время начала проверок пишут процессы-исполнители: ячейка на проверку вызова validate()
+                self._started = Array('d', max(len(self.checks), 1), lock=False)
+                self._pool = ProcessPoolExecutor(max_workers=workers,
+                                                 initializer=_init_check_worker,
+                                                 initargs=(self.checks, self._started))
+                self._pool_checks = len(self.checks)
+            else:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers or len(self.checks),
+                                                thread_name_prefix='check')
+        return self._pool
 
-        for check in self.checks:
-            result = check.run(document)
-            results.append(result)
-            status_icon = "✅" if result.status.value == "PASSED" else "❌"
-            print(f"  {status_icon} {check.check_name}: {result.status.value}")
+    def _discard_pool(self):
+        """
+        Бросает пул с зависшей проверкой: следующий документ получит новый.
+        Процессы завершаются принудительно; поток прервать нельзя, он
+        доработает в фоне, но новые проверки в него уже не попадут.
+        """
+        pool, self._pool = self._pool, None
+        if self.executor == 'process':
+            # Публичного способа остановить процессы пула до Python 3.14 нет
+            terminate = getattr(pool, 'terminate_workers', None)
+            if terminate is not None:
+                terminate()
+            else:
+                for process in list((getattr(pool, '_processes', None) or {}).values()):
+                    process.terminate()
+        pool.shutdown(wait=False, cancel_futures=True)
 
-        return results
\ No newline at end of file
+    @staticmethod
+    def _timeout_result(check: BaseCheck, timeout: float) -> CheckResult:
+        """Результат проверки, не уложившейся в предел времени"""
+        return CheckResult(
+            check_id=check.check_id,
+            check_name=check.check_name,
+            status=CheckStatus.ERROR,
+            errors=[ValidationError(
+                check_name=check.check_name,
+                description=f"Проверка не завершилась за {timeout:g} с",
+                recommendation="Увеличьте check_timeout или проверьте документ на аномальный текст"
+            )]
+        )
@@ -1,16 +1,144 @@
+# Тяжёлые модули (YAML, ридеры, проверки, asyncio) импортируются там,
+# где они нужны, чтобы --help и короткие документы не платили за лишнее
 import sys
+import glob
 import argparse
 from pathlib import Path
+from typing import Optional
 
 # Настройка пути для импортов
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from src.utils.extraction_cache import DEFAULT_CACHE_DIR, DEFAULT_MAX_SIZE_MB
 
-from src.utils import ConfigLoader
-from src.core import Parser, Validator, Reporter
-from src.checks import get_all_checks
+DEFAULT_CONFIG = 'config/gost_2_105_rules.yaml'
 
 
+def is_batch_request(args) -> bool:
+    """Пакетный режим: несколько путей, каталог, glob-шаблон, файл со списком или очередь заданий"""
+    if args.file_list or args.queue or len(args.documents) > 1:
+        return True
+    return any(Path(doc).is_dir() or glob.has_magic(doc) for doc in args.documents)
+
+
+def parser_options(args) -> dict:
+    """Аргументы Parser из командной строки"""
+    from src.utils import ExtractionCache
+
+    cache = None if args.no_cache else ExtractionCache(args.cache_dir, args.cache_size_mb)
+    return {'pdf_workers': args.pdf_workers, 'cache': cache, 'docx_backend': args.docx_backend}
+
+
+def validator_options(args) -> dict:
+    """Аргументы Validator из командной строки"""
+    from src.utils import ResultCache
+
+    result_cache = None if args.no_cache else ResultCache(args.cache_dir, args.cache_size_mb)
+    return {'executor': args.check_executor, 'check_timeout': args.check_timeout, 'result_cache': result_cache}
+
+
+def run_batch(args, config: dict, profiles: Optional[dict] = None):
+    """Пакетная проверка документов в пуле процессов"""
+    from src.core.batch import BatchRunner, collect_documents
+
+    documents = collect_documents(args.documents, args.file_list)
+    # С очередью документы можно не указывать: выполняются уже добавленные задания
+    if not documents and not args.queue:
+        print("Не найдено ни одного документа для проверки")
+        sys.exit(1)
+
+    if args.verbose:
+        print(f"[Batch] Документов: {len(documents)}, процессов: {args.workers or 'все ядра'}")
+
+    runner = BatchRunner(config, output_dir=args.output_dir, workers=args.workers, stream=args.stream,
+                         parser_options=parser_options(args), validator_options=validator_options(args),
+                         profile_dir=args.profile, report_format=args.report_format,
+                         stream_checks=args.stream_checks, profiles=profiles, queue=args.queue,
+                         max_attempts=args.max_attempts, lease_sec=args.lease_sec,
+                         max_job_sec=args.max_job_sec)
+    if args.queue:
+        if args.retry_failed:
+            runner.queue.retry_failed()
+        counts = runner.queue.counts()
+        if args.verbose:
+            print(f"[Batch] Очередь {args.queue}: выполнено {counts['done']}, с ошибкой {counts['failed']}, "
+                  f"в ожидании {counts['pending']}, в работе {counts['running']}")
+    summary = runner.run(documents)
+
+    stats = summary['summary']
+    print(f"\n{'=' * 50}")
+    print("ИТОГИ ПАКЕТНОЙ ПРОВЕРКИ:")
+    print(f"  Документов: {stats['total_documents']} (ошибок чтения: {stats['errors']})")
+    if 'profiles' in summary:
+        for name, profile in summary['profiles'].items():
+            print(f"  Профиль {name}:")
+            print_check_stats(profile['summary'], indent='    ')
+            print(f"    Без замечаний: {profile['summary']['documents_passed']}")
+    else:
+        print(f"  Без замечаний: {stats['documents_passed']}")
+        print_check_stats(stats)
+    print(f"  Время: {summary['elapsed_sec']} с, процессов: {summary['workers']}")
+    if summary['extraction_cache']:
+        print(f"  Кэш извлечения: попаданий {summary['extraction_cache']['hits']}, "
+              f"промахов {summary['extraction_cache']['misses']}")
+    print(f"\nОтчеты сохранены в: {args.output_dir}")
+    print('=' * 50)
+
+
+def print_check_stats(stats: dict, indent: str = '  '):
+    """Счётчики проверок из summary отчёта"""
+    print(f"{indent}Всего проверок: {stats['total_checks']}")
+    print(f"{indent}✓ Пройдено: {stats['passed']}")
+    print(f"{indent}✗ Не пройдено: {stats['failed']}")
+    print(f"{indent}Успешность: {stats['success_rate']}")
+
+
+def run_profiles(args, profiles: dict):
+    """Один документ, несколько профилей правил: разбор один раз, отчёт на каждый профиль"""
+    from src.core import Parser, ProfileSet, Reporter
+    from src.core.profiles import profile_report_path
+
+    doc_parser = Parser(**parser_options(args))
+    profile_set = ProfileSet(profiles, validator_options(args))
+    if args.stream_checks:
+        document, profile_results = profile_set.validate_file_stream(doc_parser, args.document)
+    else:
+        document = doc_parser.parse_stream(args.document) if args.stream else doc_parser.parse(args.document)
+        profile_results = profile_set.validate(document)
+    profile_set.close()
+
+    Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+    print(f"\n{'=' * 50}")
+    print("ИТОГИ ПРОВЕРКИ:")
+    print(f"  Документ: {Path(args.document).name}")
+    for name, results in profile_results.items():
+        report_path = profile_report_path(args.output, name)
+        if args.report_format == 'jsonl':
+            report = Reporter.stream_report(document=document, results=results, report_path=report_path,
+                                            profile=name)
+        else:
+            report = Reporter.generate_report(document=document, results=results, profile=name)
+            Reporter.save_report(report_data=report, report_path=report_path)
+        print(f"  Профиль {name}: {report_path}")
+        print_check_stats(report['summary'], indent='    ')
+    print('=' * 50)
+
+
+def serve(args, config: dict):
+    """Режим сервиса: HTTP на localhost или unix-сокете с прогретыми исполнителями"""
+    from src.core.server import DEFAULT_HOST, DEFAULT_MAX_QUEUE, DEFAULT_PORT, ValidationServer, run_server
+
+    host = args.host or DEFAULT_HOST
+    port = DEFAULT_PORT if args.port is None else args.port
+    server = ValidationServer(config, workers=args.workers or 1,
+                              max_queue=DEFAULT_MAX_QUEUE if args.max_queue is None else args.max_queue,
+                              stream=args.stream, parser_options=parser_options(args),
+                              validator_options=validator_options(args),
+                              request_timeout=args.request_timeout, stream_checks=args.stream_checks)
+    address = args.unix_socket or f"http://{host}:{port}"
+    print(f"Сервис проверки: {address} (исполнителей: {server.workers}, Ctrl+C - остановить)")
+    run_server(server, host=host, port=port, unix_socket=args.unix_socket)
+
 
 def main():
 
@@ -23,69 +151,205 @@ def main():
             python src/main.py files/document.docx
             python src/main.py files/document.docx --config config/my_rules.yaml
             python src/main.py files/document.docx --output report/report_1.json --verbose
+            python src/main.py files/ --workers 8 --output-dir reports/batch
+            python src/main.py "archive/**/*.pdf" --file-list docs.txt --output-dir reports/batch
+            python src/main.py files/ --report-format jsonl --output-dir reports/batch
+            python src/main.py files/ --queue reports/jobs.sqlite --output-dir reports/batch
+            python src/main.py --serve --port 8080 --workers 4
         """
     )
 
-    parser.add_argument('document', help='Путь к проверяемому документу')
-    parser.add_argument('--config', '-c', default='config/gost_2_105_rules.yaml',
-                        help='Путь к конфигурационному файлу (по умолчанию: config/gost_rules.yaml)')
+    parser.add_argument('documents', nargs='*', metavar='document',
+                        help='Путь к документу, каталогу или glob-шаблону (несколько путей - пакетный режим)')
+    parser.add_argument('--config', '-c', action='append', default=None,
+                        help=f'Путь к конфигурационному файлу (по умолчанию: {DEFAULT_CONFIG}). '
+                             'Можно указать несколько раз: документ разбирается один раз, '
+                             'отчёт сохраняется для каждого профиля')
     parser.add_argument('--output', '-o', default='reports/validation_report.json',
                         help='Путь для сохранения отчета (по умолчанию: validation_report.json)')
+    parser.add_argument('--report-format', choices=['json', 'jsonl'], default='json',
+                        help='Формат отчётов: json (по умолчанию) или jsonl - построчная запись '
+                             'проверок и ошибок со сводкой в конце (для больших отчётов и пакетов)')
     parser.add_argument('--verbose', '-v', action='store_true',
                         help='Подробный вывод в консоль')
+    parser.add_argument('--stream', action='store_true',
+                        help='Потоковое чтение по страницам: экономит память ридера на больших PDF, '
+                             'текст документа собирается целиком (без сборки - --stream-checks)')
+    parser.add_argument('--stream-checks', action='store_true',
+                        help='Потоковая проверка: текст подаётся проверкам блоками строк за один проход '
+                             'и не собирается целиком (память не зависит от длины документа)')
+    parser.add_argument('--pdf-workers', type=int, default=1,
+                        help='Число процессов для извлечения страниц PDF (по умолчанию: 1)')
+    parser.add_argument('--docx-backend', choices=['python-docx', 'xml'], default='python-docx',
+                        help='Чтение DOCX: python-docx или быстрый потоковый разбор XML (по умолчанию: python-docx)')
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR,
+                        help=f'Каталог кэша (по умолчанию: {DEFAULT_CACHE_DIR})')
+    parser.add_argument('--cache-size-mb', type=int, default=DEFAULT_MAX_SIZE_MB,
+                        help=f'Предельный размер кэша извлечения и кэша результатов проверок в МБ, '
+                             f'каждого (по умолчанию: {DEFAULT_MAX_SIZE_MB})')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Не использовать кэш извлеченного текста и кэш результатов проверок')
+    parser.add_argument('--check-executor', choices=['serial', 'thread', 'process'], default='serial',
+                        help='Выполнение проверок: по очереди, в потоках или в процессах (по умолчанию: serial)')
+    parser.add_argument('--check-timeout', type=float, default=None,
+                        help='Предел времени одной проверки в секундах (для thread/process)')
+    parser.add_argument('--log-level', default=None,
+                        help='Уровень логов: DEBUG, INFO, WARNING, ERROR (по умолчанию: WARNING, с --verbose: INFO)')
+    parser.add_argument('--log-module', action='append', default=[], metavar='МОДУЛЬ=УРОВЕНЬ',
+                        help='Уровень логов модуля, например checks.appendices=DEBUG (можно повторять)')
+    parser.add_argument('--profile', nargs='?', const='reports/profiles', default=None, metavar='DIR',
+                        help='Сохранить cProfile каждого документа в DIR/<документ>.pstats '
+                             '(по умолчанию: reports/profiles) и замерить пик памяти этапов')
+    parser.add_argument('--file-list', '-l', default=None,
+                        help='Файл со списком документов (по одному пути в строке)')
+    parser.add_argument('--workers', '-j', type=int, default=None,
+                        help='Число процессов для пакетного режима и сервиса (по умолчанию: число ядер; для сервиса: 1)')
+    parser.add_argument('--output-dir', default='reports',
+                        help='Каталог для отчетов пакетного режима (по умолчанию: reports)')
+    parser.add_argument('--queue', default=None, metavar='FILE',
+                        help='Очередь заданий пакетного режима в файле SQLite: прерванный запуск '
+                             'продолжается с того же места, файл могут разделять несколько машин')
+    parser.add_argument('--max-attempts', type=int, default=None,
+                        help='Попыток проверки документа в очереди (по умолчанию: 3)')
+    parser.add_argument('--lease-sec', type=float, default=None,
+                        help='Аренда задания в секундах: через столько задание упавшего исполнителя '
+                             'выдаётся снова (по умолчанию: 60)')
+    parser.add_argument('--max-job-sec', type=float, default=None,
+                        help='Предел времени проверки документа из очереди в секундах: зависший '
+                             'исполнитель завершается, попытка засчитывается (по умолчанию: 1800)')
+    parser.add_argument('--retry-failed', action='store_true',
+                        help='Вернуть в очередь задания, исчерпавшие попытки')
+    parser.add_argument('--serve', action='store_true',
+                        help='Запустить HTTP-сервис проверки (POST /validate, GET /health, GET /metrics)')
+    parser.add_argument('--host', default=None,
+                        help='Адрес сервиса (по умолчанию: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=None,
+                        help='Порт сервиса (по умолчанию: 8080)')
+    parser.add_argument('--unix-socket', default=None,
+                        help='Слушать unix-сокет вместо TCP')
+    parser.add_argument('--max-queue', type=int, default=None,
+                        help='Запросов в очереди сервиса сверх --workers (по умолчанию: 16)')
+    parser.add_argument('--request-timeout', type=float, default=None,
+                        help='Предел времени запроса к сервису в секундах')
 
     args = parser.parse_args()
+    args.config = args.config or [DEFAULT_CONFIG]
+
+    if not args.documents and not args.file_list and not args.serve and not args.queue:
+        parser.error("укажите документ, каталог, --file-list или --queue")
+
+    from src.utils import ConfigError, ConfigLoader
+    from src.utils.logger import parse_module_levels, setup_logging
 
+    try:
+        setup_logging(level=args.log_level or ('INFO' if args.verbose else 'WARNING'),
+                      module_levels=parse_module_levels(args.log_module))
+    except ValueError as e:
+        parser.error(str(e))
+
+    def load_profiles() -> dict:
+        """Правила из --config по профилям; ошибка в правилах завершает запуск до проверки документов"""
+        from src.core.profiles import profile_names
+
+        profiles = {}
+        for name, path in zip(profile_names(args.config), args.config):
+            try:
+                profiles[name] = ConfigLoader.load_rules(path)
+            except ConfigError as e:
+                parser.error(f"ошибка в конфиге {path}: {e}")
+        return profiles
+
+    def load_config():
+        return next(iter(load_profiles().values()))
+
+    if args.serve:
+        if len(args.config) > 1:
+            parser.error("сервис работает с одним профилем --config")
+        serve(args, load_config())
+        return
+
+    if is_batch_request(args):
+        profiles = load_profiles()
+        run_batch(args, next(iter(profiles.values())), profiles if len(profiles) > 1 else None)
+        return
+
+    args.document = args.documents[0]
+    if len(args.config) > 1:
+        run_profiles(args, load_profiles())
+        return
 
 
     if args.verbose:
         print("=== Авто-верификатор ГОСТ 2.105 ===")
         print(f"Документ: {args.document}")
-        print(f"Конфиг: {args.config}")
+        print(f"Конфиг: {args.config[0]}")
         print(f"Вывод: {args.output}")
 
     # 1. ЗАГРУЗКА КОНФИГУРАЦИИ
     if args.verbose:
         print("\n[1] Загрузка конфигурации...")
-    config = ConfigLoader.load_yaml(args.config)
+    config = load_config()
 
     # 2. ИНИЦИАЛИЗАЦИЯ КОМПОНЕНТОВ
     if args.verbose:
         print("[2] Инициализация компонентов...")
 
-    doc_parser = Parser()
-    validator = Validator(config)
+    from src.core import Parser, Validator, Reporter
+    from src.checks import CHECKS, enabled_check_ids, get_enabled_checks
+    from src.utils.profiling import profile_to
+
+    doc_parser = Parser(**parser_options(args))
+    validator = Validator(config, **validator_options(args))
 
     # 3. РЕГИСТРАЦИЯ ВСЕХ ПРОВЕРОК
     if args.verbose:
         print("[3] Регистрация проверок...")
 
-    # Автоматически создаем все 7 проверок
-    checks = get_all_checks()
-    for check in checks:
+    # Создаём только включённые в check_settings.enabled_checks проверки
+    for check in get_enabled_checks(config):
         validator.register_check(check)
         if args.verbose:
-            status = "✓" if check.check_id in config.get('check_settings', {}).get('enabled_checks', []) else "✗"
-            print(f"  {status} {check.check_name}")
+            print(f"  ✓ {check.check_name}")
+    if args.verbose:
+        for check_id in CHECKS.keys() - set(enabled_check_ids(config)):
+            print(f"  ✗ {check_id}")
 
     # 4. ПАРСИНГ ДОКУМЕНТА
     if args.verbose:
         print(f"[4] Парсинг документа: {args.document}")
 
-    parsed_document = doc_parser.parse(args.document)
+    pstats_path = str(Path(args.profile) / f"{Path(args.document).stem}.pstats") if args.profile else None
+    with profile_to(pstats_path):
+        if args.stream_checks:
+            # Чтение и проверки - одним проходом по тексту
+            if args.verbose:
+                print("[5] Потоковый запуск проверок...")
+            parsed_document, results = validator.validate_file_stream(doc_parser, args.document)
+        else:
+            if args.stream:
+                parsed_document = doc_parser.parse_stream(args.document)
+            else:
+                parsed_document = doc_parser.parse(args.document)
 
-    # 5. ВАЛИДАЦИЯ
-    if args.verbose:
-        print("[5] Запуск проверок...")
+            # 5. ВАЛИДАЦИЯ
+            if args.verbose:
+                print("[5] Запуск проверок...")
+
+            results = validator.validate(parsed_document)
+    validator.close()
 
-    results = validator.validate(parsed_document)
+    if args.verbose and doc_parser.cache:
+        print(f"    Кэш извлечения: {doc_parser.cache.stats()}")
 
     # 6. ГЕНЕРАЦИЯ И СОХРАНЕНИЕ ОТЧЕТА
     if args.verbose:
         print("[6] Генерация отчета...")
 
-    report = Reporter.generate_report(document=parsed_document, results=results)
-    Reporter.save_report(report_data=report, report_path=args.output)
+    if args.report_format == 'jsonl':
+        report = Reporter.stream_report(document=parsed_document, results=results, report_path=args.output)
+    else:
+        report = Reporter.generate_report(document=parsed_document, results=results)
+        Reporter.save_report(report_data=report, report_path=args.output)
 
     # 7. ВЫВОД СТАТИСТИКИ
     stats = report['summary']
@@ -96,6 +360,8 @@ def main():
     print(f"  ✓ Пройдено: {stats['passed']}")
     print(f"  ✗ Не пройдено: {stats['failed']}")
     print(f"  Успешность: {stats['success_rate']}")
+    if pstats_path:
+        print(f"  Профиль: {pstats_path}")
     print(f"\nПодробный отчет сохранен в: {args.output}")
     print('=' * 50)
 
@@ -1,5 +1,10 @@
+import re
+import weakref
+from bisect import bisect_right
+from collections import defaultdict
 from dataclasses import dataclass, field
-from typing import List, Optional, Any
+from functools import cached_property
+from typing import Dict, List, Optional, Set, Tuple
 from enum import Enum
 
 class CheckStatus(Enum):
@@ -7,17 +12,94 @@ class CheckStatus(Enum):
     FAILED = "FAILED"
     ERROR = "ERROR"
 
-@dataclass
+class ErrorTemplate:
+    """
+    Общая часть однотипных ошибок: название проверки, описание и рекомендация
+    с полями {} и ссылка на ГОСТ. Одинаковые шаблоны интернируются, поэтому
+    тысячи ошибок ссылаются на один объект и хранят только свои аргументы.
+    """
+    __slots__ = ('check_name', 'description', 'recommendation', 'gost_reference', '__weakref__')
+
+    # Живые шаблоны: неиспользуемые удаляются вместе с последней ошибкой
+    _interned = weakref.WeakValueDictionary()
+
+    def __new__(cls, check_name: str, description: str, recommendation: str = "", gost_reference: str = ""):
+        key = (check_name, description, recommendation, gost_reference)
+        template = cls._interned.get(key)
+        if template is None:
+            template = super().__new__(cls)
+            template.check_name = check_name
+            template.description = description
+            template.recommendation = recommendation
+            template.gost_reference = gost_reference
+            cls._interned[key] = template
+        return template
+
+    def __reduce__(self):
+        # В другом процессе шаблон интернируется заново
+        return ErrorTemplate, (self.check_name, self.description, self.recommendation, self.gost_reference)
+
+    def error(self, *args, page: Optional[int] = None, element: Optional[str] = None) -> 'ValidationError':
+        """Ошибка по шаблону: args подставляются в описание и рекомендацию при обращении к ним"""
+        error = ValidationError.__new__(ValidationError)
+        error.template = self
+        error.args = args
+        error.page = page
+        error.element = element
+        return error
+
+
 class ValidationError:
-    """Класс для описания одной ошибки"""
-    check_name: str
-    description: str
-    page: Optional[int] = None
-    element: Optional[str] = None
-    recommendation: str = ""
-    gost_reference: str = ""
+    """
+    Класс для описания одной ошибки.
+    Хранит шаблон и аргументы; description и recommendation собираются при обращении.
+    """
+    __slots__ = ('template', 'args', 'page', 'element')
 
-@dataclass
+    def __init__(self, check_name: str, description: str, page: Optional[int] = None,
+                 element: Optional[str] = None, recommendation: str = "", gost_reference: str = ""):
+        # Готовый текст описания - единственный аргумент шаблона "{}"
+        self.template = ErrorTemplate(check_name, "{}", recommendation.replace("{", "{{").replace("}", "}}"),
+                                      gost_reference)
+        self.args = (description,)
+        self.page = page
+        self.element = element
+
+    @property
+    def check_name(self) -> str:
+        return self.template.check_name
+
+    @property
+    def description(self) -> str:
+        return self.template.description.format(*self.args)
+
+    @property
+    def recommendation(self) -> str:
+        return self.template.recommendation.format(*self.args)
+
+    @property
+    def gost_reference(self) -> str:
+        return self.template.gost_reference
+
+    def _fields(self) -> tuple:
+        return (self.check_name, self.description, self.page, self.element,
+                self.recommendation, self.gost_reference)
+
+    def __eq__(self, other):
+        if not isinstance(other, ValidationError):
+            return NotImplemented
+        if self.template is other.template and self.args == other.args:
+            return (self.page, self.element) == (other.page, other.element)
+        return self._fields() == other._fields()
+
+    __hash__ = None
+
+    def __repr__(self):
+        return ("ValidationError(check_name={!r}, description={!r}, page={!r}, element={!r}, "
+                "recommendation={!r}, gost_reference={!r})".format(*self._fields()))
+
+
+@dataclass(slots=True)
 class CheckResult:
     """Результат выполнения одной проверки"""
     check_id: str
@@ -25,12 +107,325 @@ class CheckResult:
     status: CheckStatus
     errors: List[ValidationError] = field(default_factory=list)
 
+@dataclass
+class Page:
+    """Одна страница, выданная потоковым чтением файла"""
+    number: int
+    text: str
+
+
+@dataclass
+class TextChunk:
+    """
+    Блок строк документа для потоковой проверки. Текст документа -
+    '\\n'.join строк всех блоков по порядку.
+    """
+    lines: List[str]
+    first_line: int = 0  # Номер первой строки блока в документе (с нуля)
+    offset: int = 0      # Смещение начала первой строки в тексте документа
+
+    def numbered(self):
+        """(номер строки, смещение её начала, строка) для каждой строки блока"""
+        offset = self.offset
+        for number, line in enumerate(self.lines, self.first_line):
+            yield number, offset, line
+            offset += len(line) + 1
+
+
+@dataclass(frozen=True)
+class PageMap:
+    """
+    Разбивка текста на страницы: отсортированные смещения начала страниц
+    и их номера. Страница по смещению находится двоичным поиском.
+    """
+    starts: Tuple[int, ...] = ()
+    numbers: Tuple[int, ...] = ()
+
+    @classmethod
+    def from_pages(cls, pages: List[dict]) -> 'PageMap':
+        """Из списка Document.pages: [{'number', 'position'}]"""
+        ordered = sorted(pages, key=lambda page: page['position'])
+        return cls(tuple(page['position'] for page in ordered), tuple(page['number'] for page in ordered))
+
+    def page_at(self, offset: int) -> Optional[int]:
+        """Номер страницы, на которую попадает смещение; None, если разбивка неизвестна"""
+        if not self.starts:
+            return None
+        return self.numbers[max(0, bisect_right(self.starts, offset) - 1)]
+
+
+@dataclass(frozen=True, eq=False)
+class DocumentIndex:
+    """
+    Неизменяемый индекс текста документа. Строится один раз и
+    используется парсером и всеми проверками вместо повторных split/lower.
+    """
+    text: str
+    lines: Tuple[str, ...]
+    line_starts: Tuple[int, ...]  # Смещение начала каждой строки в text
+    lower_text: str
+    lower_lines: Tuple[str, ...]
+
+    @classmethod
+    def build(cls, text: str) -> "DocumentIndex":
+        lines = text.split('\n')
+        line_starts = []
+        offset = 0
+        for line in lines:
+            line_starts.append(offset)
+            offset += len(line) + 1
+
+        # lower(), а не casefold(): проверки исторически сравнивают через lower()
+        lower_text = text.lower()
+        return cls(
+            text=text,
+            lines=tuple(lines),
+            line_starts=tuple(line_starts),
+            lower_text=lower_text,
+            lower_lines=tuple(lower_text.split('\n'))
+        )
+
+    def line_at(self, offset: int) -> int:
+        """Номер строки (с нуля), в которую попадает смещение"""
+        return bisect_right(self.line_starts, offset) - 1
+
+    def line_end(self, line_number: int) -> int:
+        """Смещение конца строки (позиция символа перевода строки или конца текста)"""
+        return self.line_starts[line_number] + len(self.lines[line_number])
+
+
+class ReferenceIndex:
+    """
+    Индекс перекрёстных ссылок: (вид, обозначение) -> смещения упоминаний.
+    Каждый вид строится одним проходом по тексту при первом обращении,
+    после чего проверка ссылки на таблицу, формулу или приложение - поиск в словаре.
+    """
+
+    # "в таблица 1.1", "см. таблица 2" - ссылка на таблицу
+    TABLE_REFERENCE = re.compile(r'(?i)(?:см\.|в|по|из)\s+(таблица\s+)(\d+(?:\.\d+)*)')
+    # Номер в круглых скобках: "(1)", "(2.3)"
+    _NUMBER = r'(\d(?:[^()\n]*\d)?)'
+    NUMBER_MENTION = re.compile(rf'\({_NUMBER}\)')
+    # "формула (1)", "по формуле (1)", "ф-ла (1)", "ф. (1)", "((1))"
+    FORMULA_REFERENCE = re.compile(rf'(?i)(?:формул[аеуы]|ф-ла|ф\.)\s*\({_NUMBER}\)|\(\({_NUMBER}\)\)')
+    # Явные ссылки на приложение (в тексте в нижнем регистре)
+    APPENDIX_PHRASES = ('приложени[еия] ', 'приложени[еия].', 'приложение ', 'приложении ',
+                        'прилож. ', 'прил. ')
+    # Совпадение нулевой длины: обозначение не поглощает начало следующей ссылки ("прил. прил. а")
+    APPENDIX_REFERENCE = re.compile(
+        '(?=(?:' + '|'.join(map(re.escape, APPENDIX_PHRASES)) + r')([а-яa-z\d]*-?))')
+
+    def __init__(self, index: DocumentIndex):
+        self.text = index.text
+        self.lower_text = index.lower_text
+        self._kinds: Dict[str, Dict[str, List[int]]] = {}
+
+    def mentions(self, kind: str, key: str) -> List[int]:
+        """
+        Смещения упоминаний объекта:
+        table - ключ table_key("Таблица 1.1"); formula и number - ключ formula_key("1.1")
+        (formula - ссылки вида "формула (1)", number - любое "(1)");
+        appendix - обозначение приложения в нижнем регистре.
+        """
+        table = self._kinds.get(kind)
+        if table is None:
+            table = self._kinds[kind] = getattr(self, f'_build_{kind}')()
+        return table.get(key, [])
+
+    def has_word(self, word: str) -> bool:
+        """Встречается ли слово (\\w+) в тексте в нижнем регистре"""
+        return word in self._words
+
+    def has_hyphenated(self, word: str) -> bool:
+        """Встречается ли "слово-продолжение", т.е. \\bслово-\\b"""
+        return word in self._hyphenated
+
+    @staticmethod
+    def table_key(reference: str) -> str:
+        return reference.lower()
+
+    @staticmethod
+    def formula_key(number: str) -> str:
+        """Номер формулы без учёта разделителя: "1.2" и "1,2" дают один ключ"""
+        return re.sub(r'\D', '.', number)
+
+    def _build_table(self) -> Dict[str, List[int]]:
+        # Ссылка "в таблица 12.3" подходит и для "таблица 1", и для "таблица 12":
+        # регистрируем все префиксы номера, оканчивающиеся цифрой
+        result = defaultdict(list)
+        for match in self.TABLE_REFERENCE.finditer(self.text):
+            for key in self.table_reference_keys(match):
+                result[key].append(match.start())
+        return result
+
+    def _build_formula(self) -> Dict[str, List[int]]:
+        result = defaultdict(list)
+        for match in self.FORMULA_REFERENCE.finditer(self.text):
+            number = match.group(1) or match.group(2)
+            result[self.formula_key(number)].append(match.start())
+        return result
+
+    def _build_number(self) -> Dict[str, List[int]]:
+        result = defaultdict(list)
+        for match in self.NUMBER_MENTION.finditer(self.text):
+            result[self.formula_key(match.group(1))].append(match.start())
+        return result
+
+    def _build_appendix(self) -> Dict[str, List[int]]:
+        # "приложение аб" подходит для обозначений "а" и "аб" (поиск подстроки)
+        result = defaultdict(list)
+        for match in self.APPENDIX_REFERENCE.finditer(self.lower_text):
+            for key in self.appendix_reference_keys(match):
+                result[key].append(match.start())
+        return result
+
+    @staticmethod
+    def table_reference_keys(match: re.Match) -> List[str]:
+        """Ключи table_key, которым соответствует совпадение TABLE_REFERENCE"""
+        word = match.group(1).lower()
+        number = match.group(2)
+        return [word + number[:end] for end in range(1, len(number) + 1) if number[end - 1].isdigit()]
+
+    @staticmethod
+    def appendix_reference_keys(match: re.Match) -> List[str]:
+        """Обозначения, которым соответствует совпадение APPENDIX_REFERENCE"""
+        designation = match.group(1)
+        return [designation[:end] for end in range(1, len(designation) + 1)]
+
+    @cached_property
+    def _words(self) -> Set[str]:
+        return set(re.findall(r'\w+', self.lower_text))
+
+    @cached_property
+    def _hyphenated(self) -> Set[str]:
+        return set(re.findall(r'\b(\w+)-(?=\w)', self.lower_text))
+
+
 @dataclass
 class Document:
     """Представление загруженного документа"""
     file_path: str
-    pages: List[Any] = field(default_factory=list)  # Позже заменим на реальные данные
+    # Начала страниц в raw_text [{'number', 'position'}]; пусто - разбивка неизвестна
+    pages: List[dict] = field(default_factory=list)
     sections: List[dict] = field(default_factory=list)
     tables: List[dict] = field(default_factory=list)
     figures: List[dict] = field(default_factory=list)
-    raw_text: str = ""
\ No newline at end of file
+    formulas: List[dict] = field(default_factory=list)
+    appendices: List[dict] = field(default_factory=list)
+    raw_text: str = ""
+    index: Optional[DocumentIndex] = field(default=None, repr=False, compare=False)
+    references: Optional[ReferenceIndex] = field(default=None, repr=False, compare=False)
+    page_map: Optional[PageMap] = field(default=None, repr=False, compare=False)
+    # Замеры этапов обработки {этап: {wall_sec, cpu_sec, peak_alloc_kb}}
+    timings: dict = field(default_factory=dict, repr=False, compare=False)
+
+    def get_index(self) -> DocumentIndex:
+        """Индекс текста; строится при первом обращении, если парсер его не создал"""
+        if self.index is None or self.index.text is not self.raw_text:
+            self.index = DocumentIndex.build(self.raw_text)
+        return self.index
+
+    def get_references(self) -> ReferenceIndex:
+        """Индекс перекрёстных ссылок; строится при первом обращении"""
+        if self.references is None or self.references.text is not self.raw_text:
+            self.references = ReferenceIndex(self.get_index())
+        return self.references
+
+    def get_page_map(self) -> PageMap:
+        """Разбивка на страницы; строится из pages при первом обращении"""
+        if self.page_map is None or len(self.page_map.starts) != len(self.pages):
+            self.page_map = PageMap.from_pages(self.pages)
+        return self.page_map
+
+    def page_at(self, offset: int) -> Optional[int]:
+        """Номер страницы по смещению в raw_text; None, если разбивка неизвестна"""
+        return self.get_page_map().page_at(offset) if self.pages else None
+
+    def page_at_line(self, line_number: int) -> Optional[int]:
+        """Номер страницы, на которой начинается строка"""
+        return self.page_at(self.get_index().line_starts[line_number]) if self.pages else None
+
+
+@dataclass
+class DocumentChange:
+    """
+    Правка между двумя версиями документа для инкрементальной проверки:
+    строки [old_start, old_end) старой версии заменены строками
+    [new_start, new_end) новой, остальной текст совпадает.
+    Пустые диапазоны - текст не изменился.
+    """
+    old: Document
+    new: Document
+    old_start: int = 0
+    old_end: int = 0
+    new_start: int = 0
+    new_end: int = 0
+
+    @property
+    def text_changed(self) -> bool:
+        return self.old_end > self.old_start or self.new_end > self.new_start
+
+    @property
+    def line_delta(self) -> int:
+        """На сколько строк изменилась длина документа"""
+        return (self.new_end - self.new_start) - (self.old_end - self.old_start)
+
+    def windows(self, context_lines: int = 1, context_chars: int = 0) -> Tuple[str, str]:
+        """
+        Изменённые строки старой и новой версии вместе с окружением: с каждой
+        стороны не меньше context_lines непустых строк и context_chars символов.
+        Окружение нужно шаблонам, которые захватывают переводы строк (\\s+)
+        или смотрят на текст рядом с совпадением.
+        """
+        if not self.text_changed:
+            return "", ""
+        return (self._window(self.old.get_index(), self.old_start, self.old_end, context_lines, context_chars),
+                self._window(self.new.get_index(), self.new_start, self.new_end, context_lines, context_chars))
+
+    def mentions(self, pattern: re.Pattern, context_lines: int = 1, context_chars: int = 0) -> bool:
+        """Есть ли совпадение шаблона рядом с правкой в старой или новой версии"""
+        return any(pattern.search(window) for window in self.windows(context_lines, context_chars))
+
+    def reaches(self, word: re.Pattern, after: int = 0) -> bool:
+        """
+        Может ли совпадение, которое начинается со слова word и продолжается
+        пробелами, переводами строк, цифрами и знаками '.:' ("Таблица\n\n1.2"),
+        вместе с after символами за ним задеть изменённые строки старой или новой
+        версии. Окно от правки расширяется назад через такой хвост к строке со словом.
+        """
+        if not self.text_changed:
+            return False
+        return (self._reaches(self.old.get_index(), self.old_start, self.old_end, word, after)
+                or self._reaches(self.new.get_index(), self.new_start, self.new_end, word, after))
+
+    @staticmethod
+    def _reaches(index: DocumentIndex, start: int, end: int, word: re.Pattern, after: int) -> bool:
+        text = index.text
+        # Удалённые строки: правка - точка стыка
+        first = index.line_starts[start] if start < len(index.lines) else len(text)
+        last = index.line_end(end - 1) if end > start else first
+
+        pos = max(first - after, 0)
+        while pos > 0 and (text[pos - 1].isspace() or text[pos - 1].isdecimal() or text[pos - 1] in '.:'):
+            pos -= 1
+        return word.search(text, index.line_starts[index.line_at(pos)], last) is not None
+
+    @staticmethod
+    def _window(index: DocumentIndex, start: int, end: int, context_lines: int, context_chars: int) -> str:
+        lines = index.lines
+        before = after = 0
+        chars_before = chars_after = 0
+
+        while start > 0 and (before < context_lines or chars_before < context_chars):
+            start -= 1
+            chars_before += len(lines[start]) + 1
+            if lines[start].strip():
+                before += 1
+
+        while end < len(lines) and (after < context_lines or chars_after < context_chars):
+            chars_after += len(lines[end]) + 1
+            if lines[end].strip():
+                after += 1
+            end += 1
+
+        return '\n'.join(lines[start:end])
@@ -1,7 +1,22 @@
-SUPPORTED_FORMATS = [".docx", ".pdf", ".txt"]
+SUPPORTED_FORMATS = [".docx", ".doc", ".pdf", ".rtf", ".txt"]
 SUPPORTED_ENCODINGS = ['utf-8', 'utf-8-sig', 'utf-16', 'cp1251', 'windows-1251']
 
-from .config_loader import ConfigLoader
-from .file_reader import FileReader
+# Классы импортируются при первом обращении: FileReader тянет за собой
+# модели и бэкенды чтения, которые не нужны, например, для --help
+_LAZY = {
+    'ConfigLoader': 'src.utils.config_loader',
+    'FileReader': 'src.utils.file_reader',
+    'ExtractionCache': 'src.utils.extraction_cache',
+    'ResultCache': 'src.utils.result_cache',
+    'RuleSet': 'src.utils.rule_set',
+    'ConfigError': 'src.utils.rule_set',
+}
 
-__all__ = [ConfigLoader, FileReader]
+__all__ = ['ConfigLoader', 'FileReader', 'ExtractionCache', 'ResultCache', 'RuleSet', 'ConfigError']
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        import importlib
+        return getattr(importlib.import_module(_LAZY[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
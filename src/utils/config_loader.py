@@ -1,6 +1,14 @@
-import yaml
+import hashlib
+import os
 from typing import Dict, Any
 
+from src.utils.logger import get_logger
+
+logger = get_logger('utils.config')
+
+# Скомпилированные правила по абсолютному пути: ((mtime_ns, размер), sha256 файла, RuleSet)
+_rules_cache: Dict[str, tuple] = {}
+
 
 class ConfigLoader:
     """Загрузчик конфигурационных файлов"""
@@ -8,22 +16,79 @@ class ConfigLoader:
     @staticmethod
     def load_yaml(config_path: str) -> Dict[str, Any]:
         """Загружает конфигурацию из YAML файла"""
+        import yaml
+
         try:
             with open(config_path, 'r', encoding='utf-8') as f:
                 return yaml.safe_load(f)
         except FileNotFoundError:
-            print(f"[Config] Файл {config_path} не найден. Использую настройки по умолчанию.")
+            logger.warning("[Config] Файл %s не найден. Использую настройки по умолчанию.", config_path)
             return ConfigLoader._get_default_config()
         except yaml.YAMLError as e:
-            print(f"[Config] Ошибка в YAML файле: {e}")
+            logger.error("[Config] Ошибка в YAML файле: %s", e)
             return ConfigLoader._get_default_config()
 
+    @staticmethod
+    def load_rules(config_path: str):
+        """
+        Загружает конфигурацию и компилирует её в RuleSet (ConfigError при ошибке в правилах).
+        Пока файл не изменился (время изменения, размер или содержимое),
+        повторные вызовы возвращают тот же RuleSet без разбора и компиляции.
+        """
+        import yaml
+        from src.utils.rule_set import RuleSet
+
+        path = os.path.abspath(config_path)
+        try:
+            stat = os.stat(path)
+            stamp = (stat.st_mtime_ns, stat.st_size)
+            cached = _rules_cache.get(path)
+            if cached and cached[0] == stamp:
+                return cached[2]
+
+            with open(path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            logger.warning("[Config] Файл %s не найден. Использую настройки по умолчанию.", config_path)
+            return RuleSet.from_config(ConfigLoader._get_default_config())
+
+        digest = hashlib.sha256(data).hexdigest()
+        if cached and cached[1] == digest:
+            # Файл перезаписан без изменений
+            _rules_cache[path] = (stamp, digest, cached[2])
+            return cached[2]
+
+        try:
+            config = yaml.safe_load(data.decode('utf-8')) or {}
+        except yaml.YAMLError as e:
+            logger.error("[Config] Ошибка в YAML файле: %s", e)
+            config = ConfigLoader._get_default_config()
+
+        rules = RuleSet.from_config(config)
+        _rules_cache[path] = (stamp, digest, rules)
+        logger.debug("[Config] Правила скомпилированы: %s", config_path)
+        return rules
+
     @staticmethod
     def _get_default_config() -> Dict[str, Any]:
         """Возвращает конфигурацию по умолчанию"""
         return {
             "gost_2_105": {
                 "required_sections": ["Введение", "Назначение", "Технические характеристики"],
-                "page_numbering": {"skip_pages": 2, "style": "арабские"}
+                "section_numbering": {"pattern": r"^\d+(\.\d+)*\s+.+$", "max_level": 3},
+                "page_numbering": {"skip_pages": 2, "style": "арабские"},
+                "table_format": {"caption_pattern": r"^Таблица\s+\d+(\.\d+)*", "require_caption": True},
+                "formulas": {"numbering_pattern": r"^\((\d+(\.\d+)*)\)$", "require_reference": True},
+                "appendices": {
+                    "pattern": r"^ПРИЛОЖЕНИЕ\s+[А-ЯA-Z\d]",
+                    "allowed_designations": {"types": ["cyrillic", "latin", "numeric"], "max_length": 2},
+                    "validation": {"require_uppercase": True, "require_space": True,
+                                   "allow_dot_after": True, "allow_parentheses": True},
+                    "require_reference": True
+                }
+            },
+            "system": {
+                "allowed_formats": [".txt", ".doc", ".docx", ".pdf", ".rtf"],
+                "max_file_size_mb": 50
             }
         }
@@ -0,0 +1,201 @@
+"""
+Потоковое чтение DOCX без python-docx.
+word/document.xml читается из архива через iterparse: абзацы и ячейки
+таблиц выдаются в порядке документа, обработанные элементы сразу
+удаляются из дерева, поэтому память не растёт с размером файла.
+"""
+import zipfile
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass
+from typing import Iterator, List, Optional, Tuple
+
+W_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+MC_FALLBACK = '{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback'
+
+P = W_NS + 'p'
+P_PR = W_NS + 'pPr'
+P_STYLE = W_NS + 'pStyle'
+R = W_NS + 'r'
+TBL = W_NS + 'tbl'
+TR = W_NS + 'tr'
+TC = W_NS + 'tc'
+T = W_NS + 't'
+TAB = W_NS + 'tab'
+PTAB = W_NS + 'ptab'
+BR = W_NS + 'br'
+CR = W_NS + 'cr'
+NO_BREAK_HYPHEN = W_NS + 'noBreakHyphen'
+LAST_RENDERED = W_NS + 'lastRenderedPageBreak'
+HYPERLINK = W_NS + 'hyperlink'
+VAL = W_NS + 'val'
+TYPE = W_NS + 'type'
+
+# Элементы, которые после обработки удаляются из дерева
+_RELEASED = {P, TBL, TR, TC}
+
+
+@dataclass
+class DocxBlock:
+    """Абзац или ячейка таблицы в порядке документа"""
+    kind: str  # paragraph | cell
+    text: str
+    style_id: Optional[str] = None
+    # Разрывы страниц: (смещение в text, True - сохранённый Word lastRenderedPageBreak)
+    page_breaks: Tuple[Tuple[int, bool], ...] = ()
+
+
+def iter_docx_blocks(file_path: str) -> Iterator[DocxBlock]:
+    """
+    Выдаёт абзацы и ячейки таблиц из word/document.xml.
+    Текст абзаца собирается так же, как Paragraph.text в python-docx:
+    w:t, табуляции и переводы строки; ячейка - абзацы через перевод строки.
+    Объединённые ячейки выдаются один раз. Содержимое mc:Fallback
+    (дубликат надписей для старых версий Word) пропускается.
+    """
+    with zipfile.ZipFile(file_path) as archive, archive.open('word/document.xml') as xml:
+        stack = []        # Открытые элементы (для поиска родителя)
+        paragraphs = []   # Стек абзацев: [части текста, id стиля, разрывы страниц]
+        cells = []        # Стек ячеек: (текст, разрывы) их абзацев
+        skip_depth = 0
+
+        for event, elem in ET.iterparse(xml, events=('start', 'end')):
+            tag = elem.tag
+
+            if event == 'start':
+                if tag == MC_FALLBACK:
+                    skip_depth += 1
+                elif not skip_depth:
+                    if tag == P:
+                        paragraphs.append([[], None, []])
+                    elif tag == TC:
+                        cells.append([])
+                stack.append(elem)
+                continue
+
+            stack.pop()
+            parent = stack[-1] if stack else None
+
+            if tag == MC_FALLBACK:
+                skip_depth -= 1
+                elem.clear()
+                continue
+            if skip_depth:
+                continue
+
+            if paragraphs and parent is not None and parent.tag == R:
+                # Содержимое прогона (w:tab в w:pPr/w:tabs - позиции табуляции, не текст)
+                parts = paragraphs[-1][0]
+                if tag == T:
+                    parts.append(elem.text or '')
+                elif tag in (TAB, PTAB):
+                    parts.append('\t')
+                elif tag == BR:
+                    if elem.get(TYPE) in (None, 'textWrapping'):
+                        parts.append('\n')
+                    elif elem.get(TYPE) == 'page':
+                        paragraphs[-1][2].append((sum(map(len, parts)), False))
+                elif tag == LAST_RENDERED:
+                    paragraphs[-1][2].append((sum(map(len, parts)), True))
+                elif tag == CR:
+                    parts.append('\n')
+                elif tag == NO_BREAK_HYPHEN:
+                    parts.append('-')
+            elif tag == P_STYLE and paragraphs and parent is not None and parent.tag == P_PR:
+                paragraphs[-1][1] = elem.get(VAL)
+
+            if tag == P:
+                parts, style_id, breaks = paragraphs.pop()
+                text = ''.join(parts)
+                if cells and parent is not None and parent.tag == TC:
+                    cells[-1].append((text, breaks))
+                else:
+                    yield DocxBlock('paragraph', text, style_id, tuple(breaks))
+            elif tag == TC:
+                texts, breaks, position = [], [], 0
+                for text, paragraph_breaks in cells.pop():
+                    breaks.extend((position + offset, rendered) for offset, rendered in paragraph_breaks)
+                    texts.append(text)
+                    position += len(text) + 1
+                yield DocxBlock('cell', '\n'.join(texts), page_breaks=tuple(breaks))
+
+            if tag in _RELEASED:
+                elem.clear()
+                if parent is not None:
+                    parent.remove(elem)
+
+
+def paragraph_page_breaks(p) -> List[Tuple[int, bool]]:
+    """
+    Разрывы страниц в элементе w:p (lxml из python-docx) со смещениями
+    в тексте Paragraph.text: учитываются прогоны абзаца и гиперссылок.
+    """
+    breaks = []
+    if next(p.iter(BR, LAST_RENDERED), None) is None:
+        return breaks
+
+    runs = []
+    for child in p:
+        if child.tag == R:
+            runs.append(child)
+        elif child.tag == HYPERLINK:
+            runs.extend(run for run in child if run.tag == R)
+
+    position = 0
+    for run in runs:
+        for elem in run:
+            tag = elem.tag
+            if tag == T:
+                position += len(elem.text or '')
+            elif tag in (TAB, PTAB, CR, NO_BREAK_HYPHEN):
+                position += 1
+            elif tag == BR:
+                if elem.get(TYPE) in (None, 'textWrapping'):
+                    position += 1
+                elif elem.get(TYPE) == 'page':
+                    breaks.append((position, False))
+            elif tag == LAST_RENDERED:
+                breaks.append((position, True))
+    return breaks
+
+
+class PageStarts:
+    """
+    Начала страниц DOCX в склеенном тексте документа.
+    Блоки подаются по порядку вместе со смещением в итоговом тексте;
+    страница начинается с первого непробельного символа после разрыва.
+    lastRenderedPageBreak без текста после предыдущего разрыва - повтор
+    того же разрыва (Word ставит его сразу за w:br типа page) и не считается.
+    pages - список, в который дописываются начала страниц (по умолчанию новый).
+    """
+
+    def __init__(self, pages: Optional[List[dict]] = None):
+        self.pages = [] if pages is None else pages
+        self.pages.append({'number': 1, 'position': 0})
+        self._pending = 0              # Разрывов, ожидающих следующего текста
+        self._text_after_break = False
+
+    def feed(self, position: int, text: str, breaks) -> None:
+        """position - смещение text в документе (для пустых блоков не используется)"""
+        start = 0
+        for offset, rendered in breaks:
+            self._text(position, text, start, offset)
+            start = offset
+            if rendered and not self._text_after_break:
+                continue
+            self._pending += 1
+            self._text_after_break = False
+        self._text(position, text, start, len(text))
+
+    def _text(self, position: int, text: str, start: int, end: int) -> None:
+        if not self._pending and self._text_after_break:
+            return
+        for i in range(start, end):
+            if not text[i].isspace():
+                break
+        else:
+            return
+        if self._pending:
+            number = self.pages[-1]['number'] + self._pending
+            self.pages.append({'number': number, 'position': position + i})
+            self._pending = 0
+        self._text_after_break = True
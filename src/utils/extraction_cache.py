@@ -0,0 +1,161 @@
+"""
+Кэш извлечённого текста на диске.
+Ключ - хэш содержимого файла, бэкенд чтения и его версия, поэтому
+повторная проверка той же редакции документа (например, после правки
+YAML-правил) не читает файл через python-docx/pdfplumber/antiword заново.
+"""
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+from src.utils.logger import get_logger
+
+logger = get_logger('utils.extraction_cache')
+
+# Размер блока при хэшировании файла
+HASH_BLOCK_SIZE = 1024 * 1024
+
+DEFAULT_CACHE_DIR = os.environ.get('GOST_CACHE_DIR', str(Path.home() / '.cache' / 'gost_verifier'))
+DEFAULT_MAX_SIZE_MB = 1024
+
+
+class ExtractionCache:
+    """
+    Каталог с записями вида <ключ>.json. Запись пишется во временный файл
+    и атомарно переименовывается, поэтому несколько процессов могут
+    безопасно читать и писать один каталог. При превышении размера
+    удаляются записи, к которым дольше всего не обращались (по mtime).
+    """
+
+    # Подкаталог кэша в cache_dir
+    SUBDIR = 'extraction'
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, max_size_mb: int = DEFAULT_MAX_SIZE_MB):
+        self.cache_dir = Path(cache_dir) / self.SUBDIR
+        self.max_bytes = max_size_mb * 1024 * 1024
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self.write_errors = 0
+
+    @staticmethod
+    def file_hash(file_path: str) -> str:
+        """SHA-256 содержимого файла"""
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    @staticmethod
+    def make_key(content_hash: str, backend: str) -> str:
+        """Ключ записи: хэш содержимого + бэкенд чтения с версией"""
+        return hashlib.sha256(f"{content_hash}|{backend}".encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[dict]:
+        """Возвращает запись {'text', 'pages'} или None"""
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            # Обновляем время обращения для LRU
+            os.utime(path)
+        except (FileNotFoundError, json.JSONDecodeError, UnicodeDecodeError, OSError):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return entry
+
+    def put(self, key: str, text: str, pages: Optional[list] = None, backend: str = ""):
+        """Сохраняет извлечённый текст и карту страниц"""
+        self._write(key, {'backend': backend, 'text': text, 'pages': pages})
+
+    def _write(self, key: str, entry: dict, evict: bool = True) -> int:
+        """
+        Атомарно записывает запись и возвращает её размер (0 - не записана); evict - сразу
+        освободить место. Недоступный или переполненный каталог кэша - не ошибка проверки
+        """
+        path = self._path(key)
+        tmp_path = None
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix='.tmp-', suffix='.json')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(entry, f, ensure_ascii=False)
+            size = os.path.getsize(tmp_path)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            # Каталог не изменится до конца запуска: предупреждаем один раз
+            log = logger.debug if self.write_errors else logger.warning
+            log("[ExtractionCache] Запись в кэш %s пропущена: %s", self.cache_dir, e)
+            self.write_errors += 1
+            if tmp_path and os.path.exists(tmp_path):
+                try:
+                    os.unlink(tmp_path)
+                except OSError:
+                    pass
+            return 0
+
+        self.writes += 1
+        if evict:
+            self._evict()
+        return size
+
+    def stats(self) -> dict:
+        """Счётчики обращений к кэшу"""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'writes': self.writes,
+            'evictions': self.evictions
+        }
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def _evict(self) -> int:
+        """
+        Удаляет самые давно использованные записи, пока кэш больше лимита; возвращает
+        размер кэша. Если каталог не прочитать, ничего не удаляется (возвращается 0)
+        """
+        entries = []
+        total = 0
+        try:
+            for subdir in os.scandir(self.cache_dir):
+                if not subdir.is_dir():
+                    continue
+                for entry in os.scandir(subdir.path):
+                    if entry.name.startswith('.tmp-'):
+                        continue
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+                    total += stat.st_size
+        except OSError as e:
+            logger.warning("[ExtractionCache] Не удалось обойти кэш %s: %s", self.cache_dir, e)
+            return 0
+
+        if total <= self.max_bytes:
+            return total
+
+        # Освобождаем с запасом, чтобы не чистить кэш на каждой записи
+        target = self.max_bytes * 0.9
+        for _, size, path in sorted(entries):
+            if total <= target:
+                break
+            try:
+                os.unlink(path)
+                self.evictions += 1
+            except FileNotFoundError:
+                pass  # Уже удалено другим процессом
+            except OSError as e:
+                logger.debug("[ExtractionCache] Не удалось удалить %s: %s", path, e)
+            total -= size
+        return total
@@ -2,22 +2,77 @@
 Модуль для чтения файлов разных форматов.
 Добавлена поддержка: TXT, DOCX, DOC, PDF, RTF
 """
+import itertools
+import math
 import os
-import subprocess
-import tempfile
+from collections import deque
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import Iterator, List, Optional, Tuple
 
+from src.models import Page
 from src.utils import SUPPORTED_ENCODINGS
+from src.utils.logger import get_logger
+from src.utils.profiling import stage
+
+logger = get_logger('utils.file_reader')
+
+# Минимальный размер блока страниц для параллельного извлечения:
+# каждый процесс заново открывает PDF, мелкие блоки не окупаются
+PDF_MIN_CHUNK_PAGES = 4
+
+# Предел работы antiword, catdoc и soffice, с: зависший конвертер не должен держать проверку
+SUBPROCESS_TIMEOUT_SEC = 120
 
 
 class FileReader:
     """Читает файлы различных форматов и возвращает текст"""
 
-    @staticmethod
-    def read_file(file_path: str) -> Tuple[Optional[str], str]:
+    # Версия логики извлечения текста: увеличивать при изменении результата
+    # любого бэкенда, чтобы записи кэша извлечения стали недействительными
+    READER_VERSION = 3
+
+    # Библиотека, через которую читается формат (её версия входит в ключ кэша)
+    BACKENDS = {
+        '.txt': None,
+        '.docx': 'python-docx',
+        '.doc': None,
+        '.pdf': 'pdfplumber',
+        '.rtf': None,
+    }
+
+    # Бэкенды DOCX: объектная модель python-docx или потоковый разбор document.xml
+    DOCX_BACKENDS = ('python-docx', 'xml')
+
+    def __init__(self, pdf_workers: int = 1, docx_backend: str = 'python-docx'):
+        """
+        pdf_workers > 1 - извлечение страниц PDF в нескольких процессах.
+        docx_backend - 'python-docx' или 'xml' (быстрый потоковый разбор).
+        """
+        if docx_backend not in self.DOCX_BACKENDS:
+            raise ValueError(f"Неизвестный бэкенд DOCX: {docx_backend}")
+        self.pdf_workers = pdf_workers
+        self.docx_backend = docx_backend
+
+    def backend_signature(self, file_path: str) -> str:
+        """Бэкенд чтения файла с версиями, например 'pdf:pdfplumber-0.11.0:v1'"""
+        suffix = Path(file_path).suffix.lower()
+        library = FileReader.BACKENDS.get(suffix)
+        if suffix == '.docx' and self.docx_backend == 'xml':
+            library = None
+        if library:
+            from importlib import metadata
+
+            try:
+                library = f"{library}-{metadata.version(library)}"
+            except metadata.PackageNotFoundError:
+                library = f"{library}-missing"
+        return f"{suffix.lstrip('.')}:{library or 'builtin'}:v{FileReader.READER_VERSION}"
+
+    def read_file(self, file_path: str, pages: Optional[List[dict]] = None) -> Tuple[Optional[str], str]:
         """
         Основной метод для чтения файла любого поддерживаемого формата.
+        Если передан список pages, PDF и DOCX дописывают в него начала
+        страниц в тексте: {'number': номер, 'position': смещение}.
 
         Returns:
             Tuple[текст_или_None, сообщение_об_ошибке]
@@ -30,22 +85,31 @@ class FileReader:
         suffix = path.suffix.lower()
 
         if suffix == '.txt':
-            return FileReader._read_text_file(file_path), ""
+            reader, options = FileReader._read_text_file, {}
+        elif suffix == '.docx' and self.docx_backend == 'xml':
+            reader, options = FileReader._read_docx_xml, {'pages': pages}
         elif suffix == '.docx':
-            return FileReader._read_docx_file(file_path), ""
+            reader, options = FileReader._read_docx_file, {'pages': pages}
         elif suffix == '.doc':
-            return FileReader._read_doc_file(file_path), ""
+            reader, options = FileReader._read_doc_file, {}
         elif suffix == '.pdf':
-            return FileReader._read_pdf_file(file_path), ""
+            reader, options = FileReader._read_pdf_file, {'workers': self.pdf_workers, 'pages': pages}
         elif suffix == '.rtf':
-            return FileReader._read_rtf_file(file_path), ""
+            reader, options = FileReader._read_rtf_file, {}
         else:
             return None, f"Неподдерживаемый формат: {suffix}"
 
+        # Замер бэкенда чтения попадает в timings отчёта
+        with stage(f"file_reader.{reader.__name__}"):
+            return reader(file_path, **options), ""
+
     @staticmethod
     def _read_doc_file(file_path: str) -> str:
         """Чтение старых DOC файлов (формат Word 97-2003)"""
-        print(f"[FileReader] Попытка чтения DOC файла: {file_path}")
+        import subprocess
+        import tempfile
+
+        logger.debug("[FileReader] Попытка чтения DOC файла: %s", file_path)
 
         # Вариант 1: Используем antiword (требует установки)
         try:
@@ -54,11 +118,12 @@ class FileReader:
                 capture_output=True,
                 text=True,
                 encoding='utf-8',
-                errors='ignore'
+                errors='ignore',
+                timeout=SUBPROCESS_TIMEOUT_SEC
             )
             if result.returncode == 0 and result.stdout.strip():
                 text = result.stdout
-                print(f"[FileReader] DOC прочитан через antiword, символов: {len(text)}")
+                logger.info("[FileReader] DOC прочитан через antiword, символов: %d", len(text))
                 return text
         except (FileNotFoundError, subprocess.SubprocessError):
             pass
@@ -70,11 +135,12 @@ class FileReader:
                 capture_output=True,
                 text=True,
                 encoding='utf-8',
-                errors='ignore'
+                errors='ignore',
+                timeout=SUBPROCESS_TIMEOUT_SEC
             )
             if result.returncode == 0 and result.stdout.strip():
                 text = result.stdout
-                print(f"[FileReader] DOC прочитан через catdoc, символов: {len(text)}")
+                logger.info("[FileReader] DOC прочитан через catdoc, символов: %d", len(text))
                 return text
         except (FileNotFoundError, subprocess.SubprocessError):
             pass
@@ -90,7 +156,7 @@ class FileReader:
                 'soffice', '--headless', '--convert-to', 'docx',
                 '--outdir', str(Path(tmp_path).parent),
                 file_path
-            ], capture_output=True)
+            ], capture_output=True, timeout=SUBPROCESS_TIMEOUT_SEC)
 
             if result.returncode == 0:
                 # Читаем сконвертированный файл
@@ -98,132 +164,264 @@ class FileReader:
                 # Удаляем временный файл
                 os.unlink(tmp_path)
                 if text:
-                    print(f"[FileReader] DOC конвертирован в DOCX, символов: {len(text)}")
+                    logger.info("[FileReader] DOC конвертирован в DOCX, символов: %d", len(text))
                     return text
         except (FileNotFoundError, subprocess.SubprocessError, Exception):
             if os.path.exists(tmp_path):
                 os.unlink(tmp_path)
 
-        print("[FileReader] Не удалось прочитать DOC файл. Установите antiword или catdoc.")
-        print("  Linux: sudo apt-get install antiword")
-        print("  Mac: brew install antiword")
-        print("  Windows: скачайте antiword с https://www.winfield.demon.nl/")
-        print("[FileReader] Создан тестовый файл для проверки")
+        logger.warning("[FileReader] Не удалось прочитать DOC файл. Установите antiword или catdoc.")
+        logger.warning("  Linux: sudo apt-get install antiword")
+        logger.warning("  Mac: brew install antiword")
+        logger.warning("  Windows: скачайте antiword с https://www.winfield.demon.nl/")
+        logger.warning("[FileReader] Создан тестовый файл для проверки")
         return FileReader.create_demo_text()
 
     @staticmethod
     def _read_rtf_file(file_path: str) -> str:
-        """Чтение RTF файлов"""
-        print(f"[FileReader] Попытка чтения RTF файла: {file_path}")
+        """Чтение RTF файлов: один проход по байтам с кодовой страницей из \\ansicpg"""
+        from src.utils.rtf_stream import iter_rtf_text
+
+        logger.debug("[FileReader] Попытка чтения RTF файла: %s", file_path)
 
         try:
-            # Пробуем установить и использовать striprtf
-            from striprtf.striprtf import rtf_to_text
-        except ImportError:
-            print("[FileReader] Установите библиотеку для RTF: pip install striprtf")
-            print("[FileReader] Создан тестовый файл для проверки")
-            return FileReader.create_demo_text()
+            text = ''.join(iter_rtf_text(file_path))
+            if text and len(text) > 10:  # Проверяем, что текст не пустой
+                logger.info("[FileReader] RTF прочитан, символов: %d", len(text))
+                return text
+        except Exception as e:
+            logger.warning("[FileReader] Ошибка чтения RTF: %s", e)
 
+        logger.warning("[FileReader] Создан тестовый файл для проверки")
+        return FileReader.create_demo_text()
+
+    def iter_pages(self, file_path: str, pages: Optional[List[dict]] = None) -> Iterator[Page]:
+        """
+        Потоковое чтение по страницам. PDF выдаётся постранично по мере
+        извлечения, остальные форматы - одной страницей с полным текстом
+        (начала их страниц, если известны, дописываются в pages).
+        """
+        if Path(file_path).suffix.lower() == '.pdf' and Path(file_path).exists():
+            yield from FileReader.iter_pdf_pages(file_path, self.pdf_workers)
+            return
+
+        text, error_message = self.read_file(file_path, pages)
+        if error_message:
+            logger.warning("[FileReader] %s", error_message)
+        if text:
+            yield Page(number=1, text=text)
+
+    def iter_text(self, file_path: str, pages: Optional[List[dict]] = None) -> Iterator[str]:
+        """
+        Текст файла частями, без склейки целиком: части, сложенные подряд,
+        дают текст read_file(). Начала страниц дописываются в pages до выдачи
+        текста, на котором они стоят. В отличие от read_file(), ошибка чтения
+        не заменяется демо-текстом, а пробрасывается.
+        """
+        path = Path(file_path)
+        if not path.exists():
+            raise FileNotFoundError(f"Файл не найден: {file_path}")
+
+        suffix = path.suffix.lower()
+        if suffix == '.txt':
+            from src.utils.text_stream import iter_text
+
+            yield from iter_text(file_path, SUPPORTED_ENCODINGS)
+        elif suffix == '.pdf':
+            position = 0
+            for page in FileReader.iter_pdf_pages(file_path, self.pdf_workers):
+                if page.text:
+                    if pages is not None:
+                        pages.append({'number': page.number, 'position': position})
+                    yield page.text if position == 0 else '\n' + page.text
+                    position += len(page.text) + 1
+        elif suffix == '.docx':
+            yield from self._iter_docx_text(file_path, pages)
+        else:
+            text, error_message = self.read_file(file_path, pages)
+            if error_message:
+                raise ValueError(error_message)
+            yield text
+
+    def _iter_docx_text(self, file_path: str, pages: Optional[List[dict]]) -> Iterator[str]:
+        """Непустые абзацы DOCX по порядку, как в _read_docx_xml/_read_docx_file"""
+        from src.utils.docx_stream import PageStarts, iter_docx_blocks, paragraph_page_breaks
+
+        starts = PageStarts(pages)
+        if self.docx_backend == 'xml':
+            blocks = ((block.text, block.page_breaks) for block in iter_docx_blocks(file_path))
+            cells = ()
+        else:
+            from docx import Document as DocxDocument
+
+            doc = DocxDocument(file_path)
+            blocks = ((paragraph.text, paragraph_page_breaks(paragraph._p)) for paragraph in doc.paragraphs)
+            # Таблицы - после абзацев, разбивку на страницы не меняют
+            cells = (cell.text for table in doc.tables for row in table.rows for cell in row.cells)
+
+        position = 0
+        for text, breaks in blocks:
+            starts.feed(position, text, breaks)
+            if text.strip():
+                yield text if position == 0 else '\n' + text
+                position += len(text) + 1
+        for text in cells:
+            if text.strip():
+                yield text if position == 0 else '\n' + text
+                position += len(text) + 1
+
+    @staticmethod
+    def iter_pdf_pages(file_path: str, workers: int = 1) -> Iterator[Page]:
+        """
+        Генератор страниц PDF. После извлечения страницы её кэш в pdfplumber
+        сбрасывается, поэтому в памяти держится только текущая страница.
+        При workers > 1 диапазон страниц делится на блоки, которые извлекаются
+        в пуле процессов; страницы выдаются строго по порядку номеров.
+        """
+        import pdfplumber
+
+        with pdfplumber.open(file_path) as pdf:
+            page_count = len(pdf.pages)
+            logger.debug("[FileReader] PDF содержит %d страниц", page_count)
+
+            if workers <= 1 or page_count < 2:
+                for i, page in enumerate(pdf.pages):
+                    try:
+                        yield FileReader._extract_pdf_page(page, i + 1)
+                    finally:
+                        page.close()
+                return
+
+        yield from FileReader._iter_pdf_pages_parallel(file_path, page_count, workers)
+
+    @staticmethod
+    def _iter_pdf_pages_parallel(file_path: str, page_count: int, workers: int) -> Iterator[Page]:
+        """Извлекает блоки страниц в пуле процессов и выдаёт их по порядку"""
+        from concurrent.futures import ProcessPoolExecutor
+
+        # Блоков больше, чем процессов, чтобы выровнять нагрузку
+        chunk_size = max(PDF_MIN_CHUNK_PAGES, math.ceil(page_count / (workers * 4)))
+        ranges = [(start, min(start + chunk_size, page_count)) for start in range(0, page_count, chunk_size)]
+
+        executor = ProcessPoolExecutor(max_workers=min(workers, len(ranges)))
         try:
-            # Пробуем разные кодировки
-            encodings = ['utf-8', 'cp1251', 'cp866', 'iso-8859-1']
+            # Ограничиваем число блоков "в полёте", чтобы не копить весь документ
+            pending = deque()
+            next_range = iter(ranges)
+            for start, stop in itertools.islice(next_range, workers * 2):
+                pending.append(executor.submit(FileReader._extract_pdf_range, file_path, start, stop))
+
+            while pending:
+                pages = pending.popleft().result()
+                for start, stop in itertools.islice(next_range, 1):
+                    pending.append(executor.submit(FileReader._extract_pdf_range, file_path, start, stop))
+                yield from pages
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
 
-            for encoding in encodings:
+    @staticmethod
+    def _extract_pdf_range(file_path: str, start: int, stop: int) -> List[Page]:
+        """Выполняется в процессе пула: сам открывает PDF и извлекает страницы [start, stop)"""
+        import pdfplumber
+
+        pages = []
+        with pdfplumber.open(file_path) as pdf:
+            for i in range(start, stop):
+                page = pdf.pages[i]
                 try:
-                    with open(file_path, 'r', encoding=encoding) as f:
-                        rtf_text = f.read()
+                    pages.append(FileReader._extract_pdf_page(page, i + 1))
+                finally:
+                    page.close()
+        return pages
+
+    @staticmethod
+    def _extract_pdf_page(page, number: int) -> Page:
+        """Текст одной страницы PDF вместе с таблицами и служебными заголовками"""
+        parts = []
 
-                    if rtf_text:
-                        text = rtf_to_text(rtf_text)
-                        if text and len(text) > 10:  # Проверяем, что текст не пустой
-                            print(f"[FileReader] RTF прочитан (кодировка: {encoding}), символов: {len(text)}")
-                            return text
-                except UnicodeDecodeError:
-                    continue
+        # Извлекаем текст
+        text = page.extract_text()
+        if text and text.strip():
+            parts.append(f"--- Страница {number} ---")
+            parts.append(text.strip())
 
+        # Пытаемся извлечь таблицы
+        try:
+            tables = page.extract_tables()
+            for table in tables:
+                if table:
+                    table_text = "\n".join(["\t".join(row) for row in table if any(row)])
+                    if table_text.strip():
+                        parts.append(f"--- Таблица на странице {number} ---")
+                        parts.append(table_text)
         except Exception as e:
-            print(f"[FileReader] Ошибка чтения RTF: {e}")
+            logger.warning("[FileReader] Ошибка чтения таблицы: %s", e)
 
-        print("[FileReader] Создан тестовый файл для проверки")
-        return FileReader.create_demo_text()
+        return Page(number=number, text='\n'.join(parts))
 
     @staticmethod
-    def _read_pdf_file(file_path: str) -> str:
+    def _read_pdf_file(file_path: str, workers: int = 1, pages: Optional[List[dict]] = None) -> str:
         """Чтение PDF файлов с улучшенной обработкой"""
         try:
-            import pdfplumber
-            try:
-                full_text = []
-                with pdfplumber.open(file_path) as pdf:
-                    print(f"[FileReader] PDF содержит {len(pdf.pages)} страниц")
-
-                    for i, page in enumerate(pdf.pages):
-                        # Извлекаем текст
-                        text = page.extract_text()
-                        if text and text.strip():
-                            full_text.append(f"--- Страница {i + 1} ---")
-                            full_text.append(text.strip())
-
-                        # Пытаемся извлечь таблицы
-                        try:
-                            tables = page.extract_tables()
-                            for table in tables:
-                                if table:
-                                    table_text = "\n".join(["\t".join(row) for row in table if any(row)])
-                                    if table_text.strip():
-                                        full_text.append(f"--- Таблица на странице {i + 1} ---")
-                                        full_text.append(table_text)
-                        except Exception as e:
-                            print(f"[FileReader] Ошибка чтения таблицы: {e}")
-
-                result = '\n'.join(full_text)
-                print(f"[FileReader] PDF успешно прочитан, символов: {len(result)}")
-                return result
-
-            except Exception as e:
-                print(f"[FileReader] Ошибка чтения PDF: {e}")
-                print("[FileReader] Создан тестовый файл для проверки")
-                return FileReader.create_demo_text()
+            import pdfplumber  # noqa: F401
         except ImportError:
-            print("[FileReader] Библиотека 'pdfplumber' не установлена. Установите: pip install pdfplumber")
-            print("[FileReader] Создан тестовый файл для проверки")
+            logger.warning("[FileReader] Библиотека 'pdfplumber' не установлена. Установите: pip install pdfplumber")
+            logger.warning("[FileReader] Создан тестовый файл для проверки")
             return FileReader.create_demo_text()
 
+        found, parts, position = [], [], 0
+        try:
+            for page in FileReader.iter_pdf_pages(file_path, workers):
+                if page.text:
+                    found.append({'number': page.number, 'position': position})
+                    parts.append(page.text)
+                    position += len(page.text) + 1
+            result = '\n'.join(parts)
+            if pages is not None:
+                pages.extend(found)
+            logger.info("[FileReader] PDF успешно прочитан, символов: %d", len(result))
+            return result
 
+        except Exception as e:
+            logger.warning("[FileReader] Ошибка чтения PDF: %s", e)
+            logger.warning("[FileReader] Создан тестовый файл для проверки")
+            return FileReader.create_demo_text()
 
     @staticmethod
     def _read_text_file(file_path: str) -> str:
-        """Чтение текстовых файлов с автоопределением кодировки"""
+        """Чтение текстовых файлов с автоопределением кодировки (по образцу, один проход)"""
+        from src.utils.text_stream import read_text
 
-        for encoding in SUPPORTED_ENCODINGS:
-            try:
-                with open(file_path, 'r', encoding=encoding) as f:
-                    content = f.read()
-                    print(f"[FileReader] Текстовый файл прочитан в кодировке {encoding}")
-                    return content
-            except UnicodeDecodeError:
-                continue
-
-        print("[FileReader] Не удалось определить кодировку файла")
-        print("[FileReader] Создан тестовый файл для проверки")
+        content, encoding = read_text(file_path, SUPPORTED_ENCODINGS)
+        if content is not None:
+            logger.info("[FileReader] Текстовый файл прочитан в кодировке %s", encoding)
+            return content
+
+        logger.warning("[FileReader] Не удалось определить кодировку файла")
+        logger.warning("[FileReader] Создан тестовый файл для проверки")
         return FileReader.create_demo_text()
 
     @staticmethod
-    def _read_docx_file(file_path: str) -> str:
+    def _read_docx_file(file_path: str, pages: Optional[List[dict]] = None) -> str:
         """Чтение DOCX файлов"""
         try:
             # Ленивый импорт - библиотека может быть не установлена
             from docx import Document as DocxDocument
+            from src.utils.docx_stream import PageStarts, paragraph_page_breaks
 
             doc = DocxDocument(file_path)
             full_text = []
+            starts, position = PageStarts(), 0
 
             # Извлекаем текст из всех параграфов
             for paragraph in doc.paragraphs:
-                if paragraph.text.strip():
-                    full_text.append(paragraph.text)
+                text = paragraph.text
+                starts.feed(position, text, paragraph_page_breaks(paragraph._p))
+                if text.strip():
+                    full_text.append(text)
+                    position += len(text) + 1
 
-            # Извлекаем текст из таблиц
+            # Извлекаем текст из таблиц (после абзацев, поэтому на последней странице)
             for table in doc.tables:
                 for row in table.rows:
                     for cell in row.cells:
@@ -231,19 +429,48 @@ class FileReader:
                             full_text.append(cell.text)
 
             result = '\n'.join(full_text)
-            print(f"[FileReader] DOCX файл прочитан, символов: {len(result)}")
+            if pages is not None:
+                pages.extend(starts.pages)
+            logger.info("[FileReader] DOCX файл прочитан, символов: %d", len(result))
             return result
 
         except ImportError:
-            print("[FileReader] Библиотека 'python-docx' не установлена")
-            print("[FileReader] Создан тестовый файл для проверки")
+            logger.warning("[FileReader] Библиотека 'python-docx' не установлена")
+            logger.warning("[FileReader] Создан тестовый файл для проверки")
             return FileReader.create_demo_text()
         except Exception as e:
-            print(f"[FileReader] Ошибка чтения DOCX: {e}")
-            print("[FileReader] Создан тестовый файл для проверки")
+            logger.warning("[FileReader] Ошибка чтения DOCX: %s", e)
+            logger.warning("[FileReader] Создан тестовый файл для проверки")
             return FileReader.create_demo_text()
 
 
+    @staticmethod
+    def _read_docx_xml(file_path: str, pages: Optional[List[dict]] = None) -> str:
+        """Быстрое чтение DOCX: потоковый разбор document.xml в порядке документа"""
+        import zipfile
+        import xml.etree.ElementTree as ET
+        from src.utils.docx_stream import PageStarts, iter_docx_blocks
+
+        try:
+            full_text = []
+            starts, position = PageStarts(), 0
+            for block in iter_docx_blocks(file_path):
+                starts.feed(position, block.text, block.page_breaks)
+                if block.text.strip():
+                    full_text.append(block.text)
+                    position += len(block.text) + 1
+
+            result = '\n'.join(full_text)
+            if pages is not None:
+                pages.extend(starts.pages)
+            logger.info("[FileReader] DOCX файл прочитан (xml), символов: %d", len(result))
+            return result
+
+        except (zipfile.BadZipFile, KeyError, ET.ParseError) as e:
+            logger.warning("[FileReader] Ошибка чтения DOCX: %s", e)
+            logger.warning("[FileReader] Создан тестовый файл для проверки")
+            return FileReader.create_demo_text()
+
     @staticmethod
     def create_demo_text() -> str:
         """Создаёт демонстрационный текст для тестирования"""
@@ -0,0 +1,70 @@
+"""
+Логирование верификатора.
+Модули пишут через логгеры с общим корнем 'gost': get_logger('core.parser')
+даёт 'gost.core.parser'. По умолчанию выводятся только предупреждения
+и ошибки; уровень задаётся для всего приложения и отдельно для модулей.
+Сообщения передаются шаблоном с аргументами (logger.debug("... %s", x)),
+поэтому при выключенном уровне строка не форматируется.
+"""
+import logging
+import sys
+from typing import Dict, Iterable, Optional
+
+ROOT_LOGGER = 'gost'
+DEFAULT_LEVEL = logging.WARNING
+LOG_FORMAT = '%(message)s'
+
+# Тихий режим по умолчанию, даже если корневой логгер приложения настроен подробнее
+logging.getLogger(ROOT_LOGGER).setLevel(DEFAULT_LEVEL)
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Логгер модуля, например get_logger('checks.appendix')"""
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
+
+
+def parse_level(level) -> int:
+    """Уровень из имени ('debug', 'INFO') или числа"""
+    if isinstance(level, int):
+        return level
+    value = logging.getLevelName(str(level).upper())
+    if not isinstance(value, int):
+        raise ValueError(f"Неизвестный уровень логирования: {level}")
+    return value
+
+
+def parse_module_levels(specs: Optional[Iterable[str]]) -> Dict[str, int]:
+    """Разбирает строки вида 'checks.appendix=DEBUG' в {модуль: уровень}"""
+    levels = {}
+    for spec in specs or []:
+        name, sep, level = spec.partition('=')
+        if not sep or not name.strip():
+            raise ValueError(f"Ожидается МОДУЛЬ=УРОВЕНЬ: {spec}")
+        levels[name.strip()] = parse_level(level.strip())
+    return levels
+
+
+def setup_logging(level=DEFAULT_LEVEL, module_levels: Optional[Dict[str, int]] = None, stream=None):
+    """
+    Настраивает вывод логов верификатора: общий уровень, уровни модулей
+    и поток (по умолчанию stderr). Повторный вызов заменяет прежние настройки.
+    """
+    root = logging.getLogger(ROOT_LOGGER)
+    root.setLevel(parse_level(level))
+    root.propagate = False
+
+    for handler in list(root.handlers):
+        if getattr(handler, '_gost_handler', False):
+            root.removeHandler(handler)
+
+    handler = logging.StreamHandler(stream or sys.stderr)
+    handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    handler._gost_handler = True
+    root.addHandler(handler)
+
+    # Уровни модулей из предыдущей настройки сбрасываются
+    for name, logger in logging.Logger.manager.loggerDict.items():
+        if name.startswith(f"{ROOT_LOGGER}.") and isinstance(logger, logging.Logger):
+            logger.setLevel(logging.NOTSET)
+    for name, module_level in (module_levels or {}).items():
+        get_logger(name).setLevel(parse_level(module_level))
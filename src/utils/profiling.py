@@ -0,0 +1,118 @@
+"""
+Замеры этапов обработки документа: время, процессорное время и пик памяти.
+Parser открывает Profiler на документ, FileReader и Validator добавляют
+в него свои этапы; результат попадает в блок timings отчёта.
+Пик памяти измеряется только при включённом tracemalloc (--profile
+или python -X tracemalloc), иначе он равен None.
+"""
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+# Профайлер документа, который сейчас обрабатывается в этом потоке/задаче
+_current: ContextVar[Optional["Profiler"]] = ContextVar('gost_profiler', default=None)
+
+
+class Profiler:
+    """
+    Собирает замеры этапов в словарь {этап: {wall_sec, cpu_sec, peak_alloc_kb}}.
+    Этапы могут быть вложены (parser.parse -> file_reader._read_docx_file):
+    пик памяти внутреннего этапа учитывается и во внешнем.
+    """
+
+    def __init__(self):
+        self.timings: Dict[str, dict] = {}
+        self._local = threading.local()
+
+    @contextmanager
+    def measure(self, name: str, track_memory: bool = True) -> Iterator[None]:
+        """Замеряет блок кода; track_memory=False - без пика памяти (параллельные потоки)"""
+        track_memory = track_memory and tracemalloc.is_tracing()
+        stack = self._stack()
+        frame = {'start': 0, 'peak': 0}
+
+        if track_memory:
+            current, peak = tracemalloc.get_traced_memory()
+            if stack:
+                # Пик внешнего этапа до начала вложенного
+                stack[-1]['peak'] = max(stack[-1]['peak'], peak)
+            frame['start'] = current
+            tracemalloc.reset_peak()
+            stack.append(frame)
+
+        wall_start = time.perf_counter()
+        cpu_start = time.thread_time()
+        try:
+            yield
+        finally:
+            entry = {
+                'wall_sec': round(time.perf_counter() - wall_start, 6),
+                'cpu_sec': round(time.thread_time() - cpu_start, 6),
+                'peak_alloc_kb': None
+            }
+            if track_memory:
+                stack.pop()
+                peak = max(tracemalloc.get_traced_memory()[1], frame['peak'])
+                entry['peak_alloc_kb'] = max(0, peak - frame['start']) // 1024
+                if stack:
+                    stack[-1]['peak'] = max(stack[-1]['peak'], peak)
+            self.timings[name] = entry
+
+    @contextmanager
+    def activate(self) -> Iterator["Profiler"]:
+        """Делает профайлер текущим: на него пишут stage() в FileReader и др."""
+        token = _current.set(self)
+        try:
+            yield self
+        finally:
+            _current.reset(token)
+
+    def _stack(self) -> list:
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Замер этапа в текущем профайлере; без активного профайлера ничего не делает"""
+    profiler = _current.get()
+    if profiler is None:
+        yield
+        return
+    with profiler.measure(name):
+        yield
+
+
+@contextmanager
+def profile_to(pstats_path: Optional[str]) -> Iterator[None]:
+    """
+    Выполняет блок под cProfile и сохраняет статистику в pstats_path
+    (смотреть: python -m pstats файл). На время блока включается tracemalloc,
+    чтобы в timings попал пик памяти. pstats_path=None - без профилирования.
+    """
+    if pstats_path is None:
+        yield
+        return
+
+    import cProfile
+
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+
+    profile = cProfile.Profile()
+    profile.enable()
+    try:
+        yield
+    finally:
+        profile.disable()
+        if started_tracing:
+            tracemalloc.stop()
+        Path(pstats_path).parent.mkdir(parents=True, exist_ok=True)
+        profile.dump_stats(pstats_path)
@@ -0,0 +1,154 @@
+"""
+Кэш результатов проверок на диске.
+Ключ результата одной проверки - хэш содержимого разобранного документа,
+хэш действующих правил этой проверки (BaseCheck.rules_fingerprint) и
+версия её реализации. Поэтому после правки, например, только раздела
+appendices в YAML заново выполняется одна проверка приложений, а
+повторная проверка неизменного архива не выполняет проверок вовсе.
+"""
+import hashlib
+import inspect
+import json
+import sys
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from src.models import CheckResult, CheckStatus, Document, ErrorTemplate
+from src.utils.extraction_cache import DEFAULT_CACHE_DIR, DEFAULT_MAX_SIZE_MB, ExtractionCache
+
+# Записей между полными обходами каталога: их пишут и другие процессы
+EVICT_SCAN_WRITES = 1000
+
+# Пакет, модули которого входят в версию реализации проверки
+SOURCE_PACKAGE = 'src'
+
+
+@lru_cache(maxsize=None)
+def _source_digest(module_name: str) -> str:
+    """Хэш исходного кода модуля; пусто, если модуль загружен не из файла"""
+    path = getattr(sys.modules.get(module_name), '__file__', None)
+    if not path:
+        return ''
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+@lru_cache(maxsize=None)
+def _dependencies(module_name: str) -> Tuple[str, ...]:
+    """
+    Модули пакета src, от которых зависит модуль: он сам и всё, что импортировано
+    на уровне модулей (модули и объекты в их глобальных именах), транзитивно
+    """
+    found, pending = set(), [module_name]
+    while pending:
+        name = pending.pop()
+        module = sys.modules.get(name)
+        if name in found or module is None:
+            continue
+        found.add(name)
+        for value in vars(module).values():
+            dependency = value.__name__ if inspect.ismodule(value) else getattr(value, '__module__', None)
+            if isinstance(dependency, str) and dependency.partition('.')[0] == SOURCE_PACKAGE:
+                pending.append(dependency)
+    return tuple(sorted(found))
+
+
+def implementation_version(check) -> str:
+    """
+    Версия реализации проверки: VERSION класса и хэш исходного кода её модуля и
+    всех модулей src, которые он импортирует (base_checker, models, scanner...),
+    чтобы правка кода без увеличения VERSION не отдала старый результат
+    """
+    module = type(check).__module__
+    sources = '|'.join(f"{name}:{_source_digest(name)}" for name in _dependencies(module))
+    return f"{module}.{type(check).__name__}:{check.VERSION}:{hashlib.sha256(sources.encode()).hexdigest()}"
+
+
+class ResultCache(ExtractionCache):
+    """
+    Каталог <cache_dir>/results с записями <ключ>.json - результатами одной
+    проверки. Запись, вытеснение по mtime и безопасность для нескольких
+    процессов - как у ExtractionCache. Записей на документ много и они
+    мелкие, поэтому каталог обходится не после каждой записи, а когда
+    оценка размера превысила лимит или накопилось EVICT_SCAN_WRITES записей.
+    """
+
+    SUBDIR = 'results'
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, max_size_mb: int = DEFAULT_MAX_SIZE_MB):
+        super().__init__(cache_dir, max_size_mb)
+        # (документ, его текст, хэш) последнего документа: профили проверяют один Document несколько раз
+        self._last = None
+        # Размер кэша при последнем обходе плюс записанное с тех пор; None - обхода не было
+        self._size = None
+        self._writes_since_scan = 0
+
+    def document_hash(self, document: Document) -> str:
+        """SHA-256 всего, что проверки читают из документа: текст, страницы и найденные элементы"""
+        if self._last and self._last[0] is document and self._last[1] is document.raw_text:
+            return self._last[2]
+
+        digest = hashlib.sha256(document.raw_text.encode('utf-8', 'surrogatepass'))
+        structure = [document.pages, document.sections, document.tables, document.figures,
+                     document.formulas, document.appendices]
+        digest.update(json.dumps(structure, ensure_ascii=False, sort_keys=True, default=str).encode('utf-8'))
+        self._last = (document, document.raw_text, digest.hexdigest())
+        return self._last[2]
+
+    def check_key(self, check, document_hash: str) -> str:
+        """Ключ результата проверки check на документе с хэшем document_hash"""
+        parts = (document_hash, check.check_id, check.rules_fingerprint(), implementation_version(check))
+        return hashlib.sha256('|'.join(parts).encode('utf-8')).hexdigest()
+
+    def get_result(self, key: str) -> Optional[CheckResult]:
+        """Сохранённый результат проверки или None"""
+        entry = self.get(key)
+        if entry is None:
+            return None
+        try:
+            return self._decode(entry)
+        except (KeyError, TypeError, ValueError, IndexError):
+            # Повреждённая или старая запись - как промах
+            self.hits -= 1
+            self.misses += 1
+            return None
+
+    def put_results(self, results: Dict[str, CheckResult]):
+        """Сохраняет результаты {ключ: результат}; ошибки выполнения (ERROR) не кэшируются"""
+        written = 0
+        for key, result in results.items():
+            if result.status != CheckStatus.ERROR:
+                written += self._write(key, self._encode(result), evict=False)
+                self._writes_since_scan += 1
+        if not written:
+            return
+
+        if self._size is not None:
+            self._size += written
+        if self._size is None or self._size > self.max_bytes or self._writes_since_scan >= EVICT_SCAN_WRITES:
+            self._size = self._evict()
+            self._writes_since_scan = 0
+
+    @staticmethod
+    def _encode(result: CheckResult) -> dict:
+        """Шаблоны ошибок записываются один раз, ошибка - номер шаблона и аргументы"""
+        templates: Dict[ErrorTemplate, int] = {}
+        errors = []
+        for error in result.errors:
+            number = templates.setdefault(error.template, len(templates))
+            errors.append([number, list(error.args), error.page, error.element])
+        return {
+            'check_id': result.check_id,
+            'check_name': result.check_name,
+            'status': result.status.value,
+            'templates': [[t.check_name, t.description, t.recommendation, t.gost_reference] for t in templates],
+            'errors': errors
+        }
+
+    @staticmethod
+    def _decode(entry: dict) -> CheckResult:
+        templates: List[ErrorTemplate] = [ErrorTemplate(*fields) for fields in entry['templates']]
+        errors = [templates[number].error(*args, page=page, element=element)
+                  for number, args, page, element in entry['errors']]
+        return CheckResult(check_id=entry['check_id'], check_name=entry['check_name'],
+                           status=CheckStatus(entry['status']), errors=errors)
@@ -0,0 +1,254 @@
+"""
+Потоковое чтение RTF без striprtf.
+Файл читается блоками байтов один раз; кодовая страница берётся из
+\\ansicpg, \\'hh и \\uN декодируются на лету, группы-назначения
+(\\pict, \\object, таблицы шрифтов и т.п.) пропускаются без сборки их
+содержимого, двоичные данные \\binN перепрыгиваются.
+"""
+import codecs
+import re
+from typing import Iterator
+
+# Размер блока чтения файла
+RTF_CHUNK_SIZE = 1024 * 1024
+
+# Управляющее слово не длиннее 32 букв + параметр + разделитель
+_MAX_CONTROL_LENGTH = 64
+
+TOKEN_PATTERN = re.compile(
+    rb"\\([a-zA-Z]{1,32})(-?\d{1,10})? ?"   # управляющее слово
+    rb"|\\'([0-9a-fA-F]{2})"                 # байт в кодовой странице
+    rb"|\\([^a-zA-Z])"                       # управляющий символ
+    rb"|([{}])"                              # группа
+    rb"|([^\\{}\r\n]+)"                      # текст
+    rb"|[\r\n]+"                             # переводы строк в исходнике не значимы
+)
+
+# Внутри пропускаемой группы важны только скобки и управляющие слова (\bin)
+SKIP_PATTERN = re.compile(rb"[^\\{}]+")
+
+# Назначения, текст которых не относится к содержимому документа
+DESTINATIONS = frozenset((
+    'aftncn', 'aftnsep', 'aftnsepc', 'annotation', 'atnauthor', 'atndate', 'atnicn', 'atnid',
+    'atnparent', 'atnref', 'atntime', 'atrfend', 'atrfstart', 'author', 'background',
+    'bkmkend', 'bkmkstart', 'blipuid', 'buptim', 'category', 'colorschememapping',
+    'colortbl', 'comment', 'company', 'creatim', 'datafield', 'datastore', 'defchp', 'defpap',
+    'do', 'doccomm', 'docvar', 'dptxbxtext', 'ebcend', 'ebcstart', 'factoidname', 'falt',
+    'fchars', 'ffdeftext', 'ffentrymcr', 'ffexitmcr', 'ffformat', 'ffhelptext', 'ffl',
+    'ffname', 'ffstattext', 'file', 'filetbl', 'fldinst', 'fldtype', 'fonttbl',
+    'fname', 'fontemb', 'fontfile', 'footer', 'footerf', 'footerl', 'footerr',
+    'footnote', 'formfield', 'ftncn', 'ftnsep', 'ftnsepc', 'g', 'generator', 'gridtbl',
+    'header', 'headerf', 'headerl', 'headerr', 'hl', 'hlfr', 'hlinkbase', 'hlloc', 'hlsrc',
+    'hsv', 'htmltag', 'info', 'keycode', 'keywords', 'latentstyles', 'lchars', 'levelnumbers',
+    'leveltext', 'lfolevel', 'linkval', 'list', 'listlevel', 'listname', 'listoverride',
+    'listoverridetable', 'listpicture', 'liststylename', 'listtable', 'lsdlockedexcept',
+    'mmath', 'mmathPict', 'nesttableprops', 'nextfile', 'nonesttables',
+    'objalias', 'objclass', 'objdata', 'object', 'objname', 'objsect', 'objtime', 'oldcprops',
+    'oldpprops', 'oldsprops', 'oldtprops', 'oleclsid', 'operator', 'panose', 'password',
+    'passwordhash', 'pgp', 'pgptbl', 'picprop', 'pict', 'pn', 'pnseclvl', 'pntext', 'pntxta',
+    'pntxtb', 'printim', 'private', 'propname', 'protend', 'protstart', 'protusertbl', 'pxe',
+    'result', 'revtbl', 'revtim', 'rsidtbl', 'rxe', 'shp', 'shpgrp', 'shpinst',
+    'shppict', 'shprslt', 'shptxt', 'sn', 'sp', 'staticval', 'stylesheet', 'subject', 'sv',
+    'svb', 'tc', 'template', 'themedata', 'title', 'txe', 'ud', 'upr', 'userprops',
+    'wgrffmtfilter', 'windowcaption', 'writereservation', 'writereservhash', 'xe', 'xform',
+    'xmlattrname', 'xmlattrvalue', 'xmlclose', 'xmlname', 'xmlnstbl', 'xmlopen',
+))
+
+# Управляющие слова, дающие символы текста
+SPECIAL_WORDS = {
+    'par': '\n', 'line': '\n', 'sect': '\n', 'page': '\n', 'row': '\n',
+    'tab': '\t', 'cell': '\t', 'nestcell': '\t',
+    'emdash': '\u2014', 'endash': '\u2013', 'emspace': '\u2003', 'enspace': '\u2002',
+    'qmspace': '\u2005', 'bullet': '\u2022', 'lquote': '\u2018', 'rquote': '\u2019',
+    'ldblquote': '\u201C', 'rdblquote': '\u201D',
+}
+
+SPECIAL_SYMBOLS = {
+    b'\\': '\\', b'{': '{', b'}': '}', b'~': '\xa0', b'_': '\u2011', b'-': '',
+    b'\n': '\n', b'\r': '\n',
+}
+
+
+class RtfTokenizer:
+    """Состояние разбора RTF между блоками байтов"""
+
+    def __init__(self):
+        self.stack = []          # Сохранённые (skip, uc) внешних групп
+        self.skip = False        # Текущая группа пропускается
+        self.uc = 1              # Число замещающих символов после \uN
+        self.uc_pending = 0      # Сколько замещающих символов ещё пропустить
+        self.ignorable = False   # Был \* - следующее слово начинает пропускаемую группу
+        self.bin_remaining = 0   # Байты \binN, которые ещё надо пропустить
+        self._set_codepage('cp1252')
+        self._bytes = bytearray()
+        self._out = []
+        self._pending = b''      # Обратная косая черта в конце блока: продолжение - в следующем
+
+    def feed(self, data: bytes) -> str:
+        """Разбирает блок байтов и возвращает полученный из него текст"""
+        if self._pending:
+            data = self._pending + data
+            self._pending = b''
+        pos = 0
+        size = len(data)
+
+        while pos < size:
+            if self.bin_remaining:
+                step = min(self.bin_remaining, size - pos)
+                pos += step
+                self.bin_remaining -= step
+                continue
+
+            if self.skip:
+                skipped = SKIP_PATTERN.match(data, pos)
+                if skipped:
+                    pos = skipped.end()
+                    continue
+
+            match = TOKEN_PATTERN.match(data, pos)
+            if match is None:
+                # Одиночная \ в конце блока: управляющий символ закончится в следующем
+                self._pending = data[pos:]
+                break
+            pos = match.end()
+            word, param, hex_code, symbol, brace, text = match.groups()
+
+            if text is not None:
+                if not self.skip:
+                    self._add_bytes(text)
+            elif word is not None:
+                self._control_word(word.decode('ascii'), param)
+            elif hex_code is not None:
+                if not self.skip:
+                    self._add_bytes(bytes((int(hex_code, 16),)))
+            elif brace is not None:
+                self._group(brace)
+            elif symbol is not None:
+                self._control_symbol(symbol)
+
+        return self._drain(final=False)
+
+    def finish(self) -> str:
+        """Завершает разбор: возвращает текст, оставшийся в декодере"""
+        return self._drain(final=True)
+
+    def _group(self, brace: bytes):
+        if brace == b'{':
+            self.stack.append((self.skip, self.uc))
+        elif self.stack:
+            self.skip, self.uc = self.stack.pop()
+        self.ignorable = False
+
+    def _control_word(self, word: str, param):
+        if word == 'bin' and param:
+            # Двоичные данные пропускаются в любом случае
+            self.bin_remaining = max(0, int(param))
+            return
+
+        if self.skip:
+            return
+
+        if self.ignorable or word in DESTINATIONS:
+            self.ignorable = False
+            self.skip = True
+            return
+
+        if self.uc_pending:
+            self.uc_pending -= 1
+            return
+
+        if word == 'ansicpg' and param:
+            self._flush_bytes()
+            self._set_codepage(f"cp{int(param)}")
+        elif word == 'uc' and param is not None:
+            self.uc = int(param)
+        elif word == 'u' and param is not None:
+            code = int(param)
+            self._add_text(chr(code + 65536 if code < 0 else code))
+            self.uc_pending = self.uc
+        elif word in SPECIAL_WORDS:
+            self._add_text(SPECIAL_WORDS[word])
+
+    def _control_symbol(self, symbol: bytes):
+        if symbol == b'*':
+            self.ignorable = True
+            return
+        if self.skip:
+            return
+        if self.uc_pending:
+            self.uc_pending -= 1
+            return
+        if symbol in SPECIAL_SYMBOLS:
+            self._add_text(SPECIAL_SYMBOLS[symbol])
+
+    def _add_bytes(self, data: bytes):
+        if self.uc_pending:
+            # Замещающие символы после \uN в тексте не выводятся
+            dropped = min(self.uc_pending, len(data))
+            self.uc_pending -= dropped
+            data = data[dropped:]
+        self._bytes += data
+
+    def _add_text(self, text: str):
+        self._flush_bytes()
+        self._out.append(text)
+
+    def _flush_bytes(self):
+        if self._bytes:
+            self._out.append(self._decoder.decode(bytes(self._bytes)))
+            self._bytes.clear()
+
+    def _set_codepage(self, codepage: str):
+        try:
+            codecs.lookup(codepage)
+        except LookupError:
+            codepage = 'cp1252'
+        self._decoder = codecs.getincrementaldecoder(codepage)(errors='replace')
+
+    def _drain(self, final: bool) -> str:
+        self._flush_bytes()
+        if final:
+            self._out.append(self._decoder.decode(b'', final=True))
+        text = ''.join(self._out)
+        self._out.clear()
+        return text
+
+
+def _backslash_run(data: bytes, end: int) -> int:
+    """Число идущих подряд \\ в data, заканчивающихся в позиции end"""
+    start = end
+    while start > 0 and data[start - 1] == 0x5C:
+        start -= 1
+    return end - start + 1
+
+
+def iter_rtf_text(file_path: str, chunk_size: int = RTF_CHUNK_SIZE) -> Iterator[str]:
+    """Читает RTF блоками и выдаёт текст по мере разбора"""
+    tokenizer = RtfTokenizer()
+    carry = b''
+
+    with open(file_path, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            data = carry + chunk
+            if not chunk:
+                carry = b''
+            else:
+                # Не разрезаем управляющее слово на границе блока
+                cut = data.rfind(b'\\', max(0, len(data) - _MAX_CONTROL_LENGTH))
+                if cut == -1:
+                    cut = len(data)
+                elif _backslash_run(data, cut) % 2 == 0:
+                    # Эта \ - вторая половина \\: пара целиком остаётся в блоке
+                    cut += 1
+                data, carry = data[:cut], data[cut:]
+
+            text = tokenizer.feed(data)
+            if text:
+                yield text
+            if not chunk:
+                break
+
+    text = tokenizer.finish()
+    if text:
+        yield text
@@ -0,0 +1,213 @@
+# src/utils/rule_set.py
+"""
+Скомпилированные правила проверок.
+RuleSet строится из словаря конфига один раз: значения по умолчанию
+подставляются, типы проверяются, регулярные выражения компилируются.
+Ошибка в конфиге обнаруживается при загрузке, а не посреди проверки.
+RuleSet неизменяем, поэтому один экземпляр передаётся всем проверкам,
+потокам и процессам. Для совместимости он читается как словарь конфига.
+"""
+import copy
+import hashlib
+import json
+import re
+from collections.abc import Mapping
+from dataclasses import asdict, dataclass, field, is_dataclass
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+
+class ConfigError(ValueError):
+    """Некорректное значение в конфиге; path - путь к ключу"""
+
+    def __init__(self, path: str, message: str):
+        super().__init__(f"{path}: {message}")
+        self.path = path
+
+
+@dataclass(frozen=True)
+class SectionNumberingRules:
+    pattern: re.Pattern
+    max_level: int
+
+
+@dataclass(frozen=True)
+class TableRules:
+    caption_pattern: re.Pattern  # Без учёта регистра
+    require_caption: bool
+
+
+@dataclass(frozen=True)
+class FormulaRules:
+    numbering_pattern: re.Pattern
+    require_reference: bool
+
+
+@dataclass(frozen=True)
+class AppendixRules:
+    pattern: re.Pattern
+    allowed_types: Tuple[str, ...]
+    max_designation_length: int
+    require_uppercase: bool
+    require_space: bool
+    allow_dot_after: bool
+    allow_parentheses: bool
+    require_reference: bool
+
+
+@dataclass(frozen=True)
+class FormatRules:
+    allowed_formats: Tuple[str, ...]
+    max_file_size_mb: float
+
+
+@dataclass(frozen=True, eq=False)
+class RuleSet(Mapping):
+    """
+    Проверенные правила ГОСТ 2.105 с подставленными значениями по умолчанию.
+    config - исходный конфиг после слияния (только для чтения),
+    fingerprint - хеш его содержимого.
+    """
+    config: Dict[str, Any] = field(repr=False)
+    fingerprint: str
+    required_sections: Tuple[str, ...]
+    section_numbering: SectionNumberingRules
+    tables: TableRules
+    formulas: FormulaRules
+    appendices: AppendixRules
+    system: FormatRules
+    enabled_checks: Optional[Tuple[str, ...]]  # None - включены все проверки
+
+    @classmethod
+    def from_config(cls, config, defaults: Optional[dict] = None) -> 'RuleSet':
+        """Компилирует правила из словаря конфига; RuleSet возвращается как есть"""
+        if isinstance(config, RuleSet):
+            return config
+        if config is None:
+            config = {}
+        if not isinstance(config, dict):
+            raise ConfigError('<config>', "ожидается словарь")
+        if defaults is None:
+            from src.utils.config_loader import ConfigLoader
+            defaults = ConfigLoader._get_default_config()
+
+        merged = _merge(defaults, config)
+        reader = _Reader(merged)
+        gost = 'gost_2_105'
+
+        # Прежнее имя раздела таблиц (gost_2_105.tables) дополняет table_format
+        legacy_tables = reader.get(f'{gost}.tables')
+        if isinstance(legacy_tables, dict):
+            merged[gost]['table_format'] = _merge(reader.get(f'{gost}.table_format', {}), legacy_tables)
+        tables = f'{gost}.table_format'
+
+        return cls(
+            config=merged,
+            fingerprint=hashlib.sha256(
+                json.dumps(merged, sort_keys=True, ensure_ascii=False, default=str).encode('utf-8')
+            ).hexdigest(),
+            required_sections=reader.strings(f'{gost}.required_sections'),
+            section_numbering=SectionNumberingRules(
+                pattern=reader.pattern(f'{gost}.section_numbering.pattern'),
+                max_level=reader.typed(f'{gost}.section_numbering.max_level', int)
+            ),
+            tables=TableRules(
+                caption_pattern=reader.pattern(f'{tables}.caption_pattern', re.IGNORECASE),
+                require_caption=reader.typed(f'{tables}.require_caption', bool)
+            ),
+            formulas=FormulaRules(
+                numbering_pattern=reader.pattern(f'{gost}.formulas.numbering_pattern'),
+                require_reference=reader.typed(f'{gost}.formulas.require_reference', bool)
+            ),
+            appendices=AppendixRules(
+                pattern=reader.pattern(f'{gost}.appendices.pattern'),
+                allowed_types=reader.strings(f'{gost}.appendices.allowed_designations.types'),
+                max_designation_length=reader.typed(f'{gost}.appendices.allowed_designations.max_length', int),
+                require_uppercase=reader.typed(f'{gost}.appendices.validation.require_uppercase', bool),
+                require_space=reader.typed(f'{gost}.appendices.validation.require_space', bool),
+                allow_dot_after=reader.typed(f'{gost}.appendices.validation.allow_dot_after', bool),
+                allow_parentheses=reader.typed(f'{gost}.appendices.validation.allow_parentheses', bool),
+                require_reference=reader.typed(f'{gost}.appendices.require_reference', bool)
+            ),
+            system=FormatRules(
+                allowed_formats=reader.strings('system.allowed_formats'),
+                max_file_size_mb=reader.typed('system.max_file_size_mb', (int, float))
+            ),
+            enabled_checks=(reader.strings('check_settings.enabled_checks')
+                            if reader.get('check_settings.enabled_checks') is not None else None)
+        )
+
+    def section_fingerprint(self, sections: Iterable[str]) -> str:
+        """
+        Хеш скомпилированных разделов правил (required_sections, tables...).
+        Профили, которые различаются только другими разделами, дают один хеш.
+        """
+        values = {}
+        for name in sections:
+            value = getattr(self, name)
+            values[name] = asdict(value) if is_dataclass(value) else value
+        return hashlib.sha256(json.dumps(
+            values, sort_keys=True, ensure_ascii=False,
+            default=lambda pattern: [pattern.pattern, pattern.flags]
+        ).encode('utf-8')).hexdigest()
+
+    def get_rule(self, rule_path: str, default: Any = None) -> Any:
+        """Значение из конфига по пути, например 'gost_2_105.required_sections'"""
+        return _Reader(self.config).get(rule_path, default)
+
+    def __getitem__(self, key):
+        return self.config[key]
+
+    def __iter__(self):
+        return iter(self.config)
+
+    def __len__(self):
+        return len(self.config)
+
+
+class _Reader:
+    """Чтение значений по пути с проверкой типа"""
+
+    def __init__(self, config: dict):
+        self.config = config
+
+    def get(self, path: str, default: Any = None) -> Any:
+        value = self.config
+        for key in path.split('.'):
+            if isinstance(value, dict) and key in value:
+                value = value[key]
+            else:
+                return default
+        return value
+
+    def typed(self, path: str, expected):
+        value = self.get(path)
+        # bool - подкласс int, поэтому True не должен проходить как число
+        if not isinstance(value, expected) or (expected is not bool and isinstance(value, bool)):
+            raise ConfigError(path, f"неверное значение {value!r}")
+        return value
+
+    def strings(self, path: str) -> Tuple[str, ...]:
+        value = self.get(path)
+        if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+            raise ConfigError(path, f"ожидается список строк, получено {value!r}")
+        return tuple(value)
+
+    def pattern(self, path: str, flags: int = 0) -> re.Pattern:
+        value = self.get(path)
+        if not isinstance(value, str):
+            raise ConfigError(path, f"ожидается регулярное выражение, получено {value!r}")
+        try:
+            return re.compile(value, flags)
+        except re.error as e:
+            raise ConfigError(path, f"ошибка в регулярном выражении {value!r}: {e}") from None
+
+
+def _merge(defaults: dict, config: dict) -> dict:
+    """Конфиг поверх значений по умолчанию: словари сливаются, остальное заменяется"""
+    merged = copy.deepcopy(defaults)
+    for key, value in config.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _merge(merged[key], value)
+        else:
+            merged[key] = copy.deepcopy(value)
+    return merged
@@ -0,0 +1,93 @@
+"""
+Чтение текстовых файлов с определением кодировки.
+Кодировки из списка проверяются на образце начала файла (через mmap,
+без чтения файла целиком): те, на которых образец не декодируется,
+отбрасываются. Затем файл декодируется блоками один раз в первой
+оставшейся кодировке. Если ошибка встретилась дальше образца,
+декодирование повторяется со следующей кодировкой - итог тот же,
+что при полном переборе кодировок по порядку.
+"""
+import codecs
+import io
+import mmap
+import os
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+# Образец начала файла для отбора кодировок
+TEXT_SAMPLE_SIZE = 64 * 1024
+
+# Размер блока декодирования
+TEXT_CHUNK_SIZE = 1024 * 1024
+
+
+def sample_encodings(data, encodings: Sequence[str], sample_size: int = TEXT_SAMPLE_SIZE) -> List[str]:
+    """
+    Кодировки, в которых декодируется начало data (bytes или mmap), в исходном порядке.
+    Незавершённый символ на границе образца ошибкой не считается; если образец -
+    весь файл, проверка точная. Синонимы одной кодировки остаются один раз.
+    """
+    sample = data[:sample_size]
+    final = len(data) <= sample_size
+    candidates, seen = [], set()
+    for encoding in encodings:
+        name = codecs.lookup(encoding).name
+        if name in seen:
+            continue
+        seen.add(name)
+        try:
+            codecs.getincrementaldecoder(encoding)().decode(sample, final)
+        except UnicodeError:
+            # UTF-16 без BOM - UnicodeError, а не UnicodeDecodeError
+            continue
+        candidates.append(encoding)
+    return candidates
+
+
+def iter_decoded(data, encoding: str, chunk_size: int = TEXT_CHUNK_SIZE) -> Iterator[str]:
+    """
+    Декодирует data блоками с переводом \\r\\n и \\r в \\n, как open(..., 'r').
+    UnicodeError - data не в этой кодировке.
+    """
+    decoder = io.IncrementalNewlineDecoder(codecs.getincrementaldecoder(encoding)(), translate=True)
+    for start in range(0, len(data), chunk_size):
+        yield decoder.decode(data[start:start + chunk_size])
+    yield decoder.decode(b'', final=True)
+
+
+def read_text(file_path: str, encodings: Sequence[str], chunk_size: int = TEXT_CHUNK_SIZE,
+              sample_size: int = TEXT_SAMPLE_SIZE) -> Tuple[Optional[str], Optional[str]]:
+    """Текст файла и его кодировка; (None, None), если ни одна кодировка не подошла"""
+    with open(file_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return '', encodings[0]
+
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            for encoding in sample_encodings(data, encodings, sample_size):
+                try:
+                    return ''.join(iter_decoded(data, encoding, chunk_size)), encoding
+                except UnicodeError:
+                    continue
+    return None, None
+
+
+def iter_text(file_path: str, encodings: Sequence[str], chunk_size: int = TEXT_CHUNK_SIZE,
+              sample_size: int = TEXT_SAMPLE_SIZE) -> Iterator[str]:
+    """
+    Текст файла блоками без склейки целиком - то же, что read_text().
+    Чтобы не выдавать текст в неподходящей кодировке, файл сначала
+    декодируется без сохранения результата. ValueError - ни одна кодировка не подошла.
+    """
+    with open(file_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            for encoding in sample_encodings(data, encodings, sample_size):
+                try:
+                    for _ in iter_decoded(data, encoding, chunk_size):
+                        pass
+                except UnicodeError:
+                    continue
+                yield from iter_decoded(data, encoding, chunk_size)
+                return
+    raise ValueError("Не удалось определить кодировку файла")
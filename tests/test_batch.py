@@ -0,0 +1,73 @@
+import json
+
+from pathlib import Path
+
+from src.core.batch import BatchRunner, collect_documents
+from src.utils import ConfigLoader
+
+
+CONFIG_PATH = Path(__file__).parent.parent / "config" / "gost_2_105_rules.yaml"
+
+
+def _make_documents(tmp_path):
+    """Создаёт каталог с двумя текстовыми документами и одним лишним файлом"""
+    docs_dir = tmp_path / "docs"
+    (docs_dir / "nested").mkdir(parents=True)
+    (docs_dir / "good.txt").write_text(
+        "Введение\nНазначение\nТехнические характеристики\n", encoding="utf-8")
+    (docs_dir / "nested" / "bad.txt").write_text("Введение\nОсновная часть\n", encoding="utf-8")
+    (docs_dir / "notes.md").write_text("не документ", encoding="utf-8")
+    return docs_dir
+
+
+def test_collect_documents_from_directory(tmp_path):
+    """Тест: каталог обходится рекурсивно, неподдерживаемые файлы пропускаются"""
+    docs_dir = _make_documents(tmp_path)
+
+    documents = collect_documents([str(docs_dir), str(docs_dir / "good.txt")])
+
+    assert sorted(p.split("/")[-1] for p in documents) == ["bad.txt", "good.txt"]
+
+
+def test_batch_runner_reports(tmp_path):
+    """Тест: отчёт на каждый документ и сводка по запуску"""
+    docs_dir = _make_documents(tmp_path)
+    documents = collect_documents([str(docs_dir)])
+    out_dir = tmp_path / "reports"
+
+    summary = BatchRunner(ConfigLoader.load_yaml(str(CONFIG_PATH)), output_dir=str(out_dir), workers=2).run(documents)
+
+    assert summary["summary"]["total_documents"] == 2
+    assert summary["summary"]["errors"] == 0
+    assert summary["checks"]["required_sections"] == {"PASSED": 1, "FAILED": 1, "ERROR": 0}
+    assert [e["document"] for e in summary["documents"]] == documents
+    for entry in summary["documents"]:
+        report = json.loads(open(entry["report"], encoding="utf-8").read())
+        assert report["document"] == entry["document"]
+    assert (out_dir / "summary.json").exists()
+
+
+def test_batch_runner_json_lines(tmp_path):
+    """Тест: в формате jsonl записи о документах идут по мере готовности, сводка - последней строкой"""
+    docs_dir = _make_documents(tmp_path)
+    documents = collect_documents([str(docs_dir)])
+    out_dir = tmp_path / "reports"
+
+    summary = BatchRunner(ConfigLoader.load_yaml(str(CONFIG_PATH)), output_dir=str(out_dir), workers=1,
+                          report_format="jsonl").run(documents)
+
+    lines = [json.loads(line) for line in (out_dir / "summary.jsonl").read_text(encoding="utf-8").splitlines()]
+    assert [line["type"] for line in lines] == ["document", "document", "summary"]
+    assert lines[-1]["summary"] == summary["summary"]
+    assert summary["checks"]["required_sections"] == {"PASSED": 1, "FAILED": 1, "ERROR": 0}
+    assert "documents" not in summary
+
+    # Отчёт документа: заголовок, проверки с ошибками, сводка в конце
+    records = [json.loads(line) for line in open(lines[0]["report"], encoding="utf-8")]
+    assert records[0] == {"type": "document", "document": lines[0]["document"],
+                          "validation_date": records[0]["validation_date"]}
+    checks = [r for r in records if r["type"] == "check"]
+    errors = [r for r in records if r["type"] == "error"]
+    assert sum(check["errors_count"] for check in checks) == len(errors)
+    assert records[-1]["type"] == "summary"
+    assert records[-1]["summary"] == lines[0]["summary"]
@@ -0,0 +1,30 @@
+from benchmarks.generator import DocumentSpec, generate_document
+from benchmarks.runner import compare
+from src.core import Parser
+
+
+def test_synthetic_document_structure(tmp_path):
+    """Тест: синтетический документ содержит заданное число объектов"""
+    spec = DocumentSpec(sections=5, tables=7, figures=3, formulas=4, appendices=2, lines_per_page=30)
+    path = generate_document(spec, 'txt', str(tmp_path / "synthetic.txt"))
+
+    document = Parser().parse(path)
+
+    # Парсер считает и упоминания ("см. таблица 1.1"), поэтому считаем подписи
+    assert sum(t['full_text'].startswith("Таблица") for t in document.tables) == 7
+    assert sum(f['full_text'].startswith("Рисунок") for f in document.figures) == 3
+    assert len(document.appendices) == 2
+    assert "— 2 —" in document.raw_text  # колонтитулы страниц
+
+
+def test_compare_reports_regressions():
+    """Тест: замедление сверх порога считается регрессией, шум - нет"""
+    def results(parser_sec, check_sec):
+        return {'results': {'txt': {'stages': {
+            'parser': {'min_sec': parser_sec, 'median_sec': parser_sec},
+            'check.formulas': {'min_sec': check_sec, 'median_sec': check_sec},
+        }}}}
+
+    regressions = compare(results(0.15, 0.0002), results(0.1, 0.0001), threshold=0.2)
+
+    assert [r['stage'] for r in regressions] == ['parser']
@@ -0,0 +1,25 @@
+from src.models import Document, DocumentIndex
+
+
+def test_index_lines_and_offsets():
+    """Тест: строки, смещения и поиск строки по смещению"""
+    index = DocumentIndex.build("Введение\nТаблица 1\n\nКонец")
+
+    assert index.lines == ("Введение", "Таблица 1", "", "Конец")
+    assert index.line_starts == (0, 9, 19, 20)
+    assert index.lower_lines[1] == "таблица 1"
+    assert index.line_at(0) == 0
+    assert index.line_at(9) == 1
+    assert index.line_at(18) == 1  # символ перевода строки относится к своей строке
+    assert index.line_at(22) == 3
+    assert index.line_end(1) == 18
+
+
+def test_document_builds_index_lazily():
+    """Тест: документ без индекса строит его при первом обращении"""
+    document = Document(file_path="test.txt", raw_text="Введение\nНазначение")
+
+    index = document.get_index()
+
+    assert index.lines == ("Введение", "Назначение")
+    assert document.get_index() is index
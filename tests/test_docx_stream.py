@@ -0,0 +1,47 @@
+import zipfile
+
+from src.utils.docx_stream import DocxBlock, iter_docx_blocks
+
+DOCUMENT_XML = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+            xmlns:mc="http://schemas.openxmlformats.org/markup-compatibility/2006">
+  <w:body>
+    <w:p>
+      <w:pPr><w:pStyle w:val="Heading1"/><w:tabs><w:tab w:val="left" w:pos="720"/></w:tabs></w:pPr>
+      <w:r><w:t>1 Введение</w:t></w:r>
+    </w:p>
+    <w:tbl>
+      <w:tr>
+        <w:tc><w:p><w:r><w:t>Параметр</w:t><w:tab/><w:t>А</w:t></w:r></w:p><w:p><w:r><w:t>Б</w:t></w:r></w:p></w:tc>
+        <w:tc><w:tcPr><w:vMerge w:val="restart"/></w:tcPr><w:p><w:r><w:t>Общая</w:t></w:r></w:p></w:tc>
+      </w:tr>
+      <w:tr>
+        <w:tc><w:p><w:r><w:t>Значение</w:t></w:r></w:p></w:tc>
+        <w:tc><w:tcPr><w:vMerge/></w:tcPr><w:p/></w:tc>
+      </w:tr>
+    </w:tbl>
+    <w:p>
+      <w:r><w:t xml:space="preserve">Текст </w:t><w:br/><w:t>после</w:t><w:br w:type="page"/></w:r>
+      <mc:AlternateContent><mc:Fallback><w:p><w:r><w:t>дубликат</w:t></w:r></w:p></mc:Fallback></mc:AlternateContent>
+    </w:p>
+  </w:body>
+</w:document>
+"""
+
+
+def test_docx_blocks_in_document_order(tmp_path):
+    """Тест: абзацы и ячейки идут в порядке документа, объединённая ячейка - один раз"""
+    path = tmp_path / "doc.docx"
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr("word/document.xml", DOCUMENT_XML)
+
+    blocks = list(iter_docx_blocks(str(path)))
+
+    assert blocks == [
+        DocxBlock("paragraph", "1 Введение", "Heading1"),
+        DocxBlock("cell", "Параметр\tА\nБ"),
+        DocxBlock("cell", "Общая"),
+        DocxBlock("cell", "Значение"),
+        DocxBlock("cell", ""),
+        DocxBlock("paragraph", "Текст \nпосле", page_breaks=((12, False),)),
+    ]
@@ -0,0 +1,79 @@
+import os
+from pathlib import Path
+
+from src.core.parser import Parser
+from src.utils import ExtractionCache
+
+
+def test_cache_put_get_and_stats(tmp_path):
+    """Тест: запись читается обратно, промахи и попадания считаются"""
+    cache = ExtractionCache(str(tmp_path))
+    key = cache.make_key("abc", "txt:builtin:v1")
+
+    assert cache.get(key) is None
+    cache.put(key, "Введение", pages=[{'number': 1, 'position': 0}])
+    entry = cache.get(key)
+
+    assert entry['text'] == "Введение"
+    assert entry['pages'] == [{'number': 1, 'position': 0}]
+    assert cache.stats() == {'hits': 1, 'misses': 1, 'writes': 1, 'evictions': 0}
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    """Тест: при превышении размера удаляются давно использованные записи"""
+    cache = ExtractionCache(str(tmp_path), max_size_mb=1)
+    big_text = "x" * 300 * 1024
+
+    keys = [cache.make_key(str(i), "txt") for i in range(3)]
+    for age, key in enumerate(keys):
+        cache.put(key, big_text)
+        path = cache._path(key)
+        os.utime(path, (1000 + age, 1000 + age))
+
+    # Обращение к первой записи делает её самой свежей
+    assert cache.get(keys[0]) is not None
+    cache.put(cache.make_key("3", "txt"), big_text)
+
+    assert cache.evictions == 1
+    assert cache.get(keys[0]) is not None
+    assert cache.get(keys[1]) is None
+
+
+def test_parser_reuses_cached_text(tmp_path):
+    """Тест: повторный разбор того же содержимого не читает файл заново"""
+    doc = tmp_path / "doc.txt"
+    doc.write_text("Введение\nНазначение\n", encoding="utf-8")
+    cache = ExtractionCache(str(tmp_path / "cache"))
+
+    first = Parser(cache=cache).parse(str(doc))
+    second = Parser(cache=cache).parse(str(doc))
+
+    assert cache.hits == 1 and cache.writes == 1
+    assert second.raw_text == first.raw_text
+    assert second.sections == first.sections
+
+
+def test_unwritable_cache_dir_does_not_fail_validation(tmp_path):
+    """Тест: недоступный каталог кэша - промахи и пропущенные записи, а не ошибка разбора и проверки"""
+    from src.checks import get_all_checks
+    from src.core import Validator
+    from src.utils import ConfigLoader, ResultCache
+
+    doc = tmp_path / "doc.txt"
+    doc.write_text("Введение\nсм. таблица 1", encoding="utf-8")
+    # Каталог кэша внутри обычного файла не создать
+    blocker = tmp_path / "blocker"
+    blocker.write_text("")
+    extraction, results = ExtractionCache(str(blocker / "cache")), ResultCache(str(blocker / "cache"))
+
+    document = Parser(cache=extraction).parse(str(doc))
+    config = ConfigLoader.load_yaml(str(Path(__file__).parent.parent / "config" / "gost_2_105_rules.yaml"))
+    validator = Validator(config, result_cache=results)
+    for check in get_all_checks():
+        validator.register_check(check)
+    assert validator.validate(document)
+
+    assert "Введение" in document.raw_text
+    assert extraction.writes == results.writes == 0
+    assert extraction.write_errors == 1 and results.write_errors > 0
+    assert results._evict() == 0
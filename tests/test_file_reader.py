@@ -0,0 +1,23 @@
+import pytest
+
+from benchmarks.generator import write_pdf
+from src.utils.file_reader import FileReader
+
+
+def test_parallel_pdf_read_matches_serial(tmp_path):
+    """Тест: PDF, прочитанный блоками страниц в пуле процессов, совпадает с последовательным чтением"""
+    pytest.importorskip("pdfplumber")
+    # 11 страниц делятся на блоки 4 + 4 + 3; седьмая страница пустая
+    pages = [[('text', f"Страница {number}"), ('table', [["Графа 1", f"{number}.1"], ["Графа 2", f"{number}.2"]])]
+             if number != 7 else [] for number in range(1, 12)]
+    path = str(tmp_path / "document.pdf")
+    write_pdf(pages, path)
+
+    serial_pages, parallel_pages = [], []
+    serial = FileReader._read_pdf_file(path, workers=1, pages=serial_pages)
+    parallel = FileReader._read_pdf_file(path, workers=3, pages=parallel_pages)
+
+    assert parallel == serial
+    assert parallel_pages == serial_pages
+    assert [page['number'] for page in serial_pages] == [1, 2, 3, 4, 5, 6, 8, 9, 10, 11]
+    assert "Страница 11" in serial
@@ -0,0 +1,66 @@
+from pathlib import Path
+
+from src.checks import get_all_checks
+from src.core import IncrementalValidator, Parser, Validator
+from src.utils import ConfigLoader
+
+
+CONFIG_PATH = Path(__file__).parent.parent / "config" / "gost_2_105_rules.yaml"
+
+TEXT = (
+    "1. Введение\n"
+    "Данные приведены в таблица 1.1, расчёт по формуле (1).\n"
+    "Таблица 1.1: Параметры\n"
+    "x = y + 1 (1)\n"
+    "2. Назначение\n"
+    "Изделие предназначено для работы в составе комплекса.\n"
+    "Обычный абзац текста.\n"
+    "Конструкция изделия обеспечивает удобство обслуживания.\n"
+    "Рисунок 2.1 — Общий вид\n"
+    "3. Технические характеристики\n"
+    "Сведения приведены в приложении А.\n"
+    "ПРИЛОЖЕНИЕ А\n"
+)
+
+
+def _validator():
+    validator = Validator(ConfigLoader.load_yaml(str(CONFIG_PATH)))
+    for check in get_all_checks():
+        validator.register_check(check)
+    return validator
+
+
+def test_incremental_matches_full_run():
+    """Тест: после каждой правки документ и результаты совпадают с полной проверкой"""
+    session = IncrementalValidator(_validator())
+    full = _validator()
+    edits = [
+        TEXT,
+        TEXT.replace("Обычный абзац текста.", "Обычный абзац, изменённый."),
+        TEXT.replace("Таблица 1.1: Параметры\n", "Таблица 1.1\n\n"),
+        TEXT.replace("2. Назначение\n", "2. Назначение\nНовая строка\n\n"),
+        TEXT.replace("Рисунок 2.1 — Общий вид", "Рисунок"),
+        TEXT.replace("x = y + 1 (1)\n", ""),
+        # Номер подписи через строку от слова, наименование ищется через пустые строки
+        TEXT + "см. таблица 1.2\nТаблица\n1.2\n\nX\n",
+        TEXT + "см. таблица 1.2\nТаблица\n1.2\n\n\n",
+        TEXT + "Рисунок\n3\n\n\nY\n",
+        TEXT + "Рисунок\n3\n\n\n\n",
+    ]
+
+    for text in edits:
+        document, results = session.revalidate(text)
+        expected = Parser().parse_text(text)
+        assert document == expected
+        assert results == full.validate(expected)
+
+
+def test_paragraph_edit_reruns_only_affected_checks():
+    """Тест: правка обычного абзаца не перезапускает проверки текста"""
+    session = IncrementalValidator(_validator())
+    session.revalidate(TEXT)
+
+    document, _ = session.revalidate(TEXT.replace("Обычный абзац текста.", "Другой абзац текста."))
+
+    rerun = [stage for stage in document.timings if stage.startswith("check.")]
+    assert rerun == ["check.required_format"]
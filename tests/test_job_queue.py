@@ -0,0 +1,111 @@
+import json
+import time
+from pathlib import Path
+
+from src.core import JobQueue
+from src.core.batch import BatchRunner
+from src.utils import ConfigLoader
+
+CONFIG_PATH = Path(__file__).parent.parent / "config" / "gost_2_105_rules.yaml"
+
+
+def test_lease_retry_and_expired_lease(tmp_path):
+    """Тест: неудачная попытка повторяется до предела, задание упавшего исполнителя выдаётся снова"""
+    queue = JobQueue(str(tmp_path / "jobs.sqlite"), lease_sec=0.05, max_attempts=2)
+    assert queue.add(["a.txt", "b.txt"], ["a.json", "b.json"]) == 2
+    assert queue.add(["a.txt"], ["other.json"]) == 0
+
+    job = queue.lease("w1")
+    assert (job.document, job.attempts) == ("a.txt", 1)
+    queue.fail(job, "w1", {"document": "a.txt", "error": "сбой"})
+    job = queue.lease("w1")
+    assert (job.document, job.attempts) == ("a.txt", 2)
+    queue.fail(job, "w1", {"document": "a.txt", "error": "сбой"})
+    assert queue.counts()["failed"] == 1
+
+    # w2 "упал" с заданием b: после истечения аренды его получает w3, запись w2 отбрасывается
+    crashed = queue.lease("w2")
+    assert queue.lease("w3") is None
+    time.sleep(0.1)
+    job = queue.lease("w3")
+    assert (job.document, job.attempts) == ("b.txt", 2)
+    assert not queue.complete(crashed, "w2", {"document": "b.txt"})
+    assert queue.complete(job, "w3", {"document": "b.txt"})
+    assert queue.entries() == [{"document": "a.txt", "error": "сбой"}, {"document": "b.txt"}]
+    assert queue.unfinished() == 0
+
+    assert queue.retry_failed() == 1
+    job = queue.lease("host:run:1")
+    assert job.attempts == 1
+
+    # Пул упал: аренда снимается сразу, попытка не засчитывается
+    assert queue.expire("host:run:", refund=True) == [job.id]
+    assert queue.lease("w5", [job.id]).attempts == 1
+    assert queue.lease("w5", [job.id]) is None and queue.unfinished([job.id]) == 1
+
+
+def test_batch_resumes_without_touching_done_reports(tmp_path):
+    """Тест: повторный запуск с очередью проверяет только новые документы, готовые отчёты не меняются"""
+    first, second = tmp_path / "first.txt", tmp_path / "second.txt"
+    first.write_text("Введение\nТаблица 1", encoding="utf-8")
+    second.write_text("Назначение", encoding="utf-8")
+    config = ConfigLoader.load_rules(str(CONFIG_PATH))
+    output_dir = tmp_path / "reports"
+
+    def runner():
+        return BatchRunner(config, output_dir=str(output_dir), workers=1, queue=str(tmp_path / "jobs.sqlite"))
+
+    runner().run([str(first)])
+    report = output_dir / "first.json"
+    content, mtime = report.read_bytes(), report.stat().st_mtime_ns
+
+    summary = runner().run([str(first), str(second)])
+    assert report.read_bytes() == content and report.stat().st_mtime_ns == mtime
+    assert summary["summary"]["validated"] == 2
+    assert [entry["document"] for entry in summary["documents"]] == [str(first), str(second)]
+    assert json.loads((output_dir / "summary.json").read_text(encoding="utf-8"))["summary"]["total_documents"] == 2
+
+    # Без документов - выполняются задания, уже стоящие в очереди
+    assert runner().run([])["summary"]["validated"] == 2
+
+
+def test_heartbeat_stops_after_max_job_sec(tmp_path):
+    """Тест: зависший исполнитель не продлевает аренду дольше max_job_sec, задание получает другой"""
+    queue = JobQueue(str(tmp_path / "jobs.sqlite"), lease_sec=0.1, max_attempts=2, max_job_sec=0.2)
+    queue.add(["hung.txt"], ["hung.json"])
+    job = queue.lease("w1")
+    timed_out = []
+    with queue.heartbeat(job, "w1", on_timeout=lambda: timed_out.append(job.id)):
+        time.sleep(0.15)
+        assert queue.lease("w2") is None
+        time.sleep(0.3)
+        job2 = queue.lease("w2")
+    assert timed_out == [job.id]
+    assert (job2.document, job2.attempts) == ("hung.txt", 2)
+    assert not queue.complete(job, "w1", {"document": "hung.txt"})
+
+
+def test_batch_fails_hung_document(tmp_path, monkeypatch):
+    """Тест: зависший на документе исполнитель завершается, документ исчерпывает попытки, пакет завершается"""
+    from src.core import batch
+
+    hung, ok = tmp_path / "hung.txt", tmp_path / "ok.txt"
+    hung.write_text("Введение", encoding="utf-8")
+    ok.write_text("Введение", encoding="utf-8")
+    validate_one = batch._validate_one
+
+    def hanging(document_path, *args):
+        if document_path == str(hung):
+            time.sleep(60)
+        return validate_one(document_path, *args)
+
+    monkeypatch.setattr(batch, "_validate_one", hanging)
+    config = ConfigLoader.load_rules(str(CONFIG_PATH))
+    runner = BatchRunner(config, output_dir=str(tmp_path / "reports"), workers=1,
+                         queue=str(tmp_path / "jobs.sqlite"), max_attempts=2, lease_sec=0.3, max_job_sec=0.5)
+    started = time.monotonic()
+    summary = runner.run([str(hung), str(ok)])
+    assert time.monotonic() - started < 30
+    assert runner.queue.counts() == {"pending": 0, "running": 0, "done": 1, "failed": 1}
+    assert summary["summary"]["validated"] == 1
+    assert "2 попыток" in summary["documents"][0]["error"]
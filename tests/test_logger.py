@@ -0,0 +1,33 @@
+import io
+import logging
+
+from src.utils.logger import get_logger, parse_module_levels, setup_logging
+
+
+class CountingArg:
+    """Аргумент сообщения, считающий форматирования"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __str__(self):
+        self.calls += 1
+        return "arg"
+
+
+def test_module_levels_and_lazy_formatting():
+    """Тест: уровень модуля переопределяет общий, выключенные сообщения не форматируются"""
+    stream = io.StringIO()
+    try:
+        setup_logging('WARNING', parse_module_levels(['checks.appendices=debug']), stream=stream)
+        quiet, verbose = get_logger('core.parser'), get_logger('checks.appendices')
+        arg = CountingArg()
+
+        quiet.info("скрыто %s", arg)
+        verbose.debug("видно %s", arg)
+
+        assert arg.calls == 1
+        assert stream.getvalue() == "видно arg\n"
+    finally:
+        setup_logging('WARNING', stream=io.StringIO())
+        logging.getLogger('gost').handlers.clear()
@@ -0,0 +1,64 @@
+from src.checks.appendix_checker import AppendixCheck
+from src.models import Document, PageMap
+from src.utils import RuleSet
+from src.utils.file_reader import FileReader
+
+
+def _make_docx(path):
+    """DOCX с жёсткими разрывами и сохранёнными Word разрывами страниц"""
+    from docx import Document as DocxDocument
+    from docx.enum.text import WD_BREAK
+    from docx.oxml import OxmlElement
+
+    def rendered_break(run):
+        run._r.insert(0, OxmlElement('w:lastRenderedPageBreak'))
+
+    doc = DocxDocument()
+    doc.add_paragraph("Титульный лист").runs[0].add_break(WD_BREAK.PAGE)
+    rendered_break(doc.add_paragraph("Содержание").runs[0])
+    doc.add_paragraph().add_run().add_break(WD_BREAK.PAGE)
+    doc.add_paragraph("1 Введение")
+    paragraph = doc.add_paragraph("Текст")
+    paragraph.runs[0].add_break()
+    paragraph.runs[0].add_text("продолжение")
+    rendered_break(paragraph.add_run(" конец"))
+    doc.save(path)
+
+
+def test_page_map_lookup():
+    """Тест: страница по смещению находится по началам страниц"""
+    page_map = PageMap.from_pages([{'number': 2, 'position': 10}, {'number': 1, 'position': 0},
+                                   {'number': 3, 'position': 25}])
+
+    assert [page_map.page_at(offset) for offset in (0, 9, 10, 24, 25, 1000)] == [1, 1, 2, 2, 3, 3]
+    assert PageMap().page_at(5) is None
+
+
+def test_docx_page_breaks(tmp_path):
+    """Тест: разрывы w:br и lastRenderedPageBreak дают одинаковые страницы в обоих бэкендах"""
+    path = tmp_path / "doc.docx"
+    _make_docx(str(path))
+
+    for backend in ("xml", "python-docx"):
+        pages = []
+        text, _ = FileReader(docx_backend=backend).read_file(str(path), pages)
+        document = Document(file_path=str(path), raw_text=text, pages=pages)
+
+        # Повтор разрыва после w:br не считается, разрыв в пустом абзаце - считается
+        assert [document.page_at(text.index(word)) for word in ("Титульный", "Содержание", "Введение",
+                                                                "продолжение", "конец")] == [1, 2, 3, 3, 4]
+
+
+def test_appendix_errors_use_page_map():
+    """Тест: страница ошибки приложения берётся из разбивки документа"""
+    text = "Введение\nТекст\nприложение 1\nТекст"
+    document = Document(file_path="test.txt", raw_text=text,
+                        pages=[{'number': 1, 'position': 0}, {'number': 7, 'position': text.index("приложение")}])
+
+    check = AppendixCheck()
+    check.set_rules(RuleSet.from_config({}))
+
+    errors = check.run(document).errors
+    assert errors and all(error.page == 7 for error in errors)
+    # Без разбивки (текстовый файл) страница неизвестна
+    assert all(error.page is None for error in check.run(Document(file_path="test.txt", raw_text=text)).errors)
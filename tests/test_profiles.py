@@ -0,0 +1,61 @@
+import json
+from pathlib import Path
+
+from src.checks import get_enabled_checks
+from src.core import Parser, ProfileSet, Validator
+from src.core.batch import BatchRunner
+from src.core.profiles import profile_names
+from src.utils import ConfigLoader
+
+CONFIG_PATH = Path(__file__).parent.parent / "config" / "gost_2_105_rules.yaml"
+
+TEXT = "Введение\nТаблица 1.1.\nНазначение\nрисунок 2\nТехнические характеристики\n(1)"
+
+
+def _profiles(tmp_path):
+    """Строгий профиль и профиль заказчика, отличающийся только правилами таблиц"""
+    customer = tmp_path / "customer.yaml"
+    customer.write_text(CONFIG_PATH.read_text(encoding="utf-8").replace("require_caption: true",
+                                                                        "require_caption: false"),
+                        encoding="utf-8")
+    paths = [str(CONFIG_PATH), str(customer)]
+    return {name: ConfigLoader.load_rules(path) for name, path in zip(profile_names(paths), paths)}
+
+
+def test_identical_checks_run_once(tmp_path):
+    """Тест: проверки с одинаковыми правилами выполняются один раз, результаты - как у отдельных запусков"""
+    profiles = _profiles(tmp_path)
+    document = Parser().parse_text(TEXT)
+    results = ProfileSet(profiles).validate(document)
+
+    assert list(results) == ["gost_2_105_rules", "customer"]
+    strict, customer = results.values()
+    for first, second in zip(strict, customer):
+        assert (first is second) == (first.check_id != "table_format")
+    assert strict[3].errors != customer[3].errors
+
+    for name, config in profiles.items():
+        validator = Validator(config)
+        for check in get_enabled_checks(config):
+            validator.register_check(check)
+        assert results[name] == validator.validate(document)
+
+    assert profile_names(["a/rules.yaml", "b/rules.yaml", "c.yml"]) == ["rules", "rules_2", "c"]
+
+
+def test_batch_writes_report_per_profile(tmp_path):
+    """Тест: пакетная проверка несколькими профилями - отчёт каждого профиля в своём каталоге"""
+    document = tmp_path / "doc.txt"
+    document.write_text(TEXT, encoding="utf-8")
+    profiles = _profiles(tmp_path)
+
+    runner = BatchRunner(next(iter(profiles.values())), output_dir=str(tmp_path / "reports"), workers=1,
+                         profiles=profiles)
+    summary = runner.run([str(document)])
+
+    assert summary["summary"]["validated"] == 1
+    assert set(summary["profiles"]) == set(profiles)
+    for name in profiles:
+        report = json.loads((tmp_path / "reports" / name / "doc.json").read_text(encoding="utf-8"))
+        assert report["profile"] == name
+        assert summary["documents"][0]["profiles"][name]["summary"] == report["summary"]
@@ -0,0 +1,44 @@
+import tracemalloc
+from pathlib import Path
+
+from src.checks import get_all_checks
+from src.core import Parser, Validator, Reporter
+from src.utils import ConfigLoader
+from src.utils.profiling import Profiler
+
+
+CONFIG_PATH = Path(__file__).parent.parent / "config" / "gost_2_105_rules.yaml"
+
+
+def test_report_contains_stage_timings(tmp_path):
+    """Тест: в отчёте есть замеры чтения, разбора и каждой проверки"""
+    document_path = tmp_path / "doc.txt"
+    document_path.write_text("1. Введение\nТаблица 1: Данные\n", encoding="utf-8")
+
+    validator = Validator(ConfigLoader.load_yaml(str(CONFIG_PATH)))
+    for check in get_all_checks():
+        validator.register_check(check)
+    document = Parser().parse(str(document_path))
+    report = Reporter.generate_report(document=document, results=validator.validate(document))
+
+    timings = report["timings"]
+    assert {"file_reader._read_text_file", "parser.parse"} <= set(timings)
+    assert {f"check.{c['id']}" for c in report["checks"]} <= set(timings)
+    assert timings["parser.parse"]["wall_sec"] >= timings["file_reader._read_text_file"]["wall_sec"]
+    assert timings["parser.parse"]["peak_alloc_kb"] is None  # tracemalloc выключен
+
+
+def test_nested_peak_memory():
+    """Тест: пик вложенного этапа учитывается во внешнем"""
+    profiler = Profiler()
+    tracemalloc.start()
+    try:
+        with profiler.measure("outer"):
+            with profiler.measure("inner"):
+                block = bytearray(2 * 1024 * 1024)
+                del block
+    finally:
+        tracemalloc.stop()
+
+    assert profiler.timings["inner"]["peak_alloc_kb"] >= 2048
+    assert profiler.timings["outer"]["peak_alloc_kb"] >= 2048
@@ -0,0 +1,37 @@
+from src.models import Document
+
+
+def test_reference_index_lookups():
+    """Тест: ссылки на таблицы, формулы и приложения находятся через индекс"""
+    text = (
+        "Данные приведены в таблица 12.3, расчёт по формуле (2.1).\n"
+        "Таблица 12.3: Параметры\n"
+        "x = y + 1 (2.1)\n"
+        "Значение (3,4) и ((5))\n"
+        "Подробнее см. прил. аб\n"
+        "ПРИЛОЖЕНИЕ АБ\n"
+    )
+    references = Document("doc.txt", raw_text=text).get_references()
+
+    # Номер ссылки подходит и для его префиксов: "таблица 12.3" -> "таблица 1", "таблица 12"
+    assert references.mentions('table', references.table_key("Таблица 12.3")) == [17]
+    assert references.mentions('table', references.table_key("Таблица 1"))
+    assert not references.mentions('table', references.table_key("Таблица 3"))
+
+    assert references.mentions('formula', references.formula_key("2.1")) == [43]
+    assert references.mentions('formula', references.formula_key("5"))
+    assert len(references.mentions('number', references.formula_key("2.1"))) == 2
+    assert references.mentions('number', references.formula_key("3.4"))
+
+    assert references.mentions('appendix', "аб")
+    assert references.mentions('appendix', "а")
+    assert not references.mentions('appendix', "б")
+    assert references.has_word("аб")
+
+
+def test_appendix_reference_does_not_swallow_next_phrase():
+    """Тест: обозначение ссылки не поглощает начало следующей ссылки на приложение"""
+    references = Document("doc.txt", raw_text="см. прил. прил. а\n").get_references()
+
+    assert references.mentions('appendix', "а") == [10]
+    assert references.mentions('appendix', "прил") == [4]
@@ -0,0 +1,74 @@
+import shutil
+from pathlib import Path
+
+from src.checks import get_all_checks
+from src.core import scanner
+from src.core import Parser, Validator
+from src.utils import ConfigLoader, ResultCache
+from src.utils import result_cache
+
+CONFIG_PATH = Path(__file__).parent.parent / "config" / "gost_2_105_rules.yaml"
+
+TEXT = ("Введение\nТаблица 1.1.\nсм. таблица 2\n1.1.1.1 Глубокий раздел\nx = y (1)\n[2] формула\n"
+        "ПРИЛОЖЕНИЕ А\nПриложение б\nсм. прил. В")
+
+
+def _validator(config, cache):
+    validator = Validator(config, result_cache=cache)
+    for check in get_all_checks():
+        validator.register_check(check)
+    return validator
+
+
+def test_only_checks_with_changed_inputs_rerun(tmp_path):
+    """Тест: повторная проверка берёт результаты из кэша, правка раздела appendices перезапускает одну проверку"""
+    config = ConfigLoader.load_yaml(str(CONFIG_PATH))
+    cache = ResultCache(str(tmp_path))
+    cacheable = sum(check.cacheable for check in get_all_checks())
+
+    expected = _validator(config, None).validate(Parser().parse_text(TEXT))
+    assert any(result.errors for result in expected)
+    assert _validator(config, cache).validate(Parser().parse_text(TEXT)) == expected
+    assert (cache.hits, cache.writes) == (0, cacheable)
+
+    document = Parser().parse_text(TEXT)
+    assert _validator(config, cache).validate(document) == expected
+    assert cache.hits == cacheable
+    assert not any(stage.startswith("check.appendices") for stage in document.timings)
+
+    config["gost_2_105"]["appendices"]["pattern"] = "^ПРИЛОЖЕНИЕ\\s+[А-Я]"
+    document = Parser().parse_text(TEXT)
+    results = _validator(config, cache).validate(document)
+    assert results == _validator(config, None).validate(Parser().parse_text(TEXT))
+    assert cache.hits == 2 * cacheable - 1
+    assert [stage for stage in document.timings if stage.startswith("check.")] == \
+           ["check.appendices", "check.required_format"]
+
+    # Другой текст - другой ключ
+    _validator(config, cache).validate(Parser().parse_text(TEXT + "\nТаблица 3"))
+    assert cache.hits == 2 * cacheable - 1
+
+
+def test_dependency_source_change_invalidates_cache(tmp_path, monkeypatch):
+    """Тест: правка модуля, который импортирует проверка (сканер заголовков), перезапускает её"""
+    config = ConfigLoader.load_yaml(str(CONFIG_PATH))
+    cache = ResultCache(str(tmp_path / "cache"))
+    source = tmp_path / "scanner.py"
+    shutil.copy(scanner.__file__, source)
+    monkeypatch.setattr(scanner, "__file__", str(source))
+
+    def validate():
+        # Хэши исходников считаются один раз на процесс: новый запуск - пустые кэши функций
+        result_cache._source_digest.cache_clear()
+        result_cache._dependencies.cache_clear()
+        document = Parser().parse_text(TEXT)
+        _validator(config, cache).validate(document)
+        return [stage for stage in document.timings if stage.startswith("check.")]
+
+    validate()
+    assert validate() == ["check.required_format"]
+    source.write_text(source.read_text(encoding="utf-8") + "\n# правка\n", encoding="utf-8")
+    assert validate() == ["check.section_numbering", "check.required_format"]
+    monkeypatch.undo()
+    result_cache._source_digest.cache_clear()
+    result_cache._dependencies.cache_clear()
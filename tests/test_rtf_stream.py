@@ -0,0 +1,37 @@
+from src.utils.rtf_stream import iter_rtf_text
+
+
+def _hex(text: str) -> str:
+    return ''.join("\\'%02x" % b for b in text.encode('cp1251'))
+
+
+def test_rtf_stream_decodes_codepage_and_skips_groups(tmp_path):
+    """Кириллица в \\'hh по \\ansicpg, \\uN с заменой, картинки и таблица шрифтов пропускаются"""
+    picture = "{\\pict\\pngblip " + ("89504e47" * 16 + "\n") * 200 + "}"
+    rtf = (
+        "{\\rtf1\\ansi\\ansicpg1251\\deff0{\\fonttbl{\\f0 Times New Roman;}}"
+        "{\\*\\generator Writer;}{\\info{\\title Title}}\\pard "
+        + _hex("Введение. Таблица 1.1: данные") + "\\par " + picture
+        + "{\\object{\\objdata 0102}}\\u1046?\\u1041?\\tab {\\pict\\bin4 {}\\}}end\\par}"
+    )
+    path = tmp_path / "doc.rtf"
+    path.write_text(rtf, encoding='ascii')
+
+    # Маленький блок чтения: границы блоков попадают внутрь слов и групп
+    chunks = list(iter_rtf_text(str(path), chunk_size=37))
+
+    assert len(chunks) > 1
+    assert ''.join(chunks) == "Введение. Таблица 1.1: данные\nЖБ\tend\n"
+
+
+def test_rtf_stream_chunk_boundaries(tmp_path):
+    """Тест: границы блоков не разрезают \\\\, \\'hh и управляющие слова - текст как при чтении целиком"""
+    rtf = ("{\\rtf1\\ansi\\ansicpg1251 aaaaaaaaaa\\\\bbbbbbbbbb\\\\\\\\c\\\\\\par "
+           + _hex("Таблица") + "\\\\" + _hex("я") + "\\tab x\\\\\\{y\\}\\u1046?\\\\}")
+    path = tmp_path / "doc.rtf"
+    path.write_text(rtf, encoding='ascii')
+
+    expected = ''.join(iter_rtf_text(str(path)))
+    assert expected == "aaaaaaaaaa\\bbbbbbbbbb\\\\c\\\nТаблица\\я\tx\\{y}Ж\\"
+    for chunk_size in range(1, len(rtf) + 2):
+        assert ''.join(iter_rtf_text(str(path), chunk_size=chunk_size)) == expected, chunk_size
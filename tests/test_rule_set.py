@@ -0,0 +1,66 @@
+import os
+import pickle
+from pathlib import Path
+
+import pytest
+
+from src.checks import get_all_checks
+from src.core import Validator
+from src.utils import ConfigError, ConfigLoader, RuleSet
+
+
+CONFIG_PATH = Path(__file__).parent.parent / "config" / "gost_2_105_rules.yaml"
+
+
+def test_invalid_pattern_is_reported_at_load(tmp_path):
+    """Тест: ошибка в регулярном выражении обнаруживается при загрузке, с путём к ключу"""
+    path = tmp_path / "rules.yaml"
+    path.write_text('gost_2_105:\n  formulas:\n    numbering_pattern: "^\\\\((\\\\d+$"\n', encoding="utf-8")
+
+    with pytest.raises(ConfigError) as error:
+        ConfigLoader.load_rules(str(path))
+    assert error.value.path == "gost_2_105.formulas.numbering_pattern"
+
+
+def test_defaults_are_merged_into_partial_config():
+    """Тест: отсутствующие в конфиге правила берутся из значений по умолчанию"""
+    rules = RuleSet.from_config({"gost_2_105": {"required_sections": ["Введение"]}})
+
+    assert rules.required_sections == ("Введение",)
+    assert rules.section_numbering.pattern.match("1 Общие положения")
+    assert rules.system.max_file_size_mb == 50
+    assert rules.enabled_checks is None
+
+
+def test_rules_are_cached_until_file_changes(tmp_path):
+    """Тест: неизменённый файл не компилируется повторно, изменённый - компилируется"""
+    path = tmp_path / "rules.yaml"
+    path.write_text(CONFIG_PATH.read_text(encoding="utf-8"), encoding="utf-8")
+
+    rules = ConfigLoader.load_rules(str(path))
+    assert ConfigLoader.load_rules(str(path)) is rules
+
+    # Перезапись тем же содержимым: другое время изменения, тот же хеш
+    stat = path.stat()
+    path.write_bytes(path.read_bytes())
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert ConfigLoader.load_rules(str(path)) is rules
+
+    path.write_text(path.read_text(encoding="utf-8").replace("max_level: 3", "max_level: 4"), encoding="utf-8")
+    changed = ConfigLoader.load_rules(str(path))
+    assert changed is not rules
+    assert changed.section_numbering.max_level == 4
+    assert changed.fingerprint != rules.fingerprint
+
+
+def test_checks_share_compiled_rules():
+    """Тест: проверки получают общий RuleSet, который переживает передачу в процесс"""
+    rules = ConfigLoader.load_rules(str(CONFIG_PATH))
+    validator = Validator(rules)
+    for check in get_all_checks():
+        validator.register_check(check)
+
+    assert all(check.rules is rules for check in validator.checks)
+    restored = pickle.loads(pickle.dumps(rules))
+    assert restored.fingerprint == rules.fingerprint
+    assert restored.tables == rules.tables
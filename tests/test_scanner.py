@@ -0,0 +1,57 @@
+from src.core.parser import Parser
+from src.core.scanner import StructureScanner, StreamingStructureScanner
+from src.models import DocumentIndex, Page
+
+
+def _events(text):
+    return [(e.kind, e.start) for e in StructureScanner().scan(DocumentIndex.build(text))]
+
+
+def test_scanner_finds_all_families_in_order():
+    """Тест: все семейства находятся за один проход в порядке смещений"""
+    text = ("ВВЕДЕНИЕ\n"
+            "  1.1. Назначение изделия  \n"
+            "Таблица 1.1: Параметры, см. формулу (2)\n"
+            "ПРИЛОЖЕНИЕ А\n"
+            "рисунок 3 Схема")
+
+    assert _events(text) == [
+        ('heading', 0),
+        ('heading', 9),
+        ('table', 37),
+        ('formula', 73),
+        ('appendix', 77),
+        ('figure', 90),
+    ]
+
+
+def test_scanner_heading_data_matches_stripped_line():
+    """Тест: название и текст заголовка берутся из строки без краевых пробелов"""
+    index = DocumentIndex.build("x\n\tГлава 2.  Описание \r\n")
+
+    heading = next(StructureScanner().scan(index))
+
+    assert heading.data == {
+        'title': 'Глава 2. Описание',
+        'level': 2,
+        'line_number': 1,
+        'original_text': 'Глава 2.  Описание'
+    }
+
+
+def test_streaming_scanner_matches_full_text():
+    """Тест: постраничное сканирование даёт ту же структуру, что и весь текст"""
+    pages = [
+        "--- Страница 1 ---\nВВЕДЕНИЕ\nСм. таблица 1",
+        "--- Страница 2 ---\n1. Назначение изделия (1)\nТаблица 2: Размеры",
+        "--- Таблица на странице 2 ---\nрисунок 4 Схема\nПРИЛОЖЕНИЕ А",
+    ]
+    full = Parser._extract_structure(DocumentIndex.build("\n".join(pages)))
+
+    stream = StreamingStructureScanner()
+    for number, text in enumerate(pages, start=1):
+        stream.feed(Page(number=number, text=text))
+
+    assert stream.finish() == full
+    assert full['table'][0]['caption'] == "--- Страница 2 ---"  # подпись на стыке страниц
+    assert [page['position'] for page in stream.pages] == [0, 42, 106]
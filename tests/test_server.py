@@ -0,0 +1,136 @@
+import asyncio
+import json
+import time
+from pathlib import Path
+
+from src.checks import get_all_checks
+from src.core import Parser, Reporter, Validator, server as server_module
+from src.core.server import ValidationServer
+from src.utils import ConfigLoader
+
+
+CONFIG_PATH = Path(__file__).parent.parent / "config" / "gost_2_105_rules.yaml"
+TEXT = "1. Введение\nТаблица 1.1: Данные\nПо формуле (1)\nx = y (1)\n"
+
+
+async def _request(address, method, target, body=b""):
+    reader, writer = await asyncio.open_connection(*address)
+    writer.write(f"{method} {target} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {len(body)}\r\n\r\n"
+                 .encode("latin-1") + body)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+
+    head, _, payload = response.partition(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    headers = dict(line.split(": ", 1) for line in lines[1:])
+    return int(lines[0].split()[1]), headers, json.loads(payload)
+
+
+def _without_volatile(report):
+    return {key: value for key, value in report.items() if key not in ("validation_date", "timings")}
+
+
+def _expected_report(path):
+    config = ConfigLoader.load_yaml(str(CONFIG_PATH))
+    validator = Validator(config)
+    for check in get_all_checks():
+        validator.register_check(check)
+    document = Parser().parse(str(path))
+    return Reporter.generate_report(document=document, results=validator.validate(document))
+
+
+def test_server_returns_reporter_json(tmp_path):
+    """Тест: отчёт сервиса совпадает с Reporter.generate_report, метрики считают запросы"""
+    path = tmp_path / "doc.txt"
+    path.write_text(TEXT, encoding="utf-8")
+    expected = _without_volatile(_expected_report(path))
+
+    async def scenario():
+        server = ValidationServer(ConfigLoader.load_yaml(str(CONFIG_PATH)), workers=1)
+        await server.start(port=0)
+        try:
+            status, _, health = await _request(server.address, "GET", "/health")
+            assert (status, health["status"]) == (200, "ok")
+
+            status, _, report = await _request(server.address, "POST", f"/validate?path={path}")
+            assert status == 200
+            assert _without_volatile(report) == expected
+
+            status, _, report = await _request(server.address, "POST", "/validate?filename=doc.txt",
+                                               TEXT.encode("utf-8"))
+            assert status == 200
+            assert _without_volatile(report) == dict(expected, document="doc.txt")
+
+            status, _, _ = await _request(server.address, "POST", "/validate?path=missing.txt")
+            assert status == 404
+
+            _, _, metrics = await _request(server.address, "GET", "/metrics")
+            assert metrics["requests"] == {"total": 3, "ok": 2, "rejected": 0, "failed": 1}
+        finally:
+            await server.close()
+
+    asyncio.run(scenario())
+
+
+def test_server_rejects_when_queue_is_full(tmp_path, monkeypatch):
+    """Тест: при занятом исполнителе и пустой очереди запрос получает 503"""
+    path = tmp_path / "doc.txt"
+    path.write_text(TEXT, encoding="utf-8")
+    serve_document = server_module._serve_document
+
+    def slow_serve_document(*args):
+        time.sleep(0.5)
+        return serve_document(*args)
+
+    monkeypatch.setattr(server_module, "_serve_document", slow_serve_document)
+
+    async def scenario():
+        server = ValidationServer(ConfigLoader.load_yaml(str(CONFIG_PATH)), workers=1, max_queue=0)
+        await server.start(port=0)
+        try:
+            first = asyncio.create_task(_request(server.address, "POST", f"/validate?path={path}"))
+            await asyncio.sleep(0.1)
+            status, headers, _ = await _request(server.address, "POST", f"/validate?path={path}")
+            assert status == 503
+            assert headers["Retry-After"] == "1"
+            assert (await first)[0] == 200
+        finally:
+            await server.close()
+
+    asyncio.run(scenario())
+
+
+def test_timed_out_request_keeps_slot_and_upload(tmp_path, monkeypatch):
+    """Тест: после 504 исполнитель дорабатывает документ, слот и загрузка заняты до его окончания"""
+    serve_document = server_module._serve_document
+    seen = []
+
+    def slow_serve_document(document_path, *args):
+        time.sleep(0.6)
+        seen.append(Path(document_path).exists())
+        return serve_document(document_path, *args)
+
+    monkeypatch.setattr(server_module, "_serve_document", slow_serve_document)
+
+    async def scenario():
+        server = ValidationServer(ConfigLoader.load_yaml(str(CONFIG_PATH)), workers=1, max_queue=0,
+                                  request_timeout=0.2)
+        await server.start(port=0)
+        try:
+            status, _, _ = await _request(server.address, "POST", "/validate?filename=doc.txt",
+                                          TEXT.encode("utf-8"))
+            assert status == 504
+            assert server.metrics()["in_flight"] == 1
+            status, _, _ = await _request(server.address, "POST", "/validate?filename=doc.txt",
+                                          TEXT.encode("utf-8"))
+            assert status == 503
+
+            await asyncio.sleep(0.6)
+            assert seen == [True]
+            assert server.metrics()["in_flight"] == 0
+            assert not any(Path(server._upload_dir).iterdir())
+        finally:
+            await server.close()
+
+    asyncio.run(scenario())
@@ -0,0 +1,60 @@
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+
+ROOT = Path(__file__).parent.parent
+
+# Модули, которые не нужны для --help
+HEAVY_MODULES = ("yaml", "docx", "pdfplumber", "asyncio", "multiprocessing",
+                 "src.checks.", "src.core.validator", "src.core.server")
+
+# Свой импорт всех модулей при --help, микросекунды (с большим запасом)
+HELP_IMPORT_BUDGET_US = 150_000
+
+
+def _imported_modules(*args):
+    """Имена модулей, загруженных за время запуска python -m src.main с аргументами"""
+    code = (
+        "import runpy, sys\n"
+        f"sys.argv = ['src.main', *{list(args)!r}]\n"
+        "try:\n"
+        "    runpy.run_module('src.main', run_name='__main__')\n"
+        "except SystemExit:\n"
+        "    pass\n"
+        "print('\\n'.join(sys.modules), file=sys.stderr)\n"
+    )
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True)
+    return set(result.stderr.split())
+
+
+def _loaded(modules, prefix):
+    return [name for name in modules if name == prefix or name.startswith(prefix)]
+
+
+def test_help_does_not_import_heavy_modules():
+    """Тест: --help не загружает YAML, ридеры, проверки и asyncio"""
+    modules = _imported_modules("--help")
+    for prefix in HEAVY_MODULES:
+        assert not _loaded(modules, prefix), prefix
+
+    result = subprocess.run([sys.executable, "-X", "importtime", "-m", "src.main", "--help"],
+                            cwd=ROOT, capture_output=True, text=True)
+    assert result.returncode == 0
+    self_times = [int(m.group(1)) for m in re.finditer(r"import time:\s+(\d+) \|", result.stderr)]
+    assert sum(self_times) < HELP_IMPORT_BUDGET_US
+
+
+def test_only_enabled_checks_are_imported(tmp_path):
+    """Тест: загружаются модули только включённых в конфиге проверок"""
+    document = tmp_path / "doc.txt"
+    document.write_text("1. Введение\nТекст\n", encoding="utf-8")
+    config = tmp_path / "rules.yaml"
+    config.write_text("check_settings:\n  enabled_checks:\n    - required_sections\n", encoding="utf-8")
+
+    modules = _imported_modules(str(document), "--config", str(config), "--output", str(tmp_path / "r.json"))
+
+    assert sorted(_loaded(modules, "src.checks.")) == ["src.checks.base_checker", "src.checks.section_checker"]
+    for prefix in ("docx", "pdfplumber", "asyncio", "multiprocessing"):
+        assert not _loaded(modules, prefix), prefix
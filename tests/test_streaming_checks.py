@@ -0,0 +1,89 @@
+import re
+from pathlib import Path
+
+from src.checks import get_all_checks
+from src.checks.base_checker import TextWindow
+from src.core import Parser, Validator
+from src.models import Document, TextChunk
+from src.utils import ConfigLoader
+
+CONFIG_PATH = Path(__file__).parent.parent / "config" / "gost_2_105_rules.yaml"
+
+# Упоминания, ссылки и "— 5 —" разорваны переводами строк, чтобы попасть на границы блоков
+TEXT = (
+    "Введение\nСм.\nтаблица\n1.1 и рисунок 2\n\n"
+    "Таблица 1.1: Параметры\nТаблица 2\n"
+    "1 Назначение\n1.1.1.1 Глубокий раздел\n"
+    "x = y + 1 (1)\nпо формуле\n(1)\n[2] формула\n{3} уравнение\n"
+    "на странице 1\n—\n5\n—\nстр. 7\n"
+    "Технические характеристики\n"
+    "ПРИЛОЖЕНИЕ А\nПриложение б\nсм. прил.\nа"
+)
+
+
+def _validator():
+    validator = Validator(ConfigLoader.load_yaml(str(CONFIG_PATH)))
+    for check in get_all_checks():
+        validator.register_check(check)
+    return validator
+
+
+def _chunks(text, size):
+    lines = text.split("\n")
+    offset = 0
+    for first in range(0, len(lines), size):
+        block = lines[first:first + size]
+        yield TextChunk(block, first, offset)
+        offset += sum(len(line) + 1 for line in block)
+
+
+def test_streaming_matches_in_memory():
+    """Тест: потоковая проверка всеми проверками даёт те же результаты, что проверка текста целиком"""
+    validator = _validator()
+    assert all(check.streaming for check in validator.checks)
+
+    pages = [{'number': 1, 'position': 0}, {'number': 2, 'position': TEXT.index("1 Назначение")},
+             {'number': 3, 'position': TEXT.index("ПРИЛОЖЕНИЕ")}]
+    document = Parser().parse_text(TEXT)
+    document.pages = pages
+    expected = validator.validate(document)
+    assert any(result.errors for result in expected)
+
+    for size in (1, 2, 5, 100):
+        streamed = validator.validate_stream(Document(file_path="text_input", pages=list(pages)),
+                                             _chunks(TEXT, size))
+        assert streamed == expected
+
+
+def test_text_window_keeps_only_tail():
+    """Тест: окно хранит только хвост текста, совпадения выдаются один раз"""
+    window = TextWindow(before=10)
+    pattern = re.compile(r'таблица\s+\d+')
+    found = []
+    for chunk in _chunks("\n".join(["текст таблица", "1 текст"] * 1000), 3):
+        window.push(chunk)
+        found += [window.start + match.start() for match in window.find(pattern, after=2)]
+        window.release()
+        assert len(window.text) < 100
+    window.final = True
+    found += [window.start + match.start() for match in window.find(pattern)]
+    assert len(found) == len(set(found)) == 1000
+
+
+def test_file_stream_matches_parse(tmp_path):
+    """Тест: файл читается блоками в тот же текст; пустой файл - демо-текст, как в parse()"""
+    path = tmp_path / "doc.txt"
+    path.write_bytes(TEXT.replace("\n", "\r\n").encode("cp1251"))
+    parser, validator = Parser(), _validator()
+
+    document, chunks = parser.stream_document(str(path), chunk_chars=16)
+    chunks = list(chunks)
+    assert len(chunks) > 1
+    assert "\n".join(line for chunk in chunks for line in chunk.lines) == parser.parse(str(path)).raw_text
+
+    empty = tmp_path / "empty.txt"
+    empty.write_bytes(b"")
+    for file_path in (path, empty):
+        parsed = parser.parse(str(file_path))
+        _, results = validator.validate_file_stream(parser, str(file_path))
+        assert results == validator.validate(parsed)
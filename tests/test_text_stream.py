@@ -0,0 +1,27 @@
+from src.utils import SUPPORTED_ENCODINGS
+from src.utils.text_stream import read_text, sample_encodings
+
+
+def test_cp1251_is_detected_by_sample(tmp_path):
+    """Тест: по образцу отбрасываются UTF-кодировки, файл декодируется один раз, переводы строк как в open()"""
+    path = tmp_path / "doc.txt"
+    path.write_bytes("1 Введение\r\nТаблица 1.1 Параметры\rконец\n".encode("cp1251") * 50)
+
+    assert sample_encodings(path.read_bytes(), SUPPORTED_ENCODINGS, sample_size=64) == ["cp1251"]
+    text, encoding = read_text(str(path), SUPPORTED_ENCODINGS, chunk_size=7, sample_size=64)
+    assert encoding == "cp1251"
+    assert text == path.read_text(encoding="cp1251")
+
+
+def test_error_after_sample_falls_back_to_next_encoding(tmp_path):
+    """Тест: ошибка дальше образца - файл читается в следующей подходящей кодировке"""
+    path = tmp_path / "doc.txt"
+    path.write_bytes("Введение\n".encode("utf-8") * 20 + "Заключение".encode("cp1251") + b"x")
+
+    text, encoding = read_text(str(path), SUPPORTED_ENCODINGS, chunk_size=16, sample_size=32)
+    assert encoding == "cp1251"
+    assert text == path.read_bytes().decode("cp1251")
+
+    # UTF-16 без BOM не принимается, а не прерывает чтение
+    path.write_bytes("Введение".encode("cp1251"))
+    assert read_text(str(path), SUPPORTED_ENCODINGS) == ("Введение", "cp1251")
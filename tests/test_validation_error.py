@@ -0,0 +1,32 @@
+import pickle
+
+from src.checks.table_checker import TableCheck
+from src.models import Document, ErrorTemplate, ValidationError
+
+
+def test_template_errors_render_like_plain_errors():
+    """Тест: ошибка по шаблону совпадает с ошибкой из готовых строк"""
+    template = ErrorTemplate("Проверка", "Нарушена нумерация: {0} → {1}", "Проверьте страницу {1}", "ГОСТ 2.105")
+    error = template.error(3, 5, page=2)
+
+    plain = ValidationError(check_name="Проверка", description="Нарушена нумерация: 3 → 5", page=2,
+                            recommendation="Проверьте страницу 5", gost_reference="ГОСТ 2.105")
+    assert error == plain
+    assert error.description == plain.description
+    assert error.recommendation == "Проверьте страницу 5"
+
+    # Фигурные скобки в готовой рекомендации не считаются полями шаблона
+    assert ValidationError(check_name="Проверка", description="{x}", recommendation="{y}").recommendation == "{y}"
+
+
+def test_errors_share_interned_template():
+    """Тест: однотипные ошибки ссылаются на один шаблон, в том числе после передачи в процесс"""
+    text = "\n".join(f"Таблица {i}.1" for i in range(1, 50))
+    result = TableCheck().run(Document(file_path="test.txt", raw_text=text))
+
+    templates = {id(error.template) for error in result.errors}
+    assert len(result.errors) > len(templates)
+
+    restored = pickle.loads(pickle.dumps(result))
+    assert restored == result
+    assert restored.errors[0].template is result.errors[0].template
@@ -0,0 +1,79 @@
+import time
+from pathlib import Path
+
+from src.checks import get_all_checks
+from src.checks.base_checker import BaseCheck
+from src.core import Parser, Validator
+from src.models import CheckStatus
+from src.utils import ConfigLoader
+
+
+CONFIG_PATH = Path(__file__).parent.parent / "config" / "gost_2_105_rules.yaml"
+
+
+class SlowCheck(BaseCheck):
+    """Проверка, которая не укладывается в предел времени"""
+
+    def __init__(self):
+        super().__init__("slow", "Медленная проверка")
+
+    def run(self, document):
+        time.sleep(1)
+        return self._create_result(CheckStatus.PASSED)
+
+
+def _validate(document, executor, extra_checks=(), **options):
+    validator = Validator(ConfigLoader.load_yaml(str(CONFIG_PATH)), executor=executor, **options)
+    for check in [*get_all_checks(), *extra_checks]:
+        validator.register_check(check)
+    try:
+        return validator.validate(document)
+    finally:
+        validator.close()
+
+
+def test_concurrent_validation_matches_serial():
+    """Тест: потоки и процессы дают те же результаты в порядке регистрации"""
+    document = Parser().parse_text("1. Введение\nТаблица 1.1: Данные\nПо формуле (1)\nx = y (1)\n")
+
+    serial = _validate(document, 'serial')
+
+    assert _validate(document, 'thread') == serial
+    assert _validate(document, 'process', max_workers=2) == serial
+
+
+def test_check_timeout_gives_error():
+    """Тест: зависшая проверка становится ERROR, остальные выполняются"""
+    document = Parser().parse_text("1. Введение\n")
+
+    results = _validate(document, 'thread', extra_checks=[SlowCheck()], check_timeout=0.2)
+
+    assert [r.check_id for r in results][-1] == "slow"
+    assert results[-1].status == CheckStatus.ERROR
+    assert all(r.status != CheckStatus.ERROR for r in results[:-1])
+
+
+class NapCheck(BaseCheck):
+    """Проверка, которая укладывается в предел времени, но дольше половины его"""
+
+    def __init__(self, number):
+        super().__init__(f"nap_{number}", "Проверка с паузой")
+
+    def run(self, document):
+        time.sleep(0.4)
+        return self._create_result(CheckStatus.PASSED)
+
+
+def test_queue_wait_does_not_count_against_timeout():
+    """Тест: предел времени отсчитывается от начала проверки, а не от постановки в пул"""
+    document = Parser().parse_text("1. Введение\n")
+
+    for executor in ('thread', 'process'):
+        validator = Validator(executor=executor, max_workers=1, check_timeout=0.7)
+        for number in range(3):
+            validator.register_check(NapCheck(number))
+        try:
+            results = validator.validate(document)
+        finally:
+            validator.close()
+        assert [r.status for r in results] == [CheckStatus.PASSED] * 3, executor